@@ -0,0 +1,8 @@
+# Loaded automatically by `gunicorn student_project.wsgi` (see Procfile)
+
+
+def worker_exit(server, worker):
+    # Flush this worker's buffered Topic.downloads counts before it exits
+    from django.core.management import call_command
+
+    call_command("flush_download_counters")
@@ -151,6 +151,61 @@ STATICFILES_STORAGE = (
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Hash uploads while they stream in (students/media_store.py)
+FILE_UPLOAD_HANDLERS = [
+    "students.media_store.HashingMemoryFileUploadHandler",
+    "students.media_store.HashingTemporaryFileUploadHandler",
+]
+
+
+# --------------------------------------------------
+# VIDEO DELIVERY (stream_video)
+# --------------------------------------------------
+# "python"     → stream through Django (default, works everywhere)
+# "sendfile"   → zero-copy via the WSGI server's file_wrapper (gunicorn → os.sendfile)
+# "x-accel"    → nginx serves the file via X-Accel-Redirect
+# "x-sendfile" → Apache / lighttpd serve the file via X-Sendfile
+VIDEO_DELIVERY_BACKEND = os.environ.get("VIDEO_DELIVERY_BACKEND", "python")
+
+# nginx: location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+VIDEO_ACCEL_REDIRECT_PREFIX = os.environ.get(
+    "VIDEO_ACCEL_REDIRECT_PREFIX",
+    "/protected-media/"
+)
+
+# Serve /api/student/video/stream/ with the async view (only under ASGI / uvicorn)
+VIDEO_ASYNC_STREAMING = os.environ.get("VIDEO_ASYNC_STREAMING", "False") == "True"
+
+# Topic.downloads play counters are buffered in memory and flushed every
+# N plays, or T seconds after the oldest buffered play (a background timer;
+# see students/download_counter.py)
+DOWNLOAD_COUNTER_FLUSH_EVERY = int(os.environ.get("DOWNLOAD_COUNTER_FLUSH_EVERY", 100))
+DOWNLOAD_COUNTER_FLUSH_SECONDS = int(os.environ.get("DOWNLOAD_COUNTER_FLUSH_SECONDS", 30))
+
+# Lifetime (seconds) of signed video URLs issued by stream_video / video_url_api.
+# With local media the signed link is served by Django itself; set an
+# offload VIDEO_DELIVERY_BACKEND (x-accel / x-sendfile) in production.
+SIGNED_MEDIA_TTL = int(os.environ.get("SIGNED_MEDIA_TTL", 300))
+
+# Student app sync (students/sync.py): deletes are remembered this many
+# days; older tokens get a full resync. Each sync re-reads this many
+# seconds before its token to cover rows committed late.
+SYNC_TOMBSTONE_DAYS = int(os.environ.get("SYNC_TOMBSTONE_DAYS", 30))
+SYNC_OVERLAP_SECONDS = int(os.environ.get("SYNC_OVERLAP_SECONDS", 5))
+
+# Most matches search_ids() ranks per kind (students/search.py); search
+# filters are not capped, matches past this just come unranked
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", 500))
+
+# Admin lists count rows exactly below this planner estimate, and show
+# the estimate above it (students/pagination.py)
+PAGINATOR_EXACT_COUNT_BELOW = int(os.environ.get("PAGINATOR_EXACT_COUNT_BELOW", 10000))
+
+# Student picker autocomplete (students/lookup.py): matches per prefix,
+# and how long each prefix's matches stay cached
+STUDENT_LOOKUP_LIMIT = int(os.environ.get("STUDENT_LOOKUP_LIMIT", 20))
+STUDENT_LOOKUP_CACHE_SECONDS = int(os.environ.get("STUDENT_LOOKUP_CACHE_SECONDS", 300))
+
 
 # --------------------------------------------------
 # AUTH REDIRECTS
@@ -23,6 +23,7 @@ urlpatterns = [
     path("add_topic/", views.add_topic, name="add_topic"),
     path("edit_topic/<int:topic_id>/", views.edit_topic, name="edit_topic"),
     path("delete_topic/<int:topic_id>/", views.delete_topic, name="delete_topic"),
+    path("delete_task/<int:task_id>/", views.delete_task, name="delete_task"),
 
     # REPORTS
     path("reports/", views.Reports, name="reports"),
@@ -39,19 +40,30 @@ urlpatterns = [
 
     # ATTENDANCE
     path("attendance/", views.attendance_page, name="attendance_page"),
+    path("attendance/bulk/", views.bulk_attendance, name="bulk_attendance"),
     path("edit-attendance/<int:id>/", views.edit_attendance, name="edit_attendance"),
     path("delete-attendance/<int:id>/", views.delete_attendance, name="delete_attendance"),
     path("admin-attendance/", views.admin_attendance_page, name="admin_attendance_page"),
+    path("api/batch/<int:batch_id>/attendance-heatmap/", views.batch_attendance_heatmap_api, name="batch_attendance_heatmap"),
 
     # TASKS (ADMIN)
     path("tasks/", views.task_list, name="task_list"),
     path("add-task/", views.add_task, name="add_task"),
+    path("api/students/lookup/", views.student_lookup_api, name="student_lookup_api"),
 
     # STUDENT APIs
     path("api/student/login/", views.student_login_api),
     path("api/student/change-password/", views.change_password_api),
     path("api/student/topics/", views.student_topics_api),
-    path("api/student/video/stream/<int:topic_id>/", views.stream_video),
+    path("api/v2/student/topics/", views.student_topics_api_v2, name="student_topics_api_v2"),
+    path("api/student/sync/", views.student_sync_api, name="student_sync_api"),
+    path(
+        "api/student/video/stream/<int:topic_id>/",
+        views.stream_video_async if settings.VIDEO_ASYNC_STREAMING else views.stream_video,
+    ),
+    path("api/student/video/stream-async/<int:topic_id>/", views.stream_video_async),
+    path("api/student/video/url/<int:topic_id>/", views.video_url_api, name="video_url_api"),
+    path("api/media/signed/<path:name>", views.signed_media, name="signed_media"),
 
     # STUDENT DASHBOARD + PROFILE
     path("api/student/dashboard/", views.student_dashboard_api),
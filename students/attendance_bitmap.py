@@ -0,0 +1,148 @@
+# ======================================================
+# PACKED MONTHLY ATTENDANCE (AttendanceMonth)
+# ======================================================
+"""
+Compact copy of the Attendance table: one AttendanceMonth row per
+student per month holding a 31-slot array of Attendance.STATUS_CODES,
+3 bits per day (12 bytes).
+
+Rows are rebuilt from Attendance whenever a (student, month) changes,
+so a month can be read back with a single small-row query.
+"""
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from .models import Attendance, AttendanceMonth, Student
+
+
+BITS_PER_DAY = 3
+DAY_MASK = (1 << BITS_PER_DAY) - 1
+PACKED_BYTES = 12   # 31 days × 3 bits = 93 bits
+
+STATUS_BY_CODE = {code: status for status, code in Attendance.STATUS_CODES.items()}
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def pack_month(codes_by_day):
+    """{day_of_month: code} → 12 packed bytes."""
+    value = 0
+    for day, code in codes_by_day.items():
+        value |= (code & DAY_MASK) << (BITS_PER_DAY * (day - 1))
+    return value.to_bytes(PACKED_BYTES, "little")
+
+
+def unpack_month(packed):
+    """12 packed bytes → list of 31 codes (index 0 = day 1)."""
+    value = int.from_bytes(bytes(packed), "little")
+    return [(value >> (BITS_PER_DAY * i)) & DAY_MASK for i in range(31)]
+
+
+def _pack_records(records):
+    """(student_id, date, status) rows → {(student_id, month): {day: code}}"""
+    packed = {}
+    for student_id, day, status in records:
+        packed.setdefault((student_id, month_start(day)), {})[day.day] = (
+            Attendance.STATUS_CODES.get(status, 0)
+        )
+    return packed
+
+
+def _save_months(packed):
+    AttendanceMonth.objects.bulk_create(
+        [
+            AttendanceMonth(student_id=student_id, month=first, codes=pack_month(days))
+            for (student_id, first), days in packed.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["student", "month"],
+        update_fields=["codes"],
+    )
+
+
+def refresh_attendance_months(keys):
+    """Rebuild AttendanceMonth rows for (student_id, month_start) pairs."""
+    keys = set(keys)
+    if not keys:
+        return
+
+    student_ids = set(
+        Student.objects
+        .filter(id__in={student_id for student_id, _ in keys})
+        .values_list("id", flat=True)
+    )
+    keys = {k for k in keys if k[0] in student_ids}
+    if not keys:
+        return
+
+    months = {first for _, first in keys}
+
+    records = (
+        Attendance.objects
+        .filter(
+            student_id__in=student_ids,
+            date__gte=min(months),
+            date__lt=max(months) + relativedelta(months=1),
+        )
+        .order_by()
+        .values_list("student_id", "date", "status")
+    )
+
+    packed = {
+        key: days
+        for key, days in _pack_records(records).items()
+        if key in keys
+    }
+    _save_months(packed)
+
+    # Months whose last record was removed
+    emptied = keys - packed.keys()
+    if emptied:
+        stale = [
+            row_id
+            for row_id, student_id, first in AttendanceMonth.objects.filter(
+                student_id__in={s for s, _ in emptied},
+                month__in={m for _, m in emptied},
+            ).values_list("id", "student_id", "month")
+            if (student_id, first) in emptied
+        ]
+        AttendanceMonth.objects.filter(id__in=stale).delete()
+
+
+def rebuild_student_months(student_ids):
+    """Rebuild every AttendanceMonth row for these students from scratch."""
+    records = (
+        Attendance.objects
+        .filter(student_id__in=student_ids)
+        .order_by()
+        .values_list("student_id", "date", "status")
+    )
+    packed = _pack_records(records)
+
+    AttendanceMonth.objects.filter(student_id__in=student_ids).delete()
+    _save_months(packed)
+
+
+def attendance_statuses(student_id, start, end):
+    """{date: status} for start..end, decoded from AttendanceMonth rows."""
+    rows = AttendanceMonth.objects.filter(
+        student_id=student_id,
+        month__gte=month_start(start),
+        month__lte=end,
+    ).values_list("month", "codes")
+
+    statuses = {}
+
+    for first, packed in rows:
+        for i, code in enumerate(unpack_month(packed)):
+            if not code:
+                continue
+
+            day = first + timedelta(days=i)
+            if day.month == first.month and start <= day <= end:
+                statuses[day] = STATUS_BY_CODE[code]
+
+    return statuses
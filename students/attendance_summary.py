@@ -0,0 +1,107 @@
+# ======================================================
+# ATTENDANCE SUMMARY — REFRESH HELPERS
+# ======================================================
+"""
+Keeps AttendanceSummary rows in step with the Attendance table.
+
+Summaries are recomputed per student from two grouped queries (window
+counts + monthly counts) and upserted in bulk, so refreshing one student
+or a whole batch costs the same number of queries.
+"""
+from django.db.models import Count, F, Max, Min, Q
+from django.db.models.functions import TruncMonth
+
+from .expressions import AddMonths
+from .models import Attendance, AttendanceSummary, Student
+
+
+# Dashboards measure attendance over the first 3 months after joining
+ATTENDANCE_WINDOW_MONTHS = 3
+
+STATUS_FIELDS = {
+    "Present": "present_days",
+    "Late": "late_days",
+    "Absent": "absent_days",
+    "Leave": "leave_days",
+}
+
+
+def refresh_attendance_summaries(student_ids):
+    """Recompute and upsert the summary rows for the given students."""
+
+    # Only students that still exist (cascade deletes may pass stale ids)
+    student_ids = list(
+        Student.objects
+        .filter(id__in=set(student_ids))
+        .values_list("id", flat=True)
+    )
+
+    if not student_ids:
+        return []
+
+    records = Attendance.objects.filter(student_id__in=student_ids).order_by()
+
+    in_window = Q(
+        date__gte=F("student__joining_date"),
+        date__lte=AddMonths(F("student__joining_date"), ATTENDANCE_WINDOW_MONTHS),
+    )
+
+    window_counts = {
+        row["student_id"]: row
+        for row in records.values("student_id").annotate(
+            first_date=Min("date"),
+            last_date=Max("date"),
+            **{
+                field: Count("id", filter=Q(status=status) & in_window)
+                for status, field in STATUS_FIELDS.items()
+            },
+        )
+    }
+
+    monthly = {}
+    for row in (
+        records
+        .annotate(month=TruncMonth("date"))
+        .values("student_id", "month", "status")
+        .annotate(total=Count("id"))
+    ):
+        months = monthly.setdefault(row["student_id"], {})
+        key = row["month"].strftime("%Y-%m")
+        months.setdefault(key, {})[row["status"]] = row["total"]
+
+    summaries = []
+
+    for student_id in student_ids:
+        counts = window_counts.get(student_id, {})
+
+        summaries.append(AttendanceSummary(
+            student_id=student_id,
+            monthly=monthly.get(student_id, {}),
+            first_date=counts.get("first_date"),
+            last_date=counts.get("last_date"),
+            **{field: counts.get(field, 0) for field in STATUS_FIELDS.values()},
+        ))
+
+    AttendanceSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=["student"],
+        update_fields=[
+            *STATUS_FIELDS.values(),
+            "monthly",
+            "first_date",
+            "last_date",
+            "updated_at",
+        ],
+    )
+
+    return summaries
+
+
+def get_attendance_summary(student):
+    """Return the student's summary, building it on first use."""
+    try:
+        return student.attendance_summary
+    except AttendanceSummary.DoesNotExist:
+        refresh_attendance_summaries([student.id])
+        return AttendanceSummary.objects.get(student=student)
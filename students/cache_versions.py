@@ -0,0 +1,31 @@
+# ======================================================
+# CROSS-PROCESS CACHE VERSIONS
+# ======================================================
+"""
+Each gunicorn worker keeps its own caches (no shared cache backend is
+configured), so invalidation goes through the database: writers bump a
+CacheVersion row, readers compare it with the version they built from.
+Reading a version is one primary-key lookup.
+"""
+from django.db.models import F
+
+from .models import CacheVersion
+
+
+def current_version(key):
+    return (
+        CacheVersion.objects
+        .filter(key=key)
+        .values_list("version", flat=True)
+        .first()
+    ) or 0
+
+
+def bump_version(key):
+    if CacheVersion.objects.filter(key=key).update(version=F("version") + 1):
+        return
+
+    _, created = CacheVersion.objects.get_or_create(key=key, defaults={"version": 1})
+    if not created:
+        # Another writer created it first
+        CacheVersion.objects.filter(key=key).update(version=F("version") + 1)
@@ -0,0 +1,143 @@
+# ======================================================
+# BUFFERED TOPIC.DOWNLOADS COUNTERS
+# ======================================================
+"""
+Video plays are counted in memory and written to Topic.downloads in
+batches, so a popular lecture does not turn every play into an UPDATE
+on the same row.
+
+Each process keeps its own buffer. It is flushed when it holds
+settings.DOWNLOAD_COUNTER_FLUSH_EVERY plays, DOWNLOAD_COUNTER_FLUSH_SECONDS
+after the oldest pending play (a daemon timer, so a worker that stops
+getting plays still writes them), at interpreter exit, and from
+gunicorn's worker_exit hook (`manage.py flush_download_counters`).
+
+Flushes triggered from a request (a play, the reports page) never raise:
+a failed write is logged and the plays stay buffered for the next flush,
+so a counter problem cannot break video playback.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import Topic
+
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadCounter:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._count = 0
+        self._since = None
+        self._timer = None
+
+    def _add(self, topic_id, n):
+        """Buffer n plays; True when the buffer is due for a flush."""
+        with self._lock:
+            self._pending[topic_id] = self._pending.get(topic_id, 0) + n
+            self._count += n
+            if self._since is None:
+                self._since = time.monotonic()
+                self._start_timer()
+
+            return (
+                self._count >= settings.DOWNLOAD_COUNTER_FLUSH_EVERY
+                or time.monotonic() - self._since >= settings.DOWNLOAD_COUNTER_FLUSH_SECONDS
+            )
+
+    def _start_timer(self):
+        # Called with the lock held, when the first play is buffered
+        self._timer = threading.Timer(
+            settings.DOWNLOAD_COUNTER_FLUSH_SECONDS, self._flush_from_timer
+        )
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush(quiet=True)
+        finally:
+            # The timer thread's own connection
+            connection.close()
+
+    def record(self, topic_id, n=1):
+        if self._add(topic_id, n):
+            self.flush(quiet=True)
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def flush(self, quiet=False):
+        """
+        Write pending plays; one UPDATE per distinct increment. Returns
+        plays written. quiet=True logs a failed write instead of raising.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._count, self._since = 0, None
+            timer, self._timer = self._timer, None
+
+        if timer is not None:
+            timer.cancel()
+
+        if not pending:
+            return 0
+
+        by_increment = {}
+        for topic_id, n in pending.items():
+            by_increment.setdefault(n, []).append(topic_id)
+
+        try:
+            with transaction.atomic():
+                for n, topic_ids in by_increment.items():
+                    Topic.objects.filter(id__in=topic_ids).update(downloads=F("downloads") + n)
+        except Exception:
+            # Keep the counts for the next flush rather than losing them
+            for topic_id, n in pending.items():
+                self._add(topic_id, n)
+
+            if not quiet:
+                raise
+
+            logger.exception(
+                "Could not write %d buffered video plays; kept for the next flush",
+                sum(pending.values()),
+            )
+            return 0
+
+        return sum(pending.values())
+
+
+download_counter = DownloadCounter()
+
+
+def record_download(topic_id):
+    download_counter.record(topic_id)
+
+
+def flush_downloads(quiet=False):
+    return download_counter.flush(quiet)
+
+
+def is_new_play(request):
+    """First request of a playback (not a seek / follow-up range)."""
+    value = request.headers.get("Range", "").replace(" ", "")
+    return not value or value.startswith("bytes=0-")
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush_downloads()
+    except Exception:
+        pass
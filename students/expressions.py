@@ -0,0 +1,62 @@
+# ======================================================
+# DATABASE EXPRESSIONS
+# ======================================================
+from datetime import timedelta
+
+from django.db.models import Case, DateField, DurationField, F, Func, Value, When
+
+
+class AddMonths(Func):
+    """
+    date + N calendar months, evaluated in the database.
+
+    Matches `date + relativedelta(months=N)`: when the target month is
+    shorter, the day is clamped to its last day (Aug 31 + 6 → Feb 28).
+    """
+
+    output_field = DateField()
+
+    def __init__(self, expression, months, **extra):
+        self.months = int(months)
+        super().__init__(expression, **extra)
+
+    # PostgreSQL: interval arithmetic already clamps to month end
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return (
+            f"(({sql}) + make_interval(months => %s))::date",
+            [*params, self.months],
+        )
+
+    # SQLite: '+N months' overflows into the next month, so clamp to the
+    # last day of the target month ourselves
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+
+        shifted = (
+            f"date({sql}, 'start of month', %s, "
+            f"'+' || (CAST(strftime('%%d', {sql}) AS INTEGER) - 1) || ' days')"
+        )
+        month_end = f"date({sql}, 'start of month', %s, '-1 day')"
+
+        return (
+            f"MIN({shifted}, {month_end})",
+            [
+                *params, f"{self.months:+d} months", *params,
+                *params, f"{self.months + 1:+d} months",
+            ],
+        )
+
+
+def time_between(start, end):
+    """
+    end - start for two TimeFields, as a DurationField, in the database.
+
+    A session whose end is before its start counts as zero, like
+    _hours_between() in views.py.
+    """
+    return Case(
+        When(**{f"{end}__lt": F(start)}, then=Value(timedelta(0))),
+        default=F(end) - F(start),
+        output_field=DurationField(),
+    )
@@ -0,0 +1,157 @@
+# ======================================================
+# BATCH ATTENDANCE HEATMAP (STUDENTS × DAYS)
+# ======================================================
+"""
+Builds a dense students × days matrix of Attendance.STATUS_CODES from a
+single values_list query, plus per-student and per-day statistics.
+
+The matrix is a row-major bytearray (one int8 cell per student-day),
+returned either as base64 bytes or as run-length pairs.
+"""
+import base64
+from datetime import timedelta
+
+from .models import Attendance
+from .working_days import get_working_day_calendar
+
+
+PRESENT = Attendance.STATUS_CODES["Present"]
+LATE = Attendance.STATUS_CODES["Late"]
+ABSENT = Attendance.STATUS_CODES["Absent"]
+LEAVE = Attendance.STATUS_CODES["Leave"]
+
+
+def build_attendance_matrix(student_ids, start, end):
+    """(matrix, days) for the students (row order kept) over start..end."""
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    row_of = {student_id: i for i, student_id in enumerate(student_ids)}
+    width = len(days)
+    matrix = bytearray(len(student_ids) * width)
+
+    records = Attendance.objects.filter(
+        student_id__in=student_ids,
+        date__range=(start, end),
+    ).order_by().values_list("student_id", "date", "status")
+
+    for student_id, day, status in records:
+        matrix[row_of[student_id] * width + (day - start).days] = (
+            Attendance.STATUS_CODES.get(status, 0)
+        )
+
+    return matrix, days
+
+
+def _rate(part, whole):
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def student_stats(matrix, width, working):
+    """Per-row rates, streaks and late ratio over working days only."""
+    stats = []
+
+    for offset in range(0, len(matrix), width):
+        row = matrix[offset:offset + width]
+
+        counts = {code: 0 for code in (PRESENT, LATE, ABSENT, LEAVE)}
+        streak = longest = 0
+
+        for code, is_working in zip(row, working):
+            if not is_working:
+                continue
+
+            if code:
+                counts[code] += 1
+
+            if code in (PRESENT, LATE):
+                streak += 1
+                longest = max(longest, streak)
+            else:
+                streak = 0
+
+        attended = counts[PRESENT] + counts[LATE]
+
+        stats.append({
+            "present": counts[PRESENT],
+            "late": counts[LATE],
+            "absent": counts[ABSENT],
+            "leave": counts[LEAVE],
+            "attendance_rate": _rate(attended, sum(working)),
+            "late_ratio": _rate(counts[LATE], attended),
+            "current_streak": streak,
+            "longest_streak": longest,
+        })
+
+    return stats
+
+
+def day_stats(matrix, width, rows):
+    """Per-column attended / late rates across the batch."""
+    attended = [0] * width
+    late = [0] * width
+
+    for offset in range(0, len(matrix), width):
+        for i, code in enumerate(matrix[offset:offset + width]):
+            if code == PRESENT:
+                attended[i] += 1
+            elif code == LATE:
+                attended[i] += 1
+                late[i] += 1
+
+    return {
+        "attendance_rate": [_rate(a, rows) for a in attended],
+        "late_ratio": [_rate(l, a) for l, a in zip(late, attended)],
+    }
+
+
+def encode_matrix(matrix, encoding="base64"):
+    """Compact wire form: base64 bytes, or [[code, run_length], ...]."""
+    if encoding == "rle":
+        runs = []
+        for code in matrix:
+            if runs and runs[-1][0] == code:
+                runs[-1][1] += 1
+            else:
+                runs.append([code, 1])
+        return runs
+
+    return base64.b64encode(bytes(matrix)).decode()
+
+
+def batch_heatmap(batch, start, end, encoding="base64"):
+
+    students = list(
+        batch.student_set
+        .order_by("user__first_name", "id")
+        .values_list("id", "user__first_name")
+    )
+
+    matrix, days = build_attendance_matrix([s[0] for s in students], start, end)
+
+    calendar = get_working_day_calendar()
+    working = [calendar.is_working_day(d) for d in days]
+    width = len(days)
+
+    per_student = student_stats(matrix, width, working) if width else []
+
+    return {
+        "batch": batch.id,
+        "batch_name": batch.batch_name,
+        "from_date": start.isoformat(),
+        "to_date": end.isoformat(),
+
+        "rows": len(students),
+        "columns": width,
+        "codes": {code: status for status, code in Attendance.STATUS_CODES.items()},
+        "encoding": encoding,
+        "matrix": encode_matrix(matrix, encoding),
+
+        "students": [
+            {"id": student_id, "name": name, **stats}
+            for (student_id, name), stats in zip(students, per_student)
+        ],
+        "days": {
+            "working": [int(w) for w in working],
+            **day_stats(matrix, width, len(students)),
+        },
+    }
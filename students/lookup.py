@@ -0,0 +1,158 @@
+# ======================================================
+# STUDENT LOOKUP (SEARCH-AS-YOU-TYPE)
+# ======================================================
+"""
+`/api/students/lookup/?q=<prefix>` backs the student pickers on the
+add_task and attendance forms, so those pages no longer render every
+student into a <select>.
+
+Each student has a few StudentLookupKey rows (first name, last name, full
+name, username, email, phone), lowercased, behind one (key, student)
+index. A lookup is a prefix range on that index:
+
+- SQLite     → key >= 'rav' AND key < 'raw' (its LIKE is case-insensitive
+  and cannot use a plain index)
+- PostgreSQL → key LIKE 'rav%' on the varchar_pattern_ops index added in
+  the migration
+- others     → key LIKE 'rav%'
+
+Results (at most STUDENT_LOOKUP_LIMIT) are cached per prefix for
+STUDENT_LOOKUP_CACHE_SECONDS. A change to a student's keys or displayed
+course / batch bumps a CacheVersion row, so no worker reads stale
+entries again.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .cache_versions import bump_version, current_version
+from .models import Student, StudentLookupKey
+from .search import normalize
+
+
+LOOKUP_VERSION_KEY = "student_lookup"
+KEY_MAX_LENGTH = 255
+
+# lookup_keys() yields at most this many keys per student
+KEYS_PER_STUDENT = 7
+
+
+# ======================================================
+# KEYS
+# ======================================================
+def lookup_keys(student):
+    user = student.user
+    phone = student.phone or ""
+
+    keys = [
+        normalize(user.first_name),
+        normalize(user.last_name),
+        normalize(user.first_name, user.last_name),
+        normalize(user.username),
+        normalize(user.email),
+        normalize(phone),
+        "".join(c for c in phone if c.isdigit()),
+    ]
+
+    return sorted({key[:KEY_MAX_LENGTH] for key in keys if key})
+
+
+def index_student(student):
+    """Rewrite the student's keys if they changed. Returns True if they did."""
+    keys = lookup_keys(student)
+
+    existing = sorted(
+        StudentLookupKey.objects.filter(student=student).values_list("key", flat=True)
+    )
+    if existing == keys:
+        return False
+
+    with transaction.atomic():
+        StudentLookupKey.objects.filter(student=student).delete()
+        StudentLookupKey.objects.bulk_create([
+            StudentLookupKey(student=student, key=key) for key in keys
+        ])
+
+    invalidate_lookup_cache()
+    return True
+
+
+def rebuild_lookup_keys():
+    """Recreate every key. Returns the number written."""
+    rows = [
+        StudentLookupKey(student=student, key=key)
+        for student in Student.objects.select_related("user").iterator()
+        for key in lookup_keys(student)
+    ]
+
+    with transaction.atomic():
+        StudentLookupKey.objects.all().delete()
+        StudentLookupKey.objects.bulk_create(rows, batch_size=1000)
+
+    invalidate_lookup_cache()
+    return len(rows)
+
+
+def invalidate_lookup_cache():
+    bump_version(LOOKUP_VERSION_KEY)
+
+
+# ======================================================
+# QUERY
+# ======================================================
+def _prefix_filter(prefix):
+    if connection.vendor == "sqlite":
+        upper = prefix[:-1] + chr(min(ord(prefix[-1]) + 1, 0x10FFFF))
+        return Q(key__gte=prefix, key__lt=upper)
+
+    return Q(key__startswith=prefix)
+
+
+def lookup_ids(prefix, limit):
+    """Ids of up to `limit` students with a key starting with `prefix`."""
+    student_ids = (
+        StudentLookupKey.objects
+        .filter(_prefix_filter(prefix))
+        .order_by("key", "student_id")
+        .values_list("student_id", flat=True)[:limit * KEYS_PER_STUDENT]
+    )
+
+    # One student can match on several keys ("ravi" → name + email)
+    return list(dict.fromkeys(student_ids))[:limit]
+
+
+def student_option(student):
+    user = student.user
+    return {
+        "id": student.id,
+        "name": f"{user.first_name} {user.last_name}".strip() or user.username,
+        "username": user.username,
+        "email": user.email,
+        "course": student.course.course_name if student.course else "",
+        "batch": student.batch.batch_name if student.batch else "",
+    }
+
+
+def lookup_students(query):
+    """Cached [student_option(), ...] for a typed prefix."""
+    prefix = normalize(query)[:KEY_MAX_LENGTH]
+    if not prefix:
+        return []
+
+    version = current_version(LOOKUP_VERSION_KEY)
+    digest = hashlib.sha1(prefix.encode()).hexdigest()
+    cache_key = f"students:lookup:{version}:{digest}"
+
+    results = cache.get(cache_key)
+    if results is not None:
+        return results
+
+    ids = lookup_ids(prefix, settings.STUDENT_LOOKUP_LIMIT)
+    students = Student.objects.select_related("user", "course", "batch").in_bulk(ids)
+    results = [student_option(students[pk]) for pk in ids if pk in students]
+
+    cache.set(cache_key, results, settings.STUDENT_LOOKUP_CACHE_SECONDS)
+    return results
@@ -0,0 +1,156 @@
+import json
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from students.models import Batch, Course, Student, Topic, TopicSession
+from students.views import admin_dashboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database with a growing number of topic '
+        'sessions and time admin_dashboard (month filter, page 1) at each '
+        'size, next to a full scan of the filtered sessions'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,5000,20000',
+                            help='Comma-separated session counts to measure at')
+        parser.add_argument('--students', type=int, default=10,
+                            help='Progress rows (students) per session')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Requests per size when timing')
+        parser.add_argument('--output', help='Also write the report as JSON here')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(n) for n in options['sizes'].split(','))
+
+        # Never touch the real database: run everything in a test DB
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            batch, students = self.seed_people(options['students'])
+            admin = User.objects.create_superuser(username='bench_admin')
+
+            results = []
+            for size in sizes:
+                self.stdout.write(f'Seeding up to {size} sessions...')
+                self.seed_sessions(batch, students, size)
+                results.append(self.measure(admin, size, options['repeat']))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'vendor': connection.vendor,
+            'students_per_session': options['students'],
+            'results': results,
+        }
+
+        self.print_report(report)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    # ------------------------------------------------------------------
+    # DATASET
+    # ------------------------------------------------------------------
+    def seed_people(self, student_count):
+        course = Course.objects.create(course_name='Benchmark Course')
+        batch = Batch.objects.create(batch_name='Benchmark Batch', course=course)
+
+        users = User.objects.bulk_create([
+            User(username=f'bench_student_{i}') for i in range(student_count)
+        ])
+        students = Student.objects.bulk_create([
+            Student(user=user, course=course, batch=batch) for user in users
+        ])
+
+        return batch, students
+
+    def seed_sessions(self, batch, students, size):
+        """Top the table up to `size` sessions, all in the current month."""
+        existing = TopicSession.objects.count()
+        month_start = date.today().replace(day=1)
+
+        sessions = TopicSession.objects.bulk_create([
+            TopicSession(
+                batch=batch,
+                title=f'Session {n}',
+                description='',
+                date=month_start + timedelta(days=n % 28),
+                start_time=dtime(10, 0),
+                end_time=dtime(11, 30),
+            )
+            for n in range(existing, size)
+        ], batch_size=2000)
+
+        Topic.objects.bulk_create([
+            Topic(session=session, student=student, status='completed' if n % 3 == 0 else 'pending')
+            for session in sessions
+            for n, student in enumerate(students)
+        ], batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    # ------------------------------------------------------------------
+    # TIMING
+    # ------------------------------------------------------------------
+    def measure(self, admin, size, repeat):
+        request = RequestFactory().get('/admindashboard/', {'month': date.today().month})
+        request.user = admin
+
+        with CaptureQueriesContext(connection) as queries:
+            admin_dashboard(request)
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            admin_dashboard(request)
+        view_ms = (time.perf_counter() - started) * 1000 / repeat
+
+        # What the dashboard used to do: load every filtered session
+        full = TopicSession.objects.filter(
+            content_type='topic', date__month=date.today().month
+        ).select_related('batch__course').annotate(
+            student_count=Count('progress'),
+            completed_count=Count('progress', filter=Q(progress__status='completed')),
+        )
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            list(full)
+        full_ms = (time.perf_counter() - started) * 1000 / repeat
+
+        return {
+            'sessions': size,
+            'view_avg_ms': round(view_ms, 3),
+            'view_queries': len(queries),
+            'full_scan_avg_ms': round(full_ms, 3),
+        }
+
+    # ------------------------------------------------------------------
+    # OUTPUT
+    # ------------------------------------------------------------------
+    def print_report(self, report):
+        self.stdout.write(
+            f"\nVendor: {report['vendor']} | students per session: "
+            f"{report['students_per_session']}\n"
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'sessions':>10}  {'view ms':>10}  {'queries':>8}  {'full scan ms':>13}"
+        ))
+        for row in report['results']:
+            self.stdout.write(
+                f"{row['sessions']:>10}  {row['view_avg_ms']:>10}  "
+                f"{row['view_queries']:>8}  {row['full_scan_avg_ms']:>13}"
+            )
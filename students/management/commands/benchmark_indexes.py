@@ -0,0 +1,294 @@
+import json
+import random
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q, Sum, UniqueConstraint
+
+from students.models import (
+    Attendance,
+    Batch,
+    Course,
+    Mentor,
+    Payment,
+    Student,
+    Topic,
+    TopicSession,
+)
+
+
+# Models whose Meta.indexes and unique constraints are dropped for the
+# "before" run (a unique constraint is an index too: (student, date)
+# would otherwise serve the attendance lookups in both runs)
+INDEXED_MODELS = [TopicSession, Topic, Attendance, Payment]
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and record query plans + timings '
+        'for the hot student/mentor/payment lookups, without and with the '
+        'composite indexes and unique constraints'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--days', type=int, default=120,
+                            help='Attendance/topic days seeded per student')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Executions per query when timing')
+        parser.add_argument('--output', help='Also write the report as JSON here')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        # Never touch the real database: run everything in a test DB
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        try:
+            self.stdout.write('Seeding dataset...')
+            samples = self.seed(options['students'], options['days'])
+
+            self.set_indexes(enabled=False)
+            before = self.measure(samples, options['repeat'])
+
+            self.set_indexes(enabled=True)
+            after = self.measure(samples, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'vendor': connection.vendor,
+            'students': options['students'],
+            'days': options['days'],
+            'endpoints': {
+                name: {'before': before[name], 'after': after[name]}
+                for name in before
+            },
+        }
+
+        self.print_report(report)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    # ------------------------------------------------------------------
+    # DATASET
+    # ------------------------------------------------------------------
+    def seed(self, student_count, days):
+        start = date.today() - timedelta(days=days)
+
+        course = Course.objects.create(course_name='Benchmark Course')
+        batches = [
+            Batch.objects.create(batch_name=f'Batch {i}', course=course)
+            for i in range(max(student_count // 60, 1))
+        ]
+
+        mentors = []
+        for i in range(5):
+            user = User.objects.create(username=f'bench_mentor_{i}')
+            mentors.append(Mentor.objects.create(user=user, phone=f'90000000{i:02d}'))
+
+        users = User.objects.bulk_create([
+            User(username=f'bench_student_{i}', first_name=f'Student {i}')
+            for i in range(student_count)
+        ])
+        students = Student.objects.bulk_create([
+            Student(
+                user=user,
+                course=course,
+                batch=batches[i % len(batches)],
+                joining_date=start,
+            )
+            for i, user in enumerate(users)
+        ])
+
+        statuses = ['Present'] * 7 + ['Late', 'Absent', 'Leave']
+
+        for student in students:
+            Attendance.objects.bulk_create([
+                Attendance(
+                    student=student,
+                    course=course,
+                    batch=student.batch,
+                    date=start + timedelta(days=d),
+                    status=random.choice(statuses),
+                )
+                for d in range(days)
+                if (start + timedelta(days=d)).weekday() < 5
+            ])
+
+            Payment.objects.bulk_create([
+                Payment(
+                    student=student,
+                    amount_paid=5000,
+                    utr=f'BENCH{student.id}-{n}',
+                    screenshot='payment_screenshots/bench.png',
+                    status=random.choice(['pending', 'approved', 'rejected']),
+                )
+                for n in range(3)
+            ])
+
+        # One session per batch per day, one progress row per student
+        for batch in batches:
+            sessions = TopicSession.objects.bulk_create([
+                TopicSession(
+                    content_type='task' if d % 5 == 0 else 'topic',
+                    batch=batch,
+                    mentor=mentors[d % len(mentors)],
+                    title=f'Session {d}',
+                    description='',
+                    date=start + timedelta(days=d),
+                    start_time=dtime(10, 0),
+                    end_time=dtime(12, 0),
+                )
+                for d in range(days)
+            ])
+            Topic.objects.bulk_create([
+                Topic(session=session, student=student)
+                for student in students
+                if student.batch_id == batch.id
+                for session in sessions
+            ], batch_size=5000)
+
+        return {
+            'student': random.choice(students),
+            'mentor': random.choice(mentors),
+            'start': start,
+            'end': start + timedelta(days=days),
+            'today': start + timedelta(days=days // 2),
+        }
+
+    # ------------------------------------------------------------------
+    # INDEX TOGGLING
+    # ------------------------------------------------------------------
+    def set_indexes(self, enabled):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                if not enabled:
+                    for index in model._meta.indexes:
+                        editor.remove_index(model, index)
+
+                self.set_unique_constraints(editor, model, enabled)
+
+                if enabled:
+                    for index in model._meta.indexes:
+                        editor.add_index(model, index)
+
+        # Refresh planner statistics so the plans reflect the new indexes
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def set_unique_constraints(self, editor, model, enabled):
+        meta = model._meta
+        unique = [
+            c for c in meta.constraints
+            if isinstance(c, UniqueConstraint) and c.fields
+        ]
+        indexes, constraints = meta.indexes, meta.constraints
+        others = [c for c in constraints if c not in unique]
+
+        # SQLite adds / drops a constraint by rebuilding the table from
+        # Meta, so Meta has to describe the table after each step: no
+        # indexes (toggled separately), only the uniques present by then
+        meta.indexes = []
+
+        try:
+            for n, constraint in enumerate(unique):
+                if enabled:
+                    meta.constraints = others + unique[:n + 1]
+                    editor.add_constraint(model, constraint)
+                else:
+                    meta.constraints = others + unique[n + 1:]
+                    editor.remove_constraint(model, constraint)
+        finally:
+            meta.indexes, meta.constraints = indexes, constraints
+
+    # ------------------------------------------------------------------
+    # QUERIES (ONE PER ENDPOINT HOT PATH)
+    # ------------------------------------------------------------------
+    def endpoint_queries(self, s):
+        """name → (queryset to EXPLAIN, callable that runs the lookup)"""
+        student = s['student']
+
+        topics = Topic.objects.filter(student=student).select_related('session').order_by(
+            '-session__date', '-session__start_time'
+        )
+        progress = Topic.objects.filter(
+            student=student, session__date__range=(s['today'], s['today'])
+        ).select_related('session').order_by('session__date', 'session__start_time')
+        tasks = Topic.objects.filter(
+            student=student, session__content_type='task'
+        ).select_related('session').order_by('-session__date', '-id')
+        mentor_today = TopicSession.objects.filter(
+            mentor=s['mentor'], date=s['today']
+        ).order_by('-date', '-start_time')
+        attendance = Attendance.objects.filter(
+            student=student, date__range=(s['start'], s['end'])
+        ).order_by()
+        payments = Payment.objects.filter(student=student, status='approved').order_by()
+
+        return {
+            'student_topics_api': (topics, lambda: list(topics.all())),
+            'student_course_progress_api': (progress, lambda: list(progress.all())),
+            'student_task_log_api': (tasks, lambda: list(tasks.all())),
+            'mentor_today_topics': (mentor_today, lambda: list(mentor_today.all())),
+            'student_attendance_dashboard_api': (
+                attendance.filter(status='Present'),
+                lambda: attendance.aggregate(
+                    present=Count('id', filter=Q(status='Present')),
+                    late=Count('id', filter=Q(status='Late')),
+                ),
+            ),
+            'payment_amount_api': (
+                payments,
+                lambda: payments.aggregate(total=Sum('amount_paid')),
+            ),
+        }
+
+    def measure(self, samples, repeat):
+        results = {}
+
+        for name, (queryset, run) in self.endpoint_queries(samples).items():
+            plan = queryset.explain()
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            elapsed = time.perf_counter() - started
+
+            results[name] = {
+                'avg_ms': round(elapsed * 1000 / repeat, 3),
+                'plan': plan,
+            }
+
+        return results
+
+    # ------------------------------------------------------------------
+    # OUTPUT
+    # ------------------------------------------------------------------
+    def print_report(self, report):
+        self.stdout.write(
+            f"\nVendor: {report['vendor']} | students: {report['students']} "
+            f"| days: {report['days']}\n"
+        )
+
+        for name, runs in report['endpoints'].items():
+            before = runs['before']['avg_ms']
+            after = runs['after']['avg_ms']
+            speedup = f'{before / after:.1f}x' if after else '-'
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f'  before: {before} ms   after: {after} ms   ({speedup})')
+            self.stdout.write('  plan before:')
+            for line in runs['before']['plan'].splitlines():
+                self.stdout.write(f'    {line}')
+            self.stdout.write('  plan after:')
+            for line in runs['after']['plan'].splitlines():
+                self.stdout.write(f'    {line}')
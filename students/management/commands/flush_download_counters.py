@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from students.download_counter import download_counter
+
+
+class Command(BaseCommand):
+    help = (
+        'Write buffered Topic.downloads play counts to the database. '
+        'The buffer is per process: call this from a shutdown hook inside the '
+        'serving process (see gunicorn.conf.py).'
+    )
+
+    def handle(self, *args, **options):
+        plays = download_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {plays} buffered plays.'))
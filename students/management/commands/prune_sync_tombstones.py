@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from students.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete sync tombstones older than SYNC_TOMBSTONE_DAYS. '
+        'Run daily (cron); clients with older tokens get a full resync.'
+    )
+
+    def handle(self, *args, **options):
+        removed = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {removed} tombstones older than {settings.SYNC_TOMBSTONE_DAYS} days.'
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from students.attendance_bitmap import rebuild_student_months
+from students.attendance_summary import refresh_attendance_summaries
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Rebuild AttendanceSummary and AttendanceMonth rows from the Attendance table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student',
+            type=int,
+            action='append',
+            dest='students',
+            help='Only rebuild this student id (repeatable)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Students refreshed per batch (default 500)',
+        )
+
+    def handle(self, *args, **options):
+        student_ids = options['students'] or list(
+            Student.objects.order_by('id').values_list('id', flat=True)
+        )
+        chunk_size = options['chunk_size']
+
+        total = 0
+        for i in range(0, len(student_ids), chunk_size):
+            chunk = student_ids[i:i + chunk_size]
+            total += len(refresh_attendance_summaries(chunk))
+            rebuild_student_months(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} attendance summaries.'))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+
+from students.media_refs import (
+    TRACKED_FIELDS,
+    clear_pins,
+    collect,
+    is_content_addressed,
+    rebuild_ref_counts,
+)
+from students.media_store import media_store
+from students.models import MediaBlob
+
+
+class Command(BaseCommand):
+    help = 'Recount MediaBlob references; optionally move legacy uploads into the content-addressed store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dedupe',
+            action='store_true',
+            help='Re-store files saved before the media store under their digest (duplicates collapse to one blob)',
+        )
+        parser.add_argument(
+            '--collect',
+            action='store_true',
+            help='Delete blobs (and files) that nothing references',
+        )
+
+    def handle(self, *args, **options):
+        if options['dedupe']:
+            moved = self.dedupe()
+            self.stdout.write(f'Moved {moved} legacy files into the media store.')
+
+        counts = rebuild_ref_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(counts)} blobs referenced by {sum(counts.values())} rows.'
+        ))
+
+        if options['collect']:
+            orphans = list(MediaBlob.objects.filter(ref_count=0).values_list('name', flat=True))
+            for name in orphans:
+                collect(name)
+            self.stdout.write(f'Deleted {len(orphans)} unreferenced blobs.')
+
+    def dedupe(self):
+        moved = 0
+        legacy = set()
+
+        for model, fields in TRACKED_FIELDS.items():
+            for field in fields:
+                names = (
+                    model.objects
+                    .exclude(**{f'{field}__isnull': True})
+                    .exclude(**{field: ''})
+                    .values_list(field, flat=True)
+                    .distinct()
+                )
+
+                for name in names:
+                    if is_content_addressed(name) or not media_store.exists(name):
+                        continue
+
+                    with media_store.open(name) as fh:
+                        new_name = media_store.save(name, fh)
+
+                    # queryset.update(): no per-row signals, counts are rebuilt after
+                    model.objects.filter(**{field: name}).update(**{field: new_name})
+                    legacy.add(name)
+                    moved += 1
+
+        for name in legacy:
+            media_store.delete(name)
+
+        # No post_save claims the store's pins here; the recount below
+        # sets every ref_count from scratch
+        clear_pins()
+        return moved
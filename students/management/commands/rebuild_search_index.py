@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from students.lookup import rebuild_lookup_keys
+from students.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the session / student search documents and student lookup keys (e.g. after bulk imports)'
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {written} documents.'))
+
+        keys = rebuild_lookup_keys()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {keys} student lookup keys.'))
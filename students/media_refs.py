@@ -0,0 +1,147 @@
+# ======================================================
+# MEDIA BLOB REFERENCE COUNTING
+# ======================================================
+"""
+Every file field stored in the media store counts its references in
+MediaBlob. A blob whose count drops to zero is deleted (row and file)
+once the transaction commits. Hooks are wired in signals.py.
+"""
+import re
+import threading
+
+from django.db import transaction
+from django.db.models import F
+
+from .media_store import media_store
+from .models import MediaBlob, Payment, Student, TaskSubmission, TopicSession
+
+
+TRACKED_FIELDS = {
+    Student: ["profile_photo"],
+    TopicSession: ["video"],
+    TaskSubmission: ["file"],
+    Payment: ["screenshot"],
+}
+
+CONTENT_ADDRESSED_NAME = re.compile(r"(^|/)([0-9a-f]{2})/\2[0-9a-f]{62}(\.[^/]*)?$")
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_NAME.search(name or ""))
+
+
+def file_names(instance):
+    """{field_name: stored name} for the instance's tracked fields."""
+    return {
+        field: getattr(instance, field).name or ""
+        for field in TRACKED_FIELDS.get(type(instance), [])
+    }
+
+
+_pins = threading.local()
+
+
+def _pinned():
+    if not hasattr(_pins, "names"):
+        _pins.names = {}
+    return _pins.names
+
+
+def pin(name):
+    """
+    Reference an existing blob before the media store reuses its name, so
+    a concurrent collect() cannot delete it in between. The next
+    acquire(name) on this thread (the saving row's post_save) uses this
+    reference instead of adding one. False when there is no MediaBlob row
+    (nothing can collect it then).
+    """
+    if not MediaBlob.objects.filter(name=name).update(ref_count=F("ref_count") + 1):
+        return False
+
+    pinned = _pinned()
+    pinned[name] = pinned.get(name, 0) + 1
+    return True
+
+
+def clear_pins(**kwargs):
+    """Drop pins never claimed (the row save failed); end of each request."""
+    _pinned().clear()
+
+
+def acquire(name):
+    if not name:
+        return
+
+    pinned = _pinned()
+    if pinned.get(name):
+        pinned[name] -= 1
+        return
+
+    blob, _ = MediaBlob.objects.get_or_create(
+        name=name,
+        defaults={"size": media_store.size(name) if media_store.exists(name) else 0},
+    )
+    MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+
+
+def release(name):
+    if not name:
+        return
+
+    released = MediaBlob.objects.filter(name=name, ref_count__gt=0).update(
+        ref_count=F("ref_count") - 1
+    )
+    if released:
+        transaction.on_commit(lambda: collect(name))
+
+
+def collect(name):
+    """Delete the blob if nothing references it any more."""
+    with transaction.atomic():
+        blob = (
+            MediaBlob.objects
+            .select_for_update()
+            .filter(name=name, ref_count=0)
+            .first()
+        )
+        if blob is None:
+            return
+
+        blob.delete()
+        media_store.delete(name)
+
+
+def rebuild_ref_counts():
+    """Recount every reference from scratch. Returns {name: count}."""
+    counts = {}
+
+    for model, fields in TRACKED_FIELDS.items():
+        for field in fields:
+            names = (
+                model.objects
+                .exclude(**{f"{field}__isnull": True})
+                .exclude(**{field: ""})
+                .values_list(field, flat=True)
+            )
+            for name in names.iterator():
+                counts[name] = counts.get(name, 0) + 1
+
+    existing = set(MediaBlob.objects.values_list("name", flat=True))
+
+    MediaBlob.objects.bulk_create(
+        [
+            MediaBlob(
+                name=name,
+                size=media_store.size(name) if media_store.exists(name) else 0,
+            )
+            for name in counts.keys() - existing
+        ],
+        ignore_conflicts=True,
+    )
+
+    blobs = list(MediaBlob.objects.all())
+    for blob in blobs:
+        blob.ref_count = counts.get(blob.name, 0)
+    MediaBlob.objects.bulk_update(blobs, ["ref_count"], batch_size=500)
+
+    return counts
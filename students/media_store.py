@@ -0,0 +1,137 @@
+# ======================================================
+# CONTENT-ADDRESSED MEDIA STORE
+# ======================================================
+"""
+Uploads are stored once per distinct content, under their SHA-256:
+
+    topic_videos/lecture.mp4  →  topic_videos/3f/3fa9…e1.mp4
+
+The digest is computed by the upload handlers while the request body
+streams in (no second pass over the file); content saved from elsewhere
+is hashed on save. If a blob with that digest already exists, nothing is
+written and the existing name is reused.
+
+The store is the configured default storage (STORAGES["default"]: local
+files, Cloudinary, S3, ...) with ContentAddressedMixin mixed into its
+class; it is built on first use.
+
+Reference counts live in MediaBlob (see media_refs.py).
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import storages
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+from django.utils.functional import LazyObject
+from django.utils.module_loading import import_string
+
+
+# ======================================================
+# UPLOAD HANDLERS — HASH WHILE STREAMING
+# ======================================================
+class HashingUploadMixin:
+    """Adds `content_sha256` to every file the wrapped handler produces."""
+
+    def new_file(self, *args, **kwargs):
+        # Before super(): MemoryFileUploadHandler raises StopFutureHandlers
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_sha256 = self._sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+
+# ======================================================
+# STORAGE
+# ======================================================
+def content_digest(content):
+    """SHA-256 of a File, reusing the upload handler's digest if present."""
+    digest = getattr(content, "content_sha256", None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+
+    return sha256.hexdigest()
+
+
+def content_addressed_name(name, digest):
+    directory, filename = os.path.split(name)
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join(directory, digest[:2], f"{digest}{ext}").replace("\\", "/")
+
+
+class ContentAddressedMixin:
+    """Mix into any Storage to store each distinct blob once."""
+
+    def save(self, name, content, max_length=None):
+        from .media_refs import pin
+
+        if name is None:
+            name = content.name
+
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        name = content_addressed_name(name, content_digest(content))
+
+        # Take the reference before looking: once pinned, a concurrent
+        # media_refs.collect() can no longer delete the blob under us.
+        # The saving row's post_save then uses this reference.
+        pin(name)
+
+        # Same bytes already stored → reuse, nothing to write
+        if self.exists(name):
+            return name
+
+        return super().save(name, content, max_length=max_length)
+
+
+def build_media_store():
+    """The default storage's backend, content-addressed."""
+    config = storages.backends["default"]
+    backend = import_string(config["BACKEND"])
+
+    store_class = type(
+        f"ContentAddressed{backend.__name__}",
+        (ContentAddressedMixin, backend),
+        {"__module__": __name__},
+    )
+    return store_class(**config.get("OPTIONS", {}))
+
+
+class MediaStore(LazyObject):
+    def _setup(self):
+        self._wrapped = build_media_store()
+
+
+media_store = MediaStore()
+
+
+def get_media_store():
+    return media_store
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:52
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_attendance(apps, schema_editor):
+    """Keep the newest row for every (student, date) pair."""
+    Attendance = apps.get_model("students", "Attendance")
+
+    duplicates = (
+        Attendance.objects
+        .order_by()
+        .values("student_id", "date")
+        .annotate(rows=Count("id"), keep_id=Max("id"))
+        .filter(rows__gt=1)
+    )
+
+    for dup in duplicates:
+        Attendance.objects.filter(
+            student_id=dup["student_id"],
+            date=dup["date"],
+        ).exclude(id=dup["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0030_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attendance, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('student', 'date'), name='unique_attendance_per_student_day'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0033_attendancemonth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopicSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(choices=[('topic', 'Topic'), ('task', 'Task')], default='topic', max_length=10)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('trainer', models.CharField(blank=True, max_length=150, null=True)),
+                ('zoom_link', models.URLField(blank=True, null=True)),
+                ('video', models.FileField(blank=True, null=True, upload_to='topic_videos/')),
+                ('estimated_time', models.FloatField(blank=True, null=True)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('task_notes', models.TextField(blank=True, default='')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='students.batch')),
+                ('mentor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='students.mentor')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['batch', 'date'], name='session_batch_date_idx'),
+                    models.Index(fields=['mentor', 'date'], name='session_mentor_date_idx'),
+                    models.Index(fields=['content_type', 'date'], name='session_ctype_date_idx'),
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name='topic',
+            name='session',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='students.topicsession'),
+        ),
+    ]
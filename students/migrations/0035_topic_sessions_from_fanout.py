@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:00
+
+from django.db import migrations
+
+
+CONTENT_FIELDS = [
+    "content_type",
+    "batch_id",
+    "mentor_id",
+    "title",
+    "description",
+    "date",
+    "start_time",
+    "end_time",
+    "trainer",
+    "zoom_link",
+    "video",
+    "estimated_time",
+    "deadline",
+    "task_notes",
+]
+
+# Fan-out copies of one class differ only in student (and the uploaded
+# video's de-duplicated file name), so these fields identify a session.
+SESSION_KEY = [
+    "batch_id",
+    "mentor_id",
+    "title",
+    "description",
+    "date",
+    "start_time",
+    "end_time",
+    "trainer",
+    "zoom_link",
+]
+
+
+def move_submissions(TaskSubmission, from_topic_id, to_topic_id):
+    """
+    Repoint a duplicate topic's submissions. (topic, student) is unique,
+    so where both rows have one, only the newest submission is kept.
+    """
+    for sub in TaskSubmission.objects.filter(topic_id=from_topic_id).values("id", "student_id", "submitted_at"):
+        other = (
+            TaskSubmission.objects
+            .filter(topic_id=to_topic_id, student_id=sub["student_id"])
+            .values("id", "submitted_at")
+            .first()
+        )
+
+        if other is not None:
+            if (other["submitted_at"], other["id"]) > (sub["submitted_at"], sub["id"]):
+                TaskSubmission.objects.filter(id=sub["id"]).delete()
+                continue
+            TaskSubmission.objects.filter(id=other["id"]).delete()
+
+        TaskSubmission.objects.filter(id=sub["id"]).update(topic_id=to_topic_id)
+
+
+def create_sessions(apps, schema_editor):
+    Topic = apps.get_model("students", "Topic")
+    TopicSession = apps.get_model("students", "TopicSession")
+    TaskSubmission = apps.get_model("students", "TaskSubmission")
+
+    groups = {}
+
+    for row in Topic.objects.order_by("id").values("id", "student_id", "downloads", *CONTENT_FIELDS).iterator():
+        # Tasks are assigned per student: each keeps its own session
+        if row["content_type"] == "task":
+            key = ("task", row["id"])
+        else:
+            key = ("topic",) + tuple(row[f] for f in SESSION_KEY)
+
+        groups.setdefault(key, []).append(row)
+
+    for rows in groups.values():
+        first = rows[0]
+        video = next((r["video"] for r in rows if r["video"]), "")
+
+        session = TopicSession.objects.create(
+            **{f: first[f] for f in CONTENT_FIELDS if f != "video"},
+            video=video,
+        )
+
+        # One progress row per student; fold accidental duplicates into it
+        kept = {}
+        for row in rows:
+            keep = kept.get(row["student_id"])
+
+            if keep is None:
+                kept[row["student_id"]] = row
+                continue
+
+            keep["downloads"] += row["downloads"]
+            move_submissions(TaskSubmission, row["id"], keep["id"])
+            Topic.objects.filter(id=row["id"]).delete()
+            Topic.objects.filter(id=keep["id"]).update(downloads=keep["downloads"])
+
+        Topic.objects.filter(id__in=[r["id"] for r in kept.values()]).update(session_id=session.id)
+
+
+def restore_topic_content(apps, schema_editor):
+    Topic = apps.get_model("students", "Topic")
+
+    for topic in Topic.objects.select_related("session").iterator():
+        session = topic.session
+        for f in CONTENT_FIELDS:
+            setattr(topic, f, getattr(session, f))
+        topic.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0034_topicsession'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sessions, restore_topic_content),
+    ]
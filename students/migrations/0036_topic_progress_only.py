@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0035_topic_sessions_from_fanout'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='topic',
+            name='topic_student_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='topic',
+            name='topic_student_ctype_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='topic',
+            name='topic_mentor_date_idx',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='batch',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='content_type',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='date',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='deadline',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='description',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='end_time',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='estimated_time',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='mentor',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='start_time',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='task_notes',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='title',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='trainer',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='video',
+        ),
+        migrations.RemoveField(
+            model_name='topic',
+            name='zoom_link',
+        ),
+        migrations.AlterField(
+            model_name='topic',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='students.topicsession'),
+        ),
+        migrations.AddIndex(
+            model_name='topic',
+            index=models.Index(fields=['student', 'status'], name='topic_student_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='topic',
+            constraint=models.UniqueConstraint(fields=('session', 'student'), name='unique_topic_per_student_session'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:04
+
+import students.media_store
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0036_topic_progress_only'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='screenshot',
+            field=models.ImageField(storage=students.media_store.get_media_store, upload_to='payment_screenshots/'),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='profile_photo',
+            field=models.ImageField(blank=True, null=True, storage=students.media_store.get_media_store, upload_to='student_photos/'),
+        ),
+        migrations.AlterField(
+            model_name='tasksubmission',
+            name='file',
+            field=models.FileField(storage=students.media_store.get_media_store, upload_to='task_submissions/'),
+        ),
+        migrations.AlterField(
+            model_name='topicsession',
+            name='video',
+            field=models.FileField(blank=True, null=True, storage=students.media_store.get_media_store, upload_to='topic_videos/'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0038_sync_tracking'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='topicsession',
+            name='session_ctype_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='topicsession',
+            index=models.Index(fields=['content_type', 'date', 'start_time', 'id'], name='session_ctype_date_time_idx'),
+        ),
+    ]
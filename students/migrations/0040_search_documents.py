@@ -0,0 +1,129 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:16
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+FTS_TABLE = "students_searchdocument_fts"
+
+# External-content FTS5 table kept in step with students_searchdocument
+SQLITE_FTS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "body, content='students_searchdocument', content_rowid='id', tokenize='trigram')",
+
+    "CREATE TRIGGER students_searchdocument_ai AFTER INSERT ON students_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body); END",
+
+    "CREATE TRIGGER students_searchdocument_ad AFTER DELETE ON students_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body); END",
+
+    "CREATE TRIGGER students_searchdocument_au AFTER UPDATE ON students_searchdocument BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body); "
+    f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body); END",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS students_searchdocument_ai",
+    "DROP TRIGGER IF EXISTS students_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS students_searchdocument_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_TRGM = [
+    "CREATE INDEX search_body_trgm_idx ON students_searchdocument "
+    "USING gin (body gin_trgm_ops)",
+]
+
+POSTGRES_TRGM_DROP = [
+    "DROP INDEX IF EXISTS search_body_trgm_idx",
+]
+
+
+class KeepTrigramExtension(TrigramExtension):
+    """
+    pg_trgm only if it is missing (managed Postgres often lets only a
+    privileged role create it; see README). Unapplying leaves it in place,
+    and never queries pg_extension on other databases.
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_TRGM)
+
+    elif vendor == "sqlite":
+        try:
+            _run(schema_editor, SQLITE_FTS[:1])
+        except Exception:
+            return   # no FTS5 (or no trigram tokenizer): search falls back to LIKE
+        _run(schema_editor, SQLITE_FTS[1:])
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_TRGM_DROP)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_FTS_DROP)
+
+
+def _normalize(*parts):
+    return " ".join(" ".join(str(p) for p in parts if p).lower().split())
+
+
+def build_documents(apps, schema_editor):
+    TopicSession = apps.get_model("students", "TopicSession")
+    Student = apps.get_model("students", "Student")
+    SearchDocument = apps.get_model("students", "SearchDocument")
+
+    documents = [
+        SearchDocument(kind="session", object_id=s.id, body=_normalize(s.title, s.trainer))
+        for s in TopicSession.objects.only("id", "title", "trainer").iterator()
+    ] + [
+        SearchDocument(
+            kind="student",
+            object_id=s.id,
+            body=_normalize(
+                s.user.first_name, s.user.last_name, s.user.username, s.user.email, s.phone
+            ),
+        )
+        for s in Student.objects.select_related("user").iterator()
+    ]
+
+    SearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0039_session_dashboard_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('session', 'Topic Session'), ('student', 'Student')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('body', models.TextField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        KeepTrigramExtension(),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(build_documents, migrations.RunPython.noop),
+    ]
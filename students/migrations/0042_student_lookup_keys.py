@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# LIKE 'prefix%' only uses a btree index with a pattern opclass on
+# non-C collations; SQLite queries the plain index by range instead
+POSTGRES_PATTERN_INDEX = (
+    "CREATE INDEX student_lookup_key_like_idx ON students_studentlookupkey "
+    "(key varchar_pattern_ops)"
+)
+
+
+def create_pattern_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_PATTERN_INDEX)
+
+
+def drop_pattern_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS student_lookup_key_like_idx")
+
+
+def _normalize(*parts):
+    return " ".join(" ".join(str(p) for p in parts if p).lower().split())
+
+
+def build_keys(apps, schema_editor):
+    Student = apps.get_model("students", "Student")
+    StudentLookupKey = apps.get_model("students", "StudentLookupKey")
+
+    rows = []
+    for s in Student.objects.select_related("user").iterator():
+        phone = s.phone or ""
+        keys = {
+            _normalize(s.user.first_name),
+            _normalize(s.user.last_name),
+            _normalize(s.user.first_name, s.user.last_name),
+            _normalize(s.user.username),
+            _normalize(s.user.email),
+            _normalize(phone),
+            "".join(c for c in phone if c.isdigit()),
+        }
+        rows += [StudentLookupKey(student_id=s.id, key=key[:255]) for key in keys if key]
+
+    StudentLookupKey.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0041_student_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentLookupKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lookup_keys', to='students.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'student'], name='student_lookup_key_idx')],
+            },
+        ),
+        migrations.RunPython(create_pattern_index, drop_pattern_index),
+        migrations.RunPython(build_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0043_cache_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['course', 'joining_date', 'id'], name='student_course_joining_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['batch', 'joining_date', 'id'], name='student_batch_joining_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['course', 'valid_upto', 'id'], name='student_course_valid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['batch', 'valid_upto', 'id'], name='student_batch_valid_idx'),
+        ),
+    ]
@@ -2,6 +2,30 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password, check_password
 
+from .media_store import get_media_store
+
+
+# ==================================================
+# CHANGE TRACKING (STUDENT APP SYNC)
+# ==================================================
+class ChangeTracked(models.Model):
+    """
+    `updated_at` for the incremental sync API (see students/sync.py).
+
+    save(update_fields=[...]) still bumps it; queryset .update() and
+    bulk_update() do not, so pass updated_at explicitly there.
+    """
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is not None:
+            update_fields = {*update_fields, "updated_at"}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
 
 # ==================================================
 # CUSTOM ADMIN MODEL
@@ -93,49 +117,55 @@ class Student(models.Model):
     end_date = models.DateField(null=True, blank=True)
     valid_upto = models.DateField(null=True, blank=True)
 
-    profile_photo = models.ImageField(upload_to="student_photos/", null=True, blank=True)
+    profile_photo = models.ImageField(upload_to="student_photos/", storage=get_media_store, null=True, blank=True)
+
+    class Meta:
+        # student_list filters / sorts (newest first within a course or batch;
+        # joining / validity sorts on their own or within a course or batch)
+        indexes = [
+            models.Index(fields=["course", "id"], name="student_course_id_idx"),
+            models.Index(fields=["batch", "id"], name="student_batch_id_idx"),
+            models.Index(fields=["category", "access_type", "id"], name="student_cat_access_idx"),
+            models.Index(fields=["valid_upto", "id"], name="student_valid_upto_idx"),
+            models.Index(fields=["joining_date", "id"], name="student_joining_idx"),
+            models.Index(fields=["course", "joining_date", "id"], name="student_course_joining_idx"),
+            models.Index(fields=["batch", "joining_date", "id"], name="student_batch_joining_idx"),
+            models.Index(fields=["course", "valid_upto", "id"], name="student_course_valid_idx"),
+            models.Index(fields=["batch", "valid_upto", "id"], name="student_batch_valid_idx"),
+        ]
 
     def __str__(self):
         return self.user.username
 
 
 # ==================================================
-# ✅ TOPIC / TASK MODEL (FINAL & ONLY ONE)
+# ✅ TOPIC / TASK SESSION (CONTENT, ONCE PER BATCH)
 # ==================================================
-class Topic(models.Model):
+class TopicSession(ChangeTracked):
+    """
+    One class / task as taught to a batch. The content lives here once;
+    each student gets a thin Topic row (status, downloads) pointing at it.
+    """
 
     CONTENT_TYPE_CHOICES = [
         ("topic", "Topic"),
         ("task", "Task"),
     ]
 
-    STATUS_CHOICES = [
-        ("pending", "Pending"),
-        ("completed", "Completed"),
-        ("not_completed", "Not Completed"),
-        ("review", "Review"),
-    ]
-
     content_type = models.CharField(
         max_length=10,
         choices=CONTENT_TYPE_CHOICES,
         default="topic"
     )
 
-    status = models.CharField(
-        max_length=20,
-        choices=STATUS_CHOICES,
-        default="pending"
-    )
-
-    student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    batch = models.ForeignKey(Batch, on_delete=models.CASCADE)
+    batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name="sessions")
 
     mentor = models.ForeignKey(
         Mentor,
         on_delete=models.SET_NULL,
         null=True,
-        blank=True
+        blank=True,
+        related_name="sessions"
     )
 
     title = models.CharField(max_length=255)
@@ -148,29 +178,81 @@ class Topic(models.Model):
     trainer = models.CharField(max_length=150, null=True, blank=True)
 
     zoom_link = models.URLField(null=True, blank=True)
-    video = models.FileField(upload_to="topic_videos/", null=True, blank=True)
-    downloads = models.IntegerField(default=0)
+    video = models.FileField(upload_to="topic_videos/", storage=get_media_store, null=True, blank=True)
 
     estimated_time = models.FloatField(null=True, blank=True)
     deadline = models.DateField(null=True, blank=True)
     task_notes = models.TextField(blank=True, default="")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["batch", "date"], name="session_batch_date_idx"),
+            models.Index(fields=["mentor", "date"], name="session_mentor_date_idx"),
+            # Matches admin_dashboard's ordering, so a page stops after 10 rows
+            models.Index(
+                fields=["content_type", "date", "start_time", "id"],
+                name="session_ctype_date_time_idx",
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.title} ({self.content_type}) - {self.student.user.username}"
+        return f"{self.title} ({self.content_type}) - {self.batch.batch_name}"
+
+
+# ==================================================
+# ✅ TOPIC / TASK PROGRESS (ONE ROW PER STUDENT)
+# ==================================================
+class Topic(ChangeTracked):
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("completed", "Completed"),
+        ("not_completed", "Not Completed"),
+        ("review", "Review"),
+    ]
+
+    session = models.ForeignKey(TopicSession, on_delete=models.CASCADE, related_name="progress")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending"
+    )
+
+    downloads = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session", "student"],
+                name="unique_topic_per_student_session",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["student", "status"], name="topic_student_status_idx"),
+            models.Index(fields=["student", "updated_at"], name="topic_student_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.session.title} ({self.session.content_type}) - {self.student.user.username}"
 
 
 # ==================================================
 # TASK SUBMISSION MODEL
 # ==================================================
-class TaskSubmission(models.Model):
+class TaskSubmission(ChangeTracked):
     topic = models.ForeignKey(Topic, on_delete=models.CASCADE, related_name="submissions")
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    file = models.FileField(upload_to="task_submissions/")
+    file = models.FileField(upload_to="task_submissions/", storage=get_media_store)
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("topic", "student")
         ordering = ["-submitted_at"]
+        indexes = [
+            models.Index(fields=["student", "updated_at"], name="submission_student_upd_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.topic.title}"
@@ -179,7 +261,7 @@ class TaskSubmission(models.Model):
 # ==================================================
 # ATTENDANCE MODEL
 # ==================================================
-class Attendance(models.Model):
+class Attendance(ChangeTracked):
 
     STATUS_CHOICES = [
         ("Present", "Present"),
@@ -188,6 +270,14 @@ class Attendance(models.Model):
         ("Leave", "Leave"),
     ]
 
+    # Compact numeric codes (heatmaps, packed monthly storage); 0 = not marked
+    STATUS_CODES = {
+        "Present": 1,
+        "Late": 2,
+        "Absent": 3,
+        "Leave": 4,
+    }
+
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.SET_NULL, null=True, blank=True)
     batch = models.ForeignKey(Batch, on_delete=models.SET_NULL, null=True, blank=True)
@@ -200,11 +290,88 @@ class Attendance(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["student", "date", "status"], name="attendance_stu_date_st_idx"),
+            models.Index(fields=["student", "updated_at"], name="attendance_stu_updated_idx"),
+            # admin_attendance_page keyset order ("-date", "-id"), unfiltered
+            # or within a batch / course
+            models.Index(fields=["date", "id"], name="attendance_date_id_idx"),
+            models.Index(fields=["batch", "date", "id"], name="attendance_batch_date_idx"),
+            models.Index(fields=["course", "date", "id"], name="attendance_course_date_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "date"],
+                name="unique_attendance_per_student_day"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.date} - {self.status}"
 
 
+# ==================================================
+# ATTENDANCE SUMMARY (ONE ROW PER STUDENT)
+# ==================================================
+class AttendanceSummary(models.Model):
+    """
+    Pre-computed attendance counts, kept current from Attendance
+    signals (see students/attendance_summary.py).
+    """
+
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="attendance_summary"
+    )
+
+    # Counts inside the course window (joining_date → +3 months)
+    present_days = models.PositiveIntegerField(default=0)
+    late_days = models.PositiveIntegerField(default=0)
+    absent_days = models.PositiveIntegerField(default=0)
+    leave_days = models.PositiveIntegerField(default=0)
+
+    # All records per month → {"2025-01": {"Present": 20, "Late": 1}}
+    monthly = models.JSONField(default=dict, blank=True)
+
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.student.user.username} - attendance summary"
+
+
+# ==================================================
+# ATTENDANCE MONTH (PACKED DAILY STATUS CODES)
+# ==================================================
+class AttendanceMonth(models.Model):
+    """
+    One row per student per month: Attendance.STATUS_CODES for days
+    1–31 packed 3 bits each into 12 bytes (see students/attendance_bitmap.py).
+    """
+
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="attendance_months"
+    )
+    month = models.DateField()   # first day of the month
+    codes = models.BinaryField(max_length=12)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "month"],
+                name="unique_attendance_month"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student.user.username} - {self.month:%Y-%m}"
+
+
 # ==================================================
 # HOLIDAY MODEL
 # ==================================================
@@ -219,7 +386,7 @@ class Holiday(models.Model):
 # ==================================================
 # PAYMENT MODEL
 # ==================================================
-class Payment(models.Model):
+class Payment(ChangeTracked):
 
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -230,7 +397,7 @@ class Payment(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="payments")
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
     utr = models.CharField(max_length=100, unique=True)
-    screenshot = models.ImageField(upload_to="payment_screenshots/")
+    screenshot = models.ImageField(upload_to="payment_screenshots/", storage=get_media_store)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     admin_remark = models.TextField(blank=True, null=True)
@@ -238,6 +405,122 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["student", "status"], name="payment_student_status_idx"),
+            models.Index(fields=["student", "updated_at"], name="payment_student_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - ₹{self.amount_paid} ({self.status})"
+
+
+# ==================================================
+# MEDIA BLOBS (CONTENT-ADDRESSED, REFERENCE COUNTED)
+# ==================================================
+class MediaBlob(models.Model):
+    """One stored file in the media store and how many rows point at it."""
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+# ==================================================
+# SYNC TOMBSTONES (DELETED ROWS)
+# ==================================================
+class SyncTombstone(models.Model):
+    """
+    A deleted Topic / Attendance / TaskSubmission / Payment, kept so the
+    sync API can tell clients to drop it. Pruned after SYNC_TOMBSTONE_DAYS.
+    """
+
+    KIND_CHOICES = [
+        ("topic", "Topic"),
+        ("attendance", "Attendance"),
+        ("submission", "Task Submission"),
+        ("payment", "Payment"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+
+    # No FK constraint: the student may be deleted in the same cascade
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+"
+    )
+
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["student", "deleted_at"], name="tombstone_student_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} deleted"
+
+
+# ==================================================
+# SEARCH DOCUMENTS (SEE students/search.py)
+# ==================================================
+class SearchDocument(models.Model):
+    """Lowercased searchable text for one TopicSession or Student."""
+
+    KIND_CHOICES = [
+        ("session", "Topic Session"),
+        ("student", "Student"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    body = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"],
+                name="unique_search_document",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+
+class StudentLookupKey(models.Model):
+    """
+    One lowercased prefix key per student name / username / email / phone,
+    for the search-as-you-type lookup (students/lookup.py).
+    """
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="lookup_keys")
+    key = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["key", "student"], name="student_lookup_key_idx"),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class CacheVersion(models.Model):
+    """
+    Version stamp for data every process caches for itself (holiday
+    calendar, student lookup). Bumped in the writing transaction, so all
+    workers see a change without sharing a cache backend.
+    """
+
+    key = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
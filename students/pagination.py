@@ -0,0 +1,250 @@
+# ======================================================
+# KEYSET (CURSOR) PAGINATION
+# ======================================================
+"""
+Cursor pagination over a fixed ordering such as ("-date", "-id").
+
+Instead of OFFSET + COUNT(*), each page is fetched with a WHERE clause
+that continues after the last row of the previous page, so page N costs
+the same as page 1. The ordering must end in a unique field (usually id)
+to be stable.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def encode_cursor(values):
+    """Opaque, URL-safe token for a row's ordering values."""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime, time)) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Ordering values from a token, or None if it is missing / invalid."""
+    if not token:
+        return None
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+
+    if not isinstance(values, list) or len(values) != size:
+        return None
+
+    return values
+
+
+def _field(model, path):
+    """Model field behind an ordering entry such as "-session__date"."""
+    field = None
+    for part in path.lstrip("-").split("__"):
+        field = model._meta.get_field(part)
+        model = field.related_model
+    return field
+
+
+def clean_cursor(model, ordering, values):
+    """
+    Cursor values converted to the ordering fields' types, or None if any
+    of them does not fit (a tampered cursor reads as the first page).
+    """
+    if values is None:
+        return None
+
+    cleaned = []
+    for path, value in zip(ordering, values):
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            return None
+        try:
+            field = _field(model, path)
+            value = field.to_python(value)
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+            return None
+        if value is None:
+            return None
+        cleaned.append(value)
+
+    return cleaned
+
+
+def _after(ordering, values):
+    """Rows strictly after `values` in the given ordering."""
+    condition = Q()
+    equal_so_far = Q()
+
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+
+        condition |= equal_so_far & Q(**{f"{name}__{lookup}": value})
+        equal_so_far &= Q(**{name: value})
+
+    return condition
+
+
+def _value(row, field):
+    value = row
+    for part in field.lstrip("-").split("__"):
+        value = getattr(value, part)
+    return value
+
+
+class KeysetPage:
+
+    def __init__(self, items, next_cursor, is_first):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or not self.is_first
+
+
+def keyset_paginate(queryset, ordering, cursor=None, per_page=25):
+    """Return one KeysetPage of `queryset` ordered by `ordering`."""
+    values = clean_cursor(
+        queryset.model, ordering, decode_cursor(cursor, len(ordering))
+    )
+
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(_after(ordering, values))
+
+    # One extra row tells us whether there is a next page (no COUNT)
+    rows = list(queryset[:per_page + 1])
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor([_value(rows[-1], f) for f in ordering])
+
+    return KeysetPage(rows, next_cursor, is_first=values is None)
+
+
+
+# ======================================================
+# ESTIMATED-COUNT PAGINATOR (PAGE NUMBERS, NO BIG COUNT)
+# ======================================================
+def estimate_count(queryset):
+    """
+    Planner row estimate for a queryset (PostgreSQL EXPLAIN), or None
+    where the database has no cheap estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedPage(Page):
+    """A Page that knows for certain whether another page follows."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Drop-in Paginator for big admin lists.
+
+    Below settings.PAGINATOR_EXACT_COUNT_BELOW rows (by planner estimate)
+    it counts exactly, like Paginator. Above it, `count` / `num_pages` are
+    the planner's estimate (`is_estimated`, show them as "about"), and
+    each page fetches per_page + 1 rows so has_next() is still exact.
+    """
+
+    def __init__(self, object_list, per_page, exact_below=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.exact_below = (
+            settings.PAGINATOR_EXACT_COUNT_BELOW if exact_below is None else exact_below
+        )
+        self.is_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list) if hasattr(self.object_list, "query") else None
+
+        if estimate is None or estimate < self.exact_below:
+            return super().count
+
+        self.is_estimated = True
+        return estimate
+
+    def validate_number(self, number):
+        # An estimate can be low: never refuse a page past it
+        if self.count and self.is_estimated:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                raise PageNotAnInteger("That page number is not an integer")
+            if number < 1:
+                raise EmptyPage("That page number is less than 1")
+            return number
+
+        return super().validate_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(
+            rows[:self.per_page], number, self, has_more=len(rows) > self.per_page
+        )
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except InvalidPage:
+            return self.page(self.num_pages)
+
+
+def page_window(page, size=2):
+    """Page numbers to link around the current one (never past a real last page)."""
+    last = page.paginator.num_pages
+    if page.has_next():
+        last = max(last, page.number + 1)
+    else:
+        last = page.number
+
+    return range(max(page.number - size, 1), min(page.number + size, last) + 1)
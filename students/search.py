@@ -0,0 +1,203 @@
+# ======================================================
+# SEARCH INDEX (SESSIONS + STUDENTS)
+# ======================================================
+"""
+One denormalized, lowercased SearchDocument per TopicSession (title,
+trainer) and per Student (name, username, email, phone), kept current
+from signals.py. Two query entry points:
+
+- matching_ids() → every match, as a subquery for `id__in=` filters
+- search_ids()   → the best SEARCH_MAX_RESULTS matches, in rank order,
+  for ordering (ranked()); never use it as a filter, it is capped
+
+Both use the same index:
+
+- PostgreSQL → GIN pg_trgm index on the document; LIKE uses it,
+  ranked by word_similarity()
+- SQLite     → FTS5 table with the trigram tokenizer, ranked by bm25()
+- other databases, or queries under 3 characters (too short for
+  trigrams) → a LIKE on the single document column, newest first
+
+All of them match substrings, like the icontains searches they replace.
+Rebuild everything with `manage.py rebuild_search_index`.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.utils import OperationalError
+
+from .models import SearchDocument, Student, TopicSession
+
+
+FTS_TABLE = "students_searchdocument_fts"
+MIN_INDEXED_LENGTH = 3
+
+KINDS = {
+    TopicSession: "session",
+    Student: "student",
+}
+
+
+def normalize(*parts):
+    return " ".join(" ".join(str(p) for p in parts if p).lower().split())
+
+
+# ======================================================
+# DOCUMENTS
+# ======================================================
+def document_body(instance):
+    if isinstance(instance, TopicSession):
+        return normalize(instance.title, instance.trainer)
+
+    user = instance.user
+    return normalize(
+        user.first_name, user.last_name, user.username, user.email, instance.phone
+    )
+
+
+def index(instance):
+    SearchDocument.objects.update_or_create(
+        kind=KINDS[type(instance)],
+        object_id=instance.pk,
+        defaults={"body": document_body(instance)},
+    )
+
+
+def unindex(instance):
+    SearchDocument.objects.filter(kind=KINDS[type(instance)], object_id=instance.pk).delete()
+
+
+def rebuild_search_index():
+    """Recreate every document. Returns the number written."""
+    documents = [
+        SearchDocument(kind="session", object_id=s.pk, body=document_body(s))
+        for s in TopicSession.objects.only("id", "title", "trainer").iterator()
+    ] + [
+        SearchDocument(kind="student", object_id=s.pk, body=document_body(s))
+        for s in Student.objects.select_related("user").iterator()
+    ]
+
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+    return len(documents)
+
+
+# ======================================================
+# QUERY
+# ======================================================
+def _like_pattern(query):
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _postgres_ids(kind, query, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT object_id FROM students_searchdocument
+            WHERE kind = %s AND body LIKE %s
+            ORDER BY word_similarity(%s, body) DESC, object_id DESC
+            LIMIT %s
+            """,
+            [kind, _like_pattern(query), query, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _phrase(query):
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _sqlite_ids(kind, query, limit):
+    phrase = _phrase(query)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT d.object_id FROM {FTS_TABLE} f
+            JOIN students_searchdocument d ON d.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s AND d.kind = %s
+            ORDER BY bm25({FTS_TABLE}), d.object_id DESC
+            LIMIT %s
+            """,
+            [phrase, kind, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _scan_ids(kind, query, limit):
+    return list(
+        SearchDocument.objects
+        .filter(kind=kind, body__contains=query)
+        .order_by("-object_id")
+        .values_list("object_id", flat=True)[:limit]
+    )
+
+
+def search_ids(kind, query, limit=None):
+    """Ids of `kind` ("session" / "student") matching `query`, best first."""
+    query = normalize(query)
+    limit = limit or settings.SEARCH_MAX_RESULTS
+
+    if not query:
+        return []
+
+    if len(query) >= MIN_INDEXED_LENGTH:
+        if connection.vendor == "postgresql":
+            return _postgres_ids(kind, query, limit)
+
+        if connection.vendor == "sqlite":
+            try:
+                return _sqlite_ids(kind, query, limit)
+            except OperationalError:
+                pass   # SQLite built without FTS5 → plain scan
+
+    return _scan_ids(kind, query, limit)
+
+
+_fts_available = {}
+
+
+def _has_fts():
+    """Whether this SQLite database has the FTS table (checked once per db)."""
+    name = connection.settings_dict["NAME"]
+    if name not in _fts_available:
+        _fts_available[name] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_available[name]
+
+
+def matching_ids(kind, query):
+    """
+    Subquery of every `kind` id matching `query`, uncapped, for
+    `filter(id__in=...)`: the database applies the index itself.
+    """
+    query = normalize(query)
+
+    if len(query) >= MIN_INDEXED_LENGTH and connection.vendor == "sqlite" and _has_fts():
+        return RawSQL(
+            f"""
+            SELECT d.object_id FROM {FTS_TABLE} f
+            JOIN students_searchdocument d ON d.id = f.rowid
+            WHERE {FTS_TABLE} MATCH %s AND d.kind = %s
+            """,
+            [_phrase(query), kind],
+        )
+
+    # PostgreSQL: the pg_trgm GIN index serves this LIKE
+    return (
+        SearchDocument.objects
+        .filter(kind=kind, body__contains=query)
+        .values("object_id")
+    )
+
+
+def ranked(ids, field="pk"):
+    """order_by() expression putting `ids` in the given order (others last)."""
+    return Case(
+        *[When(**{field: pk}, then=Value(position)) for position, pk in enumerate(ids)],
+        default=Value(len(ids)),
+        output_field=IntegerField(),
+    )
@@ -0,0 +1,234 @@
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .attendance_bitmap import month_start, refresh_attendance_months
+from .attendance_summary import refresh_attendance_summaries
+from .media_refs import TRACKED_FIELDS, acquire, clear_pins, release
+from .models import Attendance, Holiday, Student, TopicSession
+from .lookup import index_student, invalidate_lookup_cache
+from .search import index, unindex
+from .sync import TOMBSTONE_KINDS, record_tombstone
+from .working_days import invalidate_working_day_calendar
+
+
+# ======================================================
+# HOLIDAY → REBUILD WORKING-DAY CALENDAR
+# ======================================================
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def holiday_changed(sender, **kwargs):
+    invalidate_working_day_calendar()
+
+
+# ======================================================
+# ATTENDANCE → REFRESH SUMMARY + PACKED MONTHS
+# ======================================================
+def _month_key(student_id, day):
+    if student_id is None or not day:
+        return None
+
+    # Views assign the raw POST string (e.g. edit_attendance)
+    day = Attendance._meta.get_field("date").to_python(day)
+    return (student_id, month_start(day))
+
+
+@receiver(post_init, sender=Attendance)
+def attendance_loaded(sender, instance, **kwargs):
+    # Remember where the row was, so moving its date refreshes both months
+    instance._loaded_month = _month_key(
+        instance.__dict__.get("student_id"),
+        instance.__dict__.get("date"),
+    )
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    months = {
+        _month_key(instance.student_id, instance.date),
+        instance._loaded_month,
+    } - {None}
+
+    refresh_attendance_summaries([instance.student_id])
+    refresh_attendance_months(months)
+
+    instance._loaded_month = _month_key(instance.student_id, instance.date)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+
+    # Skip rows removed by a cascade (e.g. the student itself is deleted)
+    if not (isinstance(origin, Attendance) or getattr(origin, "model", None) is Attendance):
+        return
+
+    refresh_attendance_summaries([instance.student_id])
+    refresh_attendance_months({_month_key(instance.student_id, instance.date)} - {None})
+
+
+# ======================================================
+# STUDENT → CREATE SUMMARY / JOINING DATE MOVES ITS WINDOW
+# ======================================================
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, update_fields=None, **kwargs):
+
+    if update_fields is not None and "joining_date" not in update_fields:
+        return
+
+    refresh_attendance_summaries([instance.id])
+
+
+# ======================================================
+# MEDIA FILES → MEDIABLOB REFERENCE COUNTS
+# ======================================================
+def _stored_names(instance):
+    """Tracked file names straight from __dict__ (never loads deferred fields)."""
+    names = {}
+    for field in TRACKED_FIELDS[type(instance)]:
+        if field in instance.__dict__:
+            value = instance.__dict__[field]
+            names[field] = getattr(value, "name", value) or ""
+    return names
+
+
+def media_loaded(sender, instance, **kwargs):
+    instance._media_names = _stored_names(instance)
+
+
+def media_saved(sender, instance, created, **kwargs):
+    loaded = instance._media_names
+    current = _stored_names(instance)
+
+    for field, name in current.items():
+        old = "" if created else loaded.get(field, name)
+        if name != old:
+            acquire(name)
+            release(old)
+
+    instance._media_names = current
+
+
+def media_deleted(sender, instance, **kwargs):
+    for name in instance._media_names.values():
+        release(name)
+
+
+for _model in TRACKED_FIELDS:
+    post_init.connect(media_loaded, sender=_model, dispatch_uid=f"media_loaded_{_model.__name__}")
+    post_save.connect(media_saved, sender=_model, dispatch_uid=f"media_saved_{_model.__name__}")
+    post_delete.connect(media_deleted, sender=_model, dispatch_uid=f"media_deleted_{_model.__name__}")
+
+request_finished.connect(clear_pins, dispatch_uid="media_clear_pins")
+
+
+
+# ======================================================
+# DELETES → SYNC TOMBSTONES
+# ======================================================
+def synced_row_deleted(sender, instance, origin=None, **kwargs):
+
+    # The student (or their user) is going away: nobody left to sync
+    origin_model = getattr(origin, "model", type(origin))
+    if origin_model in (Student, User):
+        return
+
+    record_tombstone(instance)
+
+
+for _model in TOMBSTONE_KINDS:
+    post_delete.connect(synced_row_deleted, sender=_model, dispatch_uid=f"sync_tombstone_{_model.__name__}")
+
+
+
+# ======================================================
+# SESSIONS / STUDENTS → SEARCH DOCUMENTS
+# ======================================================
+# Also everything lookup_keys() / student_option() read from the user
+USER_SEARCH_FIELDS = {"first_name", "last_name", "username", "email"}
+
+
+@receiver(post_save, sender=TopicSession)
+@receiver(post_save, sender=Student)
+def searchable_saved(sender, instance, **kwargs):
+    index(instance)
+
+
+@receiver(post_delete, sender=TopicSession)
+@receiver(post_delete, sender=Student)
+def searchable_deleted(sender, instance, **kwargs):
+    unindex(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+
+    # e.g. login only touches last_login
+    if update_fields is not None and not USER_SEARCH_FIELDS & set(update_fields):
+        return
+
+    loaded = instance._lookup_fields
+    instance._lookup_fields = _loaded_fields(instance, USER_SHOWN_FIELDS)
+
+    if created or instance._lookup_fields == loaded:
+        return
+
+    student = Student.objects.filter(user=instance).select_related("user").first()
+    if student:
+        index(student)
+
+        # Name / username / email are displayed even when the keys
+        # (lowercased) come out the same
+        if not index_student(student):
+            invalidate_lookup_cache()
+
+
+# ======================================================
+# STUDENTS → LOOKUP KEYS (STUDENT PICKER AUTOCOMPLETE)
+# ======================================================
+# user / phone feed lookup_keys(); course / batch are only displayed
+USER_SHOWN_FIELDS = sorted(USER_SEARCH_FIELDS)
+STUDENT_KEY_FIELDS = ("user_id", "phone")
+STUDENT_SHOWN_FIELDS = ("course_id", "batch_id")
+
+
+def _loaded_fields(instance, fields):
+    # __dict__, not getattr: never loads deferred fields
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+@receiver(post_init, sender=User)
+def user_lookup_loaded(sender, instance, **kwargs):
+    instance._lookup_fields = _loaded_fields(instance, USER_SHOWN_FIELDS)
+
+
+def _student_lookup_fields(student):
+    return (
+        _loaded_fields(student, STUDENT_KEY_FIELDS),
+        _loaded_fields(student, STUDENT_SHOWN_FIELDS),
+    )
+
+
+@receiver(post_init, sender=Student)
+def student_lookup_loaded(sender, instance, **kwargs):
+    instance._lookup_fields = _student_lookup_fields(instance)
+
+
+@receiver(post_save, sender=Student)
+def student_lookup_saved(sender, instance, created, **kwargs):
+    loaded_keys, loaded_shown = instance._lookup_fields
+    keys, shown = instance._lookup_fields = _student_lookup_fields(instance)
+
+    # Payments, joining date, ... leave keys and cached results alone;
+    # index_student() invalidates by itself when the keys change
+    if (created or keys != loaded_keys) and index_student(instance):
+        return
+
+    if shown != loaded_shown:
+        invalidate_lookup_cache()
+
+
+@receiver(post_delete, sender=Student)
+def student_lookup_deleted(sender, instance, **kwargs):
+    # The keys go with the row (CASCADE); only cached results remain
+    invalidate_lookup_cache()
@@ -0,0 +1,94 @@
+# ======================================================
+# INCREMENTAL SYNC FOR THE STUDENT APP
+# ======================================================
+"""
+`/api/student/sync/?since=<token>` returns only what changed for one
+student since the token was issued, plus a new token.
+
+Changes are found through `updated_at` (ChangeTracked models) and
+deletes through SyncTombstone rows written by the post_delete hooks in
+signals.py. Tokens are signed timestamps. Each query reaches back
+SYNC_OVERLAP_SECONDS before the token, so a row committed just after the
+previous sync is not missed; clients upsert by id, so the overlap is
+harmless. A token older than the tombstone retention gets a full sync.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from .models import Attendance, Payment, SyncTombstone, TaskSubmission, Topic
+
+
+TOKEN_SALT = "students.sync"
+
+TOMBSTONE_KINDS = {
+    Topic: "topic",
+    Attendance: "attendance",
+    TaskSubmission: "submission",
+    Payment: "payment",
+}
+
+
+def make_token(moment):
+    return signing.dumps(moment.timestamp(), salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """The token's datetime, or None if it is missing / tampered with."""
+    if not token:
+        return None
+
+    try:
+        value = signing.loads(token, salt=TOKEN_SALT)
+        return datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+    except (signing.BadSignature, TypeError, ValueError, OverflowError):
+        return None
+
+
+def changed_since(token, now=None):
+    """
+    (cutoff, full) for a client token.
+
+    cutoff is None on a full sync: no token, an invalid one, or one older
+    than the tombstones we still keep.
+    """
+    now = now or timezone.now()
+    since = read_token(token)
+
+    if since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        return None, True
+
+    return since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), False
+
+
+def record_tombstone(instance):
+    SyncTombstone.objects.create(
+        kind=TOMBSTONE_KINDS[type(instance)],
+        object_id=instance.pk,
+        student_id=instance.student_id,
+    )
+
+
+def deleted_since(student, cutoff):
+    """{kind: [ids]} deleted after cutoff."""
+    deleted = {kind: [] for kind in TOMBSTONE_KINDS.values()}
+
+    rows = (
+        SyncTombstone.objects
+        .filter(student=student, deleted_at__gt=cutoff)
+        .values_list("kind", "object_id")
+    )
+    for kind, object_id in rows:
+        deleted[kind].append(object_id)
+
+    return deleted
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones past retention. Returns the number removed."""
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
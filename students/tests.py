@@ -1,3 +1,1975 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from io import BytesIO
+from unittest import mock, skipUnless
+from wsgiref.util import FileWrapper
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+import openpyxl
+from dateutil.relativedelta import relativedelta
+
+from .attendance_bitmap import attendance_statuses, pack_month, unpack_month
+from .attendance_summary import get_attendance_summary
+from .cache_versions import bump_version
+from .download_counter import download_counter, flush_downloads
+from .expressions import AddMonths, time_between
+from .media_refs import acquire, is_content_addressed, release
+from .media_store import build_media_store, media_store
+from .lookup import LOOKUP_VERSION_KEY, rebuild_lookup_keys
+from .pagination import (
+    EstimatedCountPaginator, encode_cursor, estimate_count, keyset_paginate, page_window,
+)
+from .search import search_ids
+from .signed_media import signed_media_url
+from .video_streaming import sendfile_response
+from .views import STUDENT_SORT_FIELDS, calculate_6month_attendance
+from .working_days import CALENDAR_VERSION_KEY, WorkingDayCalendar, get_working_day_calendar
+from .models import (
+    Attendance,
+    AttendanceMonth,
+    AttendanceSummary,
+    Batch,
+    Course,
+    Holiday,
+    MediaBlob,
+    Mentor,
+    Payment,
+    Student,
+    StudentLookupKey,
+    SyncTombstone,
+    Topic,
+    TopicSession,
+)
+
+
+# ======================================================
+# WORKING-DAY CALENDAR
+# ======================================================
+class WorkingDayCalendarTests(TestCase):
+
+    def test_weekdays_minus_weekday_holidays(self):
+        calendar = WorkingDayCalendar([
+            date(2026, 1, 26),   # Monday
+            date(2026, 1, 31),   # Saturday: not a working day anyway
+        ])
+
+        # Mon 2026-01-19 .. Sun 2026-02-01: 10 weekdays, one holiday
+        self.assertEqual(calendar.working_days(date(2026, 1, 19), date(2026, 2, 1)), 9)
+
+        # Entirely before / after the holiday span: plain weekdays
+        self.assertEqual(calendar.working_days(date(2026, 1, 5), date(2026, 1, 11)), 5)
+        self.assertEqual(calendar.working_days(date(2026, 3, 2), date(2026, 3, 8)), 5)
+
+        self.assertFalse(calendar.is_working_day(date(2026, 1, 26)))
+        self.assertTrue(calendar.is_working_day(date(2026, 1, 27)))
+        self.assertEqual(calendar.working_days(date(2026, 2, 1), date(2026, 1, 1)), 0)
+
+    def test_matches_a_day_by_day_count(self):
+        holidays = [date(2026, 1, 1), date(2026, 4, 3), date(2026, 8, 15), date(2026, 12, 25)]
+        calendar = WorkingDayCalendar(holidays)
+
+        start = date(2025, 12, 1)
+        for span in (0, 1, 6, 45, 200, 400):
+            end = start + timedelta(days=span)
+            expected = sum(
+                1 for n in range(span + 1)
+                if (start + timedelta(days=n)).weekday() < 5
+                and start + timedelta(days=n) not in holidays
+            )
+            self.assertEqual(calendar.working_days(start, end), expected)
+
+    def test_holiday_changes_rebuild_the_calendar(self):
+        monday = date(2026, 1, 26)
+        self.assertTrue(get_working_day_calendar().is_working_day(monday))
+
+        holiday = Holiday.objects.create(date=monday, name="Republic Day")
+        self.assertFalse(get_working_day_calendar().is_working_day(monday))
+
+        holiday.delete()
+        self.assertTrue(get_working_day_calendar().is_working_day(monday))
+
+    def test_other_workers_see_the_change_without_a_shared_cache(self):
+        monday = date(2026, 1, 26)
+        self.assertTrue(get_working_day_calendar().is_working_day(monday))
+
+        # Another process: writes the row and bumps the stored version,
+        # but cannot touch this process's memory or cache
+        Holiday.objects.bulk_create([Holiday(date=monday, name="Republic Day")])
+        bump_version(CALENDAR_VERSION_KEY)
+        cache.clear()
+
+        self.assertFalse(get_working_day_calendar().is_working_day(monday))
+
+
+# ======================================================
+# SIX-MONTH ATTENDANCE (ADD MONTHS IN THE DATABASE)
+# ======================================================
+class SixMonthAttendanceTests(TestCase):
+
+    def setUp(self):
+        self.course = Course.objects.create(course_name="Python")
+
+    def make_student(self, username, joined):
+        return Student.objects.create(
+            user=User.objects.create_user(username=username, first_name=username),
+            course=self.course,
+            joining_date=joined,
+        )
+
+    def test_add_months_clamps_to_month_end(self):
+        cases = [
+            date(2025, 8, 31),    # + 6 → Feb 28
+            date(2023, 8, 31),    # + 6 → Feb 29 (leap year)
+            date(2025, 3, 31),    # + 6 → Sep 30
+            date(2025, 11, 30),   # + 6 → May 30, across the year
+            date(2025, 1, 15),
+        ]
+        for n, joined in enumerate(cases):
+            self.make_student(f"s{n}", joined)
+
+        for months in (1, 3, 6):
+            rows = Student.objects.annotate(
+                shifted=AddMonths(F("joining_date"), months)
+            ).values_list("joining_date", "shifted")
+
+            for joined, shifted in rows:
+                self.assertEqual(shifted, joined + relativedelta(months=months), (joined, months))
+
+    def test_counts_present_days_inside_each_window(self):
+        student = self.make_student("ravi", date(2025, 8, 31))
+
+        for day, status in [
+            (date(2025, 8, 30), "Present"),   # before joining
+            (date(2025, 9, 1), "Present"),
+            (date(2025, 9, 2), "Absent"),
+            (date(2026, 2, 27), "Present"),
+            (date(2026, 2, 28), "Present"),   # window end, clamped
+            (date(2026, 3, 2), "Present"),    # after the window
+        ]:
+            Attendance.objects.create(student=student, date=day, status=status)
+
+        row = calculate_6month_attendance(per_page=10).object_list[0]
+
+        self.assertEqual(row["present"], 3)
+        self.assertEqual(
+            row["working_days"],
+            WorkingDayCalendar().working_days(date(2025, 8, 31), date(2026, 2, 28)),
+        )
+
+
+# ======================================================
+# ATTENDANCE SUMMARY
+# ======================================================
+class AttendanceSummaryTests(TestCase):
+
+    def setUp(self):
+        self.student = Student.objects.create(
+            user=User.objects.create_user(username="ravi"),
+            joining_date=date(2025, 11, 30),   # window ends 2026-02-28
+        )
+
+    def mark(self, day, status):
+        return Attendance.objects.create(student=self.student, date=day, status=status)
+
+    def summary(self):
+        return AttendanceSummary.objects.get(student=self.student)
+
+    def test_counts_follow_attendance_changes(self):
+        present = self.mark(date(2025, 12, 1), "Present")
+        self.mark(date(2025, 12, 2), "Late")
+        self.mark(date(2026, 1, 5), "Absent")
+        self.mark(date(2026, 2, 28), "Leave")     # last day of the window
+        self.mark(date(2026, 3, 2), "Present")    # after it: monthly only
+
+        summary = self.summary()
+        self.assertEqual(
+            (summary.present_days, summary.late_days, summary.absent_days, summary.leave_days),
+            (1, 1, 1, 1),
+        )
+        self.assertEqual(summary.monthly["2025-12"], {"Present": 1, "Late": 1})
+        self.assertEqual(summary.monthly["2026-03"], {"Present": 1})
+        self.assertEqual((summary.first_date, summary.last_date), (date(2025, 12, 1), date(2026, 3, 2)))
+
+        present.status = "Absent"
+        present.save()
+        summary = self.summary()
+        self.assertEqual((summary.present_days, summary.absent_days), (0, 2))
+
+        present.delete()
+        summary = self.summary()
+        self.assertEqual(summary.absent_days, 1)
+        self.assertEqual(summary.monthly["2025-12"], {"Late": 1})
+
+    def test_moving_the_joining_date_moves_the_window(self):
+        self.mark(date(2026, 3, 2), "Present")
+        self.assertEqual(self.summary().present_days, 0)
+
+        self.student.joining_date = date(2026, 3, 1)
+        self.student.save(update_fields=["joining_date"])
+        self.assertEqual(self.summary().present_days, 1)
+
+    def test_built_on_first_use(self):
+        self.mark(date(2025, 12, 1), "Present")
+        AttendanceSummary.objects.all().delete()
+
+        self.student.refresh_from_db()
+        self.assertEqual(get_attendance_summary(self.student).present_days, 1)
+
+
+# ======================================================
+# BULK ATTENDANCE — WHOLE BATCH
+# ======================================================
+class BulkAttendanceTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+        self.students = [
+            Student.objects.create(
+                user=User.objects.create_user(username=f"s{n}", first_name=f"S{n}"),
+                course=course,
+                batch=self.batch,
+                joining_date=date(2026, 1, 1),
+            )
+            for n in range(3)
+        ]
+        Attendance.objects.create(
+            student=self.students[0], course=course, batch=self.batch,
+            date=date(2026, 1, 5), status="Absent",
+        )
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def post(self, payload):
+        return self.client.post(
+            "/attendance/bulk/", json.dumps(payload), content_type="application/json",
+        )
+
+    def test_inserts_updates_and_skips_in_one_call(self):
+        s0, s1, s2 = self.students
+
+        response = self.post({
+            "batch": self.batch.id,
+            "date": "2026-01-05",
+            "statuses": {str(s0.id): "Present", str(s1.id): "Late", "999": "Present", "x": "Late"},
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["inserted"], 1)
+        self.assertEqual(response.json()["updated"], 1)
+        self.assertEqual(response.json()["skipped"], 2)
+        self.assertEqual(
+            dict(Attendance.objects.values_list("student_id", "status")),
+            {s0.id: "Present", s1.id: "Late"},
+        )
+        self.assertEqual(AttendanceSummary.objects.get(student=s1).late_days, 1)
+
+    def test_malformed_payloads_are_rejected(self):
+        s0 = self.students[0]
+
+        for payload in (
+            [1, 2],
+            "Present",
+            None,
+            {"batch": [self.batch.id], "date": "2026-01-05", "statuses": {str(s0.id): "Present"}},
+            {"batch": "B1", "date": "2026-01-05", "statuses": {str(s0.id): "Present"}},
+            {"batch": self.batch.id, "date": "2026-01-05", "statuses": [s0.id]},
+            {"batch": self.batch.id, "date": "2026-01-05", "statuses": {str(s0.id): ["Present"]}},
+            {"batch": self.batch.id, "date": "2026-01-05", "statuses": {str(s0.id): "Present"}, "remark": 5},
+            {"batch": self.batch.id, "date": "05/01/2026", "statuses": {str(s0.id): "Present"}},
+        ):
+            with self.subTest(payload=payload):
+                self.assertEqual(self.post(payload).status_code, 400)
+
+        self.assertEqual(Attendance.objects.get(student=s0).status, "Absent")
+
+    def test_students_cannot_mark_a_batch(self):
+        self.client.force_login(self.students[1].user)
+
+        response = self.post({
+            "batch": self.batch.id, "date": "2026-01-05", "statuses": {str(self.students[1].id): "Present"},
+        })
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Attendance.objects.filter(student=self.students[1]).exists())
+
+    def test_unknown_batch_is_a_json_404(self):
+        response = self.post({"batch": 999, "date": "2026-01-05", "statuses": {}})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["status"], "error")
+
+    def test_attendance_page_lists_the_batch_for_marking(self):
+        response = self.client.get("/attendance/", {"batch": self.batch.id, "date": "2026-01-05"})
+
+        self.assertContains(response, 'id="bulkAttendanceForm"')
+        self.assertEqual(
+            [(s.id, status) for s, status in response.context["bulk_students"]],
+            [(self.students[0].id, "Absent"), (self.students[1].id, "Present"), (self.students[2].id, "Present")],
+        )
+
+
+# ======================================================
+# ATTENDANCE EXCEL EXPORT
+# ======================================================
+class AttendanceExportTests(TestCase):
+
+    def test_export_writes_every_filtered_row(self):
+        course = Course.objects.create(course_name="Python")
+        batch = Batch.objects.create(batch_name="B1", course=course)
+        other = Batch.objects.create(batch_name="B2", course=course)
+
+        for n in range(5):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f"s{n}", first_name=f"S{n}"),
+                course=course,
+                batch=batch if n < 4 else other,
+            )
+            Attendance.objects.create(
+                student=student, course=course, batch=student.batch,
+                date=date(2026, 1, 5 + n), status="Present", remark="ok" if n == 0 else None,
+            )
+
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+        with mock.patch("students.views.EXPORT_CHUNK_SIZE", 2):
+            response = self.client.post(f"/admin-attendance/?batch={batch.id}", {"export": "1"})
+
+        self.assertIn("attachment", response["Content-Disposition"])
+
+        sheet = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        rows = list(sheet.iter_rows(values_only=True))
+
+        self.assertEqual(rows[0], ("Date", "Student", "Course", "Batch", "Status", "Remark"))
+        self.assertEqual(
+            rows[1:],
+            [
+                ("2026-01-08", "S3", "Python", "B1", "Present", None),
+                ("2026-01-07", "S2", "Python", "B1", "Present", None),
+                ("2026-01-06", "S1", "Python", "B1", "Present", None),
+                ("2026-01-05", "S0", "Python", "B1", "Present", "ok"),
+            ],
+        )
+
+
+# ======================================================
+# ADMIN ATTENDANCE — KEYSET PAGINATION
+# ======================================================
+class AttendanceKeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        batch = Batch.objects.create(batch_name="B1", course=course)
+
+        # Three students per day, so pages have to break inside a date
+        for n in range(7):
+            student = Student.objects.create(
+                user=User.objects.create_user(username=f"s{n}"),
+                course=course,
+                batch=batch,
+            )
+            Attendance.objects.create(
+                student=student, course=course, batch=batch,
+                date=date(2026, 1, 5 + n // 3), status="Present",
+            )
+
+        self.ordering = ("-date", "-id")
+        self.expected = list(Attendance.objects.order_by(*self.ordering))
+
+    def page(self, cursor=None):
+        return keyset_paginate(Attendance.objects.all(), self.ordering, cursor=cursor, per_page=3)
+
+    def test_cursor_walks_every_row_once(self):
+        rows = []
+        page = self.page()
+        self.assertTrue(page.is_first)
+
+        while True:
+            rows += page.items
+            if not page.has_next:
+                break
+            page = self.page(page.next_cursor)
+            self.assertFalse(page.is_first)
+
+        self.assertEqual(rows, self.expected)
+
+    def test_tampered_cursor_reads_as_the_first_page(self):
+        for values in (
+            ["not-a-date", 5],
+            [20260105, 5],
+            ["2026-01-05", "five"],
+            ["2026-01-05", None],
+            ["2026-01-05", [5]],
+            ["2026-01-05", {"id": 5}],
+            ["2026-01-05"],
+        ):
+            with self.subTest(values=values):
+                page = self.page(encode_cursor(values))
+                self.assertTrue(page.is_first)
+                self.assertEqual(page.items, self.expected[:3])
+
+        self.assertTrue(self.page("%%%garbage").is_first)
+
+    @skipUnless(connection.vendor == "sqlite", "reads SQLite's query plan")
+    def test_pages_are_read_from_an_index(self):
+        batch = Batch.objects.get()
+        cursor = self.page().next_cursor
+
+        for label, queryset in (
+            ("all", Attendance.objects.all()),
+            ("batch", Attendance.objects.filter(batch=batch)),
+        ):
+            for token in (None, cursor):
+                with self.subTest(filter=label, cursor=token):
+                    with CaptureQueriesContext(connection) as queries:
+                        keyset_paginate(queryset, self.ordering, cursor=token, per_page=3)
+
+                    with connection.cursor() as db:
+                        db.execute(f"EXPLAIN QUERY PLAN {queries[-1]['sql']}")
+                        plan = " ".join(row[-1] for row in db.fetchall())
+
+                    self.assertIn("USING INDEX attendance_", plan)
+                    self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_admin_page_survives_a_tampered_cursor(self):
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+        response = self.client.get(
+            "/admin-attendance/", {"month": "2026-01", "cursor": encode_cursor(["x", "y"])},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["records"]), 7)
+
+
+# ======================================================
+# BATCH ATTENDANCE HEATMAP
+# ======================================================
+class BatchHeatmapTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+        other = Batch.objects.create(batch_name="B2", course=course)
+
+        anu, ravi, outsider = [
+            Student.objects.create(
+                user=User.objects.create_user(username=name.lower(), first_name=name),
+                course=course,
+                batch=batch,
+            )
+            for name, batch in (("Anu", self.batch), ("Ravi", self.batch), ("Zed", other))
+        ]
+
+        # Mon 2026-01-05 .. Sun 2026-01-11, Thursday a holiday
+        for student, day, status in [
+            (anu, 5, "Present"), (anu, 6, "Late"), (anu, 7, "Absent"),
+            (anu, 8, "Present"), (anu, 9, "Present"), (anu, 10, "Present"),
+            (anu, 12, "Present"),        # outside the range
+            (ravi, 5, "Leave"),
+            (outsider, 5, "Present"),    # other batch
+        ]:
+            Attendance.objects.create(student=student, date=date(2026, 1, day), status=status)
+
+        Holiday.objects.create(date=date(2026, 1, 8), name="Holiday")
+
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def heatmap(self, **params):
+        return self.client.get(
+            f"/api/batch/{self.batch.id}/attendance-heatmap/",
+            {"from_date": "2026-01-05", "to_date": "2026-01-11", **params},
+        ).json()
+
+    def test_cells_land_in_student_rows_and_day_columns(self):
+        data = self.heatmap()
+
+        self.assertEqual((data["rows"], data["columns"]), (2, 7))
+        self.assertEqual(
+            list(base64.b64decode(data["matrix"])),
+            [1, 2, 3, 1, 1, 1, 0,    # Anu
+             4, 0, 0, 0, 0, 0, 0],   # Ravi
+        )
+        self.assertEqual(
+            self.heatmap(encoding="rle")["matrix"],
+            [[1, 1], [2, 1], [3, 1], [1, 3], [0, 1], [4, 1], [0, 6]],
+        )
+
+    def test_stats_count_working_days_only(self):
+        data = self.heatmap()
+        anu = data["students"][0]
+
+        self.assertEqual(data["days"]["working"], [1, 1, 1, 0, 1, 0, 0])
+
+        # Thursday (holiday) and Saturday marks are not counted
+        self.assertEqual((anu["present"], anu["late"], anu["absent"]), (2, 1, 1))
+        self.assertEqual(anu["attendance_rate"], 75.0)
+        self.assertEqual(anu["late_ratio"], 33.33)
+        self.assertEqual((anu["current_streak"], anu["longest_streak"]), (1, 2))
+
+        self.assertEqual(data["students"][1]["leave"], 1)
+        self.assertEqual(data["days"]["attendance_rate"][:3], [50.0, 50.0, 0])
+        self.assertEqual(data["days"]["late_ratio"][:2], [0, 100.0])
+
+
+# ======================================================
+# PACKED MONTHLY ATTENDANCE
+# ======================================================
+class AttendanceBitmapTests(TestCase):
+
+    def test_pack_round_trip_every_status_and_day(self):
+        codes = sorted(Attendance.STATUS_CODES.values())
+
+        for code in codes:
+            for day in (1, 31):
+                self.assertEqual(unpack_month(pack_month({day: code}))[day - 1], code)
+
+        # Every day set, neighbouring slots must not bleed into each other
+        month = {day: codes[day % len(codes)] for day in range(1, 32)}
+        packed = pack_month(month)
+
+        self.assertEqual(len(packed), 12)
+        self.assertEqual(unpack_month(packed), [month[day] for day in range(1, 32)])
+        self.assertEqual(unpack_month(pack_month({})), [0] * 31)
+
+    def test_rows_follow_attendance_and_decode_by_date(self):
+        student = Student.objects.create(user=User.objects.create_user(username="ravi"))
+
+        first = Attendance.objects.create(student=student, date=date(2026, 1, 1), status="Present")
+        Attendance.objects.create(student=student, date=date(2026, 1, 31), status="Leave")
+        Attendance.objects.create(student=student, date=date(2026, 2, 1), status="Late")
+
+        self.assertEqual(
+            attendance_statuses(student.id, date(2026, 1, 1), date(2026, 2, 28)),
+            {
+                date(2026, 1, 1): "Present",
+                date(2026, 1, 31): "Leave",
+                date(2026, 2, 1): "Late",
+            },
+        )
+
+        # Moving a record to another month rewrites both rows
+        first.date = date(2026, 2, 2)
+        first.save()
+        self.assertEqual(
+            attendance_statuses(student.id, date(2026, 1, 1), date(2026, 1, 31)),
+            {date(2026, 1, 31): "Leave"},
+        )
+
+        # A month's last record removed → its row goes too
+        Attendance.objects.filter(date__month=1).get().delete()
+        self.assertEqual(
+            list(AttendanceMonth.objects.values_list("month", flat=True)),
+            [date(2026, 2, 1)],
+        )
+
+
+# ======================================================
+# STUDENT ATTENDANCE DASHBOARD API
+# ======================================================
+class StudentAttendanceDashboardApiTests(TestCase):
+
+    url = "/api/student/attendance-dashboard/"
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.week_start = self.today - timedelta(days=self.today.weekday())
+
+        course = Course.objects.create(course_name="Python")
+        batch = Batch.objects.create(batch_name="B1", course=course)
+
+        self.user = User.objects.create_user(username="stud", first_name="Stud")
+        self.student = Student.objects.create(
+            user=self.user,
+            course=course,
+            batch=batch,
+            joining_date=self.week_start - timedelta(days=14),
+        )
+
+    def mark(self, day, status):
+        Attendance.objects.create(student=self.student, date=day, status=status)
+
+    def get(self):
+        return self.client.get(self.url, {"user_id": self.user.id})
+
+    def test_weekly_strip_and_counts(self):
+        self.mark(self.week_start, "Present")
+        self.mark(self.week_start + timedelta(days=1), "Late")
+        self.mark(self.week_start + timedelta(days=2), "Leave")
+        self.mark(self.week_start - timedelta(days=7), "Absent")
+
+        data = self.get().json()
+
+        self.assertEqual(data["summary"], {
+            "total_attendance": 4,
+            "late_days": 1,
+            "absent_days": 1,
+        })
+
+        week = data["weekly_attendance"]
+        self.assertEqual(len(week), 7)
+        self.assertEqual(
+            [(d["status"], d["value"]) for d in week[:4]],
+            [("Present", 1), ("Late", 0.5), ("Leave", 0), ("Absent", 0)],
+        )
+        self.assertEqual(week[0]["date"], self.week_start.isoformat())
+
+    def test_query_count_stays_at_two(self):
+        for i in range(30):
+            day = self.student.joining_date + timedelta(days=i)
+            self.mark(day, "Present" if i % 3 else "Late")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), 2)
+
+    def test_query_count_without_attendance(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), 2)
+
+
+# ======================================================
+# VIDEO STREAM — RANGE REQUESTS
+# ======================================================
+class VideoMediaTestCase(TestCase):
+
+    size = 5 * 1024 * 1024 + 123   # a few MB, not a multiple of the chunk size
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+
+        cls.payload = os.urandom(cls.size)
+        os.makedirs(os.path.join(cls.media_root, "topic_videos"))
+        with open(os.path.join(cls.media_root, "topic_videos", "lecture.mp4"), "wb") as fh:
+            fh.write(cls.payload)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        batch = Batch.objects.create(batch_name="B1", course=course)
+        user = User.objects.create_user(username="viewer")
+        student = Student.objects.create(user=user, course=course, batch=batch)
+
+        session = TopicSession.objects.create(
+            batch=batch,
+            title="Lecture",
+            description="",
+            date=timezone.localdate(),
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            video="topic_videos/lecture.mp4",
+        )
+        self.topic = Topic.objects.create(session=session, student=student)
+        self.url = f"/api/student/video/stream/{self.topic.id}/"
+
+        # Plays are buffered per process: write them (and stop the flush
+        # timer) inside this test's transaction
+        self.addCleanup(download_counter.flush)
+
+    def get(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+
+class StreamVideoRangeTests(VideoMediaTestCase):
+
+    def test_full_file_without_range(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(int(response["Content-Length"]), self.size)
+        self.assertEqual(self.body(response), self.payload)
+
+    def test_seek_into_middle(self):
+        start, end = 3 * 1024 * 1024 + 7, 3 * 1024 * 1024 + 200_000
+        response = self.get(Range=f"bytes={start}-{end}")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{self.size}")
+        self.assertEqual(int(response["Content-Length"]), end - start + 1)
+        self.assertEqual(self.body(response), self.payload[start:end + 1])
+
+    def test_open_ended_and_suffix_ranges(self):
+        start = self.size - 70_000
+        response = self.get(Range=f"bytes={start}-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.payload[start:])
+
+        response = self.get(Range="bytes=-500")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes {self.size - 500}-{self.size - 1}/{self.size}")
+        self.assertEqual(self.body(response), self.payload[-500:])
+
+    def test_end_past_eof_is_clamped(self):
+        response = self.get(Range=f"bytes=100-{self.size * 2}")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-{self.size - 1}/{self.size}")
+        self.assertEqual(self.body(response), self.payload[100:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range=f"bytes={self.size}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{self.size}")
+
+    def test_malformed_range_serves_whole_file(self):
+        response = self.get(Range="bytes=abc-def")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), self.size)
+
+    def test_multiple_ranges(self):
+        response = self.get(Range="bytes=0-99,2000000-2000099")
+
+        self.assertEqual(response.status_code, 206)
+        boundary = re.search(r"boundary=(\w+)", response["Content-Type"]).group(1)
+
+        body = self.body(response)
+        self.assertEqual(int(response["Content-Length"]), len(body))
+
+        parts = body.split(f"--{boundary}".encode())[1:-1]
+        self.assertEqual(len(parts), 2)
+
+        head, data = parts[1].split(b"\r\n\r\n", 1)
+        self.assertIn(f"Content-Range: bytes 2000000-2000099/{self.size}".encode(), head)
+        self.assertEqual(data[:-2], self.payload[2000000:2000100])
+
+    def test_if_range_validation(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(Range="bytes=10-19", **{"If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.payload[10:20])
+
+        response = self.get(Range="bytes=10-19", **{"If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["Content-Length"]), self.size)
+
+
+# ======================================================
+# VIDEO STREAM — DELIVERY BACKENDS
+# ======================================================
+class StreamVideoDeliveryBackendTests(VideoMediaTestCase):
+
+    @override_settings(VIDEO_DELIVERY_BACKEND="x-accel", VIDEO_ACCEL_REDIRECT_PREFIX="/protected-media/")
+    def test_x_accel_redirect(self):
+        response = self.get(Range="bytes=0-99")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/topic_videos/lecture.mp4")
+        self.assertEqual(response.content, b"")
+
+    @override_settings(VIDEO_DELIVERY_BACKEND="x-sendfile")
+    def test_x_sendfile(self):
+        response = self.get()
+
+        self.assertEqual(response["X-Sendfile"], self.topic.session.video.path)
+        self.assertEqual(response.content, b"")
+
+    def sendfile(self, range_header):
+        # Direct call: the test client replaces streaming_content, which
+        # drops the file object a real server's file_wrapper receives
+        request = RequestFactory().get(self.url, headers={"Range": range_header})
+        return sendfile_response(request, self.topic.session.video.path, "video/mp4")
+
+    def test_sendfile_body_stops_at_content_length(self):
+        start, end = 1_000_000, 1_999_999
+        response = self.sendfile(f"bytes={start}-{end}")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{self.size}")
+        self.assertEqual(int(response["Content-Length"]), end - start + 1)
+
+        # wsgiref's file_wrapper reads to EOF; the range must still end at `end`
+        body = b"".join(FileWrapper(response.file_to_stream))
+        self.assertEqual(len(body), int(response["Content-Length"]))
+        self.assertEqual(body, self.payload[start:end + 1])
+        self.assertFalse(hasattr(response.file_to_stream, "fileno"))
+        response.close()
+
+    def test_sendfile_offers_fileno_only_up_to_eof(self):
+        response = self.sendfile("bytes=1000-")
+
+        self.assertEqual(int(response["Content-Length"]), self.size - 1000)
+        self.assertTrue(hasattr(response.file_to_stream, "fileno"))
+        self.assertEqual(b"".join(FileWrapper(response.file_to_stream)), self.payload[1000:])
+        response.close()
+
+    @override_settings(VIDEO_DELIVERY_BACKEND="sendfile")
+    def test_sendfile_through_the_view(self):
+        response = self.client.get(
+            self.url,
+            headers={"Range": "bytes=10-19"},
+            **{"wsgi.file_wrapper": FileWrapper},
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.payload[10:20])
+
+    @override_settings(VIDEO_DELIVERY_BACKEND="sendfile")
+    def test_sendfile_without_file_wrapper_falls_back(self):
+        response = self.get(Range="bytes=10-19")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.payload[10:20])
+
+
+# ======================================================
+# SIGNED VIDEO URLS
+# ======================================================
+class SignedVideoUrlTests(VideoMediaTestCase):
+
+    def issue(self):
+        response = self.client.get(
+            f"/api/student/video/url/{self.topic.id}/",
+            {"user_id": self.topic.student.user_id},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["url"]
+
+    def test_signed_url_serves_ranges(self):
+        url = self.issue()
+
+        response = self.client.get(url, headers={"Range": "bytes=10-19"})
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), self.payload[10:20])
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+    def test_tampered_signature_is_rejected(self):
+        url = self.issue().replace("signature=", "signature=0")
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_expired_link_is_rejected(self):
+        with mock.patch("students.signed_media.time.time", return_value=0):
+            url = self.issue()
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_cloudinary_link_uses_the_storage_resource_type(self):
+        from cloudinary_storage.storage import VideoMediaCloudinaryStorage
+
+        video = mock.Mock(storage=VideoMediaCloudinaryStorage(), name="topic_videos/a.mp4")
+        video.name = "topic_videos/a.mp4"
+
+        with mock.patch("cloudinary.utils.private_download_url", return_value="https://cdn/a") as signed:
+            url, expires = signed_media_url(video)
+
+        self.assertEqual(url, "https://cdn/a")
+        signed.assert_called_once_with(
+            "topic_videos/a", "mp4", resource_type="video", type="upload", expires_at=expires,
+        )
+
+    def test_other_students_cannot_issue(self):
+        other = User.objects.create_user(username="other")
+
+        response = self.client.get(
+            f"/api/student/video/url/{self.topic.id}/",
+            {"user_id": other.id},
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+# ======================================================
+# VIDEO STREAM — ASYNC (ASGI)
+# ======================================================
+class AsyncStreamVideoTests(VideoMediaTestCase):
+
+    async def aget(self, **headers):
+        return await self.async_client.get(
+            f"/api/student/video/stream-async/{self.topic.id}/",
+            headers=headers,
+        )
+
+    async def abody(self, response):
+        self.assertTrue(response.is_async)
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    async def test_full_file(self):
+        response = await self.aget()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await self.abody(response), self.payload)
+
+    async def test_range(self):
+        response = await self.aget(Range="bytes=4000000-4100000")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(await self.abody(response), self.payload[4000000:4100001])
+
+    def test_wsgi_gets_a_sync_body(self):
+        response = self.client.get(
+            f"/api/student/video/stream-async/{self.topic.id}/",
+            headers={"Range": "bytes=10-19"},
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertFalse(response.is_async)
+        self.assertEqual(self.body(response), self.payload[10:20])
+
+    async def test_multiple_ranges(self):
+        response = await self.aget(Range="bytes=0-9,100-109")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(int(response["Content-Length"]), len(await self.abody(response)))
+
+
+# ======================================================
+# BUFFERED DOWNLOAD COUNTERS
+# ======================================================
+@override_settings(DOWNLOAD_COUNTER_FLUSH_EVERY=1000, DOWNLOAD_COUNTER_FLUSH_SECONDS=3600)
+class DownloadCounterTests(VideoMediaTestCase):
+
+    def setUp(self):
+        download_counter.flush()   # drop plays buffered by other tests
+        super().setUp()
+
+    def downloads(self):
+        self.topic.refresh_from_db(fields=["downloads"])
+        return self.topic.downloads
+
+    def test_plays_are_buffered_then_flushed_in_one_update(self):
+        for _ in range(5):
+            self.get()
+        self.get(Range="bytes=1000-")   # a seek, not a new play
+
+        self.assertEqual(self.downloads(), 0)
+        self.assertEqual(download_counter.pending(), {self.topic.id: 5})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(flush_downloads(), 5)
+
+        self.assertEqual(len([q for q in queries if q["sql"].startswith("UPDATE")]), 1)
+        self.assertEqual(self.downloads(), 5)
+        self.assertEqual(download_counter.pending(), {})
+
+    @override_settings(DOWNLOAD_COUNTER_FLUSH_EVERY=3)
+    def test_flushes_every_n_plays(self):
+        for _ in range(3):
+            self.get()
+
+        self.assertEqual(self.downloads(), 3)
+
+    @override_settings(DOWNLOAD_COUNTER_FLUSH_SECONDS=0.05)
+    def test_quiet_worker_flushes_after_the_time_limit(self):
+        with mock.patch.object(download_counter, "flush") as flush:
+            self.get()
+            download_counter._timer.join(5)
+
+        flush.assert_called_once_with(quiet=True)
+        self.assertEqual(download_counter.pending(), {self.topic.id: 1})
+
+    def test_reports_include_buffered_plays(self):
+        self.get()
+        self.get()
+
+        response = self.client.get("/reports/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["report_data"][0]["downloads"], 2)
+
+    @override_settings(DOWNLOAD_COUNTER_FLUSH_EVERY=2)
+    def test_failed_flush_does_not_break_playback(self):
+        with mock.patch.object(Topic.objects, "filter", side_effect=DatabaseError):
+            with self.assertLogs("students.download_counter", "ERROR"):
+                self.assertEqual(self.get().status_code, 200)
+                self.assertEqual(self.get().status_code, 200)
+
+        # Kept for the next flush
+        self.assertEqual(download_counter.pending(), {self.topic.id: 2})
+        self.assertEqual(flush_downloads(), 2)
+        self.assertEqual(self.downloads(), 2)
+
+
+# ======================================================
+# TOPIC SESSIONS (CONTENT ONCE, PROGRESS PER STUDENT)
+# ======================================================
+class TopicSessionTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+
+        self.students = [
+            Student.objects.create(
+                user=User.objects.create_user(username=f"s{i}", first_name=f"S{i}"),
+                course=course,
+                batch=self.batch,
+                joining_date=timezone.localdate(),
+            )
+            for i in range(3)
+        ]
+
+        self.admin = User.objects.create_superuser(username="admin", password="pw")
+        self.client.force_login(self.admin)
+
+    def add_topic(self):
+        return self.client.post("/add_topic/", {
+            "batch": self.batch.id,
+            "title": "Loops",
+            "description": "for / while",
+            "date": timezone.localdate().isoformat(),
+            "start_time": "10:00",
+            "end_time": "11:30",
+        })
+
+    def test_add_topic_stores_content_once(self):
+        self.add_topic()
+
+        session = TopicSession.objects.get()
+        self.assertEqual(session.title, "Loops")
+        self.assertEqual(
+            sorted(session.progress.values_list("student_id", flat=True)),
+            sorted(s.id for s in self.students),
+        )
+
+    def test_dashboard_lists_one_row_per_session(self):
+        self.add_topic()
+        Topic.objects.filter(student=self.students[0]).update(status="completed")
+
+        response = self.client.get("/admindashboard/")
+
+        rows = list(response.context["topics"])
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0].student_count, rows[0].completed_count), (3, 1))
+
+    def test_edit_updates_every_student_at_once(self):
+        self.add_topic()
+        session = TopicSession.objects.get()
+
+        self.client.post(f"/edit_topic/{session.id}/", {
+            "title": "Loops & Ranges",
+            "description": "for / while",
+            "date": session.date.isoformat(),
+            "start_time": "10:00",
+            "end_time": "11:30",
+            "status": "",
+        })
+
+        response = self.client.get(
+            "/api/student/course-progress/",
+            {"user_id": self.students[2].user_id},
+        )
+        self.assertEqual(response.json()["topics"][0]["topic"], "Loops & Ranges")
+        self.assertEqual(response.json()["topics"][0]["hours"], "1h 30m")
+
+
+# ======================================================
+# CONTENT-ADDRESSED MEDIA STORE
+# ======================================================
+class MediaStoreTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def add_topic(self, payload, filename):
+        self.client.post("/add_topic/", {
+            "batch": self.batch.id,
+            "title": "Lecture",
+            "description": "",
+            "date": timezone.localdate().isoformat(),
+            "start_time": "10:00",
+            "end_time": "11:00",
+            "video": SimpleUploadedFile(filename, payload, content_type="video/mp4"),
+        })
+
+    def stored_files(self):
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.media_root)
+            for name in names
+        ]
+
+    def test_same_upload_is_stored_once(self):
+        payload = os.urandom(4096)
+
+        self.add_topic(payload, "day1.mp4")
+        self.add_topic(payload, "day1-again.MP4")
+
+        first, second = TopicSession.objects.order_by("id")
+        self.assertEqual(first.video.name, second.video.name)
+        self.assertEqual(first.video.name, f"topic_videos/{first.video.name.split('/')[1]}/{hashlib.sha256(payload).hexdigest()}.mp4")
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+
+    def test_blob_is_deleted_with_its_last_reference(self):
+        self.add_topic(b"lecture bytes", "a.mp4")
+        self.add_topic(b"lecture bytes", "b.mp4")
+        first, second = TopicSession.objects.order_by("id")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(len(self.stored_files()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self.stored_files(), [])
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_reused_name_is_pinned_before_a_pending_collect(self):
+        first = media_store.save("topic_videos/a.mp4", ContentFile(b"lecture bytes"))
+        acquire(first)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            release(first)   # last reference gone, collect() queued
+
+        # Same bytes saved again before the collect runs
+        second = media_store.save("topic_videos/b.mp4", ContentFile(b"lecture bytes"))
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(second, first)
+        self.assertTrue(media_store.exists(second))
+
+        acquire(second)   # the saving row's post_save uses the pin
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+
+    def test_store_follows_the_default_storage(self):
+        with override_settings(STORAGES={
+            **settings.STORAGES,
+            "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        }):
+            store = build_media_store()
+            name = store.save("topic_videos/a.mp4", ContentFile(b"lecture bytes"))
+
+        self.assertIsInstance(store, InMemoryStorage)
+        self.assertTrue(is_content_addressed(name))
+        self.assertTrue(store.exists(name))
+
+
+# ======================================================
+# ADD TOPIC / ADD TASK — BULK FAN-OUT
+# ======================================================
+def messages_of(response):
+    return [str(m) for m in get_messages(response.wsgi_request)]
+
+
+class FanOutTests(TestCase):
+
+    def setUp(self):
+        self.course = Course.objects.create(course_name="Python")
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def make_batch(self, name, size):
+        batch = Batch.objects.create(batch_name=name, course=self.course)
+        users = User.objects.bulk_create([
+            User(username=f"{name}-{i}") for i in range(size)
+        ])
+        Student.objects.bulk_create([
+            Student(user=user, course=self.course, batch=batch) for user in users
+        ])
+        return batch
+
+    def add_topic(self, batch):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/add_topic/", {
+                "batch": batch.id,
+                "title": "Loops",
+                "description": "",
+                "date": timezone.localdate().isoformat(),
+                "start_time": "10:00",
+                "end_time": "11:00",
+            }, follow=True)
+        return response, len(queries)
+
+    def test_add_topic_query_count_is_constant(self):
+        small = self.make_batch("small", 3)
+        large = self.make_batch("large", 60)
+
+        response, small_queries = self.add_topic(small)
+        self.assertIn("Topic added for 3 students", messages_of(response))
+
+        response, large_queries = self.add_topic(large)
+        self.assertIn("Topic added for 60 students", messages_of(response))
+
+        self.assertEqual(Topic.objects.filter(session__batch=large).count(), 60)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_add_topic_is_all_or_nothing(self):
+        batch = self.make_batch("b", 5)
+
+        with mock.patch.object(Topic.objects, "bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.add_topic(batch)
+
+        self.assertFalse(TopicSession.objects.exists())
+
+    def test_add_task_for_batch_and_students(self):
+        batch = self.make_batch("b", 4)
+        other = self.make_batch("o", 2).student_set.first()
+
+        response = self.client.post("/add-task/", {
+            "batch": batch.id,
+            "students": [other.id],
+            "title": "Homework",
+            "task_notes": "",
+        }, follow=True)
+
+        self.assertIn("Task assigned to 5 students", messages_of(response))
+
+        # One shared session per batch, not one per student
+        self.assertEqual(TopicSession.objects.filter(content_type="task").count(), 2)
+        self.assertEqual(Topic.objects.filter(session__content_type="task").count(), 5)
+
+    def test_add_task_reports_students_without_a_batch(self):
+        loner = Student.objects.create(user=User.objects.create_user(username="loner"))
+
+        response = self.client.post("/add-task/", {
+            "students": [loner.id],
+            "title": "Homework",
+            "task_notes": "",
+        }, follow=True)
+
+        self.assertIn("Task assigned to 0 students", messages_of(response))
+        self.assertIn("1 students skipped: not in a batch", messages_of(response))
+
+    def test_non_numeric_batch_is_ignored(self):
+        student = self.make_batch("b", 1).student_set.get()
+
+        response = self.client.post("/add-task/", {
+            "batch": "all",
+            "students": [student.id, "x"],
+            "title": "Homework",
+            "task_notes": "",
+        }, follow=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Task assigned to 1 students", messages_of(response))
+
+    def test_task_edit_and_delete_touch_one_student(self):
+        batch = self.make_batch("b", 3)
+        self.client.post("/add-task/", {"batch": batch.id, "title": "Homework", "task_notes": ""})
+        first, second, third = Topic.objects.order_by("id")
+
+        self.client.post(f"/edit_task/{first.id}/", {"task_notes": "Only mine", "status": "review"})
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.session.task_notes, "Only mine")
+        self.assertEqual(second.session.task_notes, "")
+        self.assertEqual(second.session_id, third.session_id)
+
+        self.client.get(f"/delete_task/{second.id}/")
+        self.assertEqual(
+            set(Topic.objects.values_list("id", flat=True)), {first.id, third.id}
+        )
+
+        # Last student on a session takes the session with it
+        self.client.get(f"/delete_task/{third.id}/")
+        self.assertEqual(TopicSession.objects.get().id, first.session_id)
+
+
+# ======================================================
+# STUDENT TOPICS API — V2
+# ======================================================
+class StudentTopicsApiV2Tests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        batch = Batch.objects.create(batch_name="B1", course=course)
+        self.student = Student.objects.create(
+            user=User.objects.create_user(username="s1", first_name="Sam"),
+            course=course,
+            batch=batch,
+        )
+
+        start = timezone.localdate() - timedelta(days=9)
+        for i in range(10):
+            session = TopicSession.objects.create(
+                batch=batch,
+                title=f"Day {i}",
+                date=start + timedelta(days=i),
+                start_time=time(10, 0),
+                end_time=time(11, 30),
+            )
+            Topic.objects.create(
+                session=session,
+                student=self.student,
+                status="completed" if i < 4 else "pending",
+            )
+
+    def get(self, **params):
+        return self.client.get(
+            "/api/v2/student/topics/",
+            {"user_id": self.student.user_id, **params},
+        ).json()
+
+    def test_totals_are_computed_in_the_database(self):
+        data = self.get(limit=3)
+
+        self.assertEqual(data["total_hours"], 15.0)
+        self.assertEqual(data["completed_tasks"], 4)
+        self.assertEqual(data["pending_tasks"], 6)
+        self.assertEqual(data["task_percentage"], 40.0)
+
+        # Last 7 days, oldest first, hours per day
+        self.assertEqual(len(data["graph_points"]), 7)
+        self.assertEqual(data["graph_points"][-1]["x"], str(timezone.localdate()))
+        self.assertEqual(data["graph_points"][0]["y"], 1.5)
+
+    def test_time_between_counts_reversed_times_as_zero(self):
+        TopicSession.objects.filter(title="Day 0").update(start_time=time(11, 0), end_time=time(9, 0))
+
+        durations = dict(
+            TopicSession.objects
+            .annotate(duration=time_between("start_time", "end_time"))
+            .values_list("title", "duration")
+        )
+
+        self.assertEqual(durations["Day 0"], timedelta(0))
+        self.assertEqual(durations["Day 1"], timedelta(hours=1, minutes=30))
+        self.assertEqual(self.get()["total_hours"], 13.5)
+
+    def test_cursor_walks_every_topic_once(self):
+        titles = []
+        cursor = None
+
+        while True:
+            data = self.get(limit=4, **({"cursor": cursor} if cursor else {}))
+            titles += [t["title"] for t in data["topics"]]
+            if not data["has_next"]:
+                break
+            cursor = data["next_cursor"]
+
+        self.assertEqual(titles, [f"Day {i}" for i in reversed(range(10))])
+
+    def test_query_count_does_not_grow_with_history(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(limit=2)
+
+        self.assertLessEqual(len(queries), 4)
+
+    def test_v1_keeps_its_shape(self):
+        data = self.client.get(
+            "/api/student/topics/", {"user_id": self.student.user_id}
+        ).json()
+
+        self.assertEqual(len(data["topics"]), 10)
+        self.assertEqual(data["topics"][0]["total_hours"], 1.5)
+        self.assertEqual(data["total_hours"], 15.0)
+
+
+# ======================================================
+# STUDENT APP SYNC
+# ======================================================
+class StudentSyncApiTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+        self.student = Student.objects.create(
+            user=User.objects.create_user(username="s1"),
+            course=course,
+            batch=self.batch,
+        )
+        self.session = self.make_session("Loops")
+        self.topic = Topic.objects.create(session=self.session, student=self.student)
+        Attendance.objects.create(
+            student=self.student, date=timezone.localdate(), status="Present"
+        )
+        self.start = timezone.now()
+
+    def make_session(self, title):
+        return TopicSession.objects.create(
+            batch=self.batch,
+            title=title,
+            date=timezone.localdate(),
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+        )
+
+    def sync(self, token=None):
+        params = {"user_id": self.student.user_id}
+        if token:
+            params["since"] = token
+        return self.client.get("/api/student/sync/", params).json()
+
+    def at(self, minutes):
+        """Run with the clock `minutes` after setUp (well past the sync overlap)."""
+        return mock.patch(
+            "django.utils.timezone.now",
+            return_value=self.start + timedelta(minutes=minutes),
+        )
+
+    def test_first_sync_is_full(self):
+        data = self.sync()
+
+        self.assertTrue(data["full"])
+        self.assertEqual([t["title"] for t in data["topics"]], ["Loops"])
+        self.assertEqual(len(data["attendance"]), 1)
+
+    def test_nothing_changed_returns_empty_lists(self):
+        with self.at(1):
+            token = self.sync()["token"]
+
+        with self.at(2):
+            data = self.sync(token)
+
+        self.assertFalse(data["full"])
+        self.assertEqual(data["topics"], [])
+        self.assertEqual(data["attendance"], [])
+        self.assertEqual(data["deleted"]["topic"], [])
+
+    def test_changes_and_deletes_since_token(self):
+        with self.at(1):
+            token = self.sync()["token"]
+
+        with self.at(2):
+            # Session edit reaches the student's row through the join
+            self.session.title = "Loops & Ranges"
+            self.session.save()
+
+            Payment.objects.create(
+                student=self.student, amount_paid=500, utr="UTR1", screenshot="x.png"
+            )
+            attendance_id = Attendance.objects.get().id
+            Attendance.objects.filter(id=attendance_id).delete()
+
+            other = Topic.objects.create(session=self.make_session("Lists"), student=self.student)
+
+            data = self.sync(token)
+
+        self.assertEqual(
+            sorted(t["title"] for t in data["topics"]),
+            ["Lists", "Loops & Ranges"],
+        )
+        self.assertEqual([p["utr"] for p in data["payments"]], ["UTR1"])
+        self.assertEqual(data["deleted"]["attendance"], [attendance_id])
+
+        with self.at(3):
+            token = self.sync(data["token"])["token"]
+
+        # update_fields still bumps updated_at
+        with self.at(4):
+            other.status = "completed"
+            other.save(update_fields=["status"])
+            data = self.sync(token)
+
+        self.assertEqual([t["id"] for t in data["topics"]], [other.id])
+
+    def test_deleting_a_session_tombstones_every_row(self):
+        with self.at(1):
+            token = self.sync()["token"]
+
+        with self.at(2):
+            self.session.delete()
+            data = self.sync(token)
+
+        self.assertEqual(data["deleted"]["topic"], [self.topic.id])
+
+    def test_deleting_the_student_leaves_no_tombstones(self):
+        self.student.user.delete()
+        self.assertFalse(SyncTombstone.objects.exists())
+
+    def test_bad_or_expired_token_forces_full_sync(self):
+        self.assertTrue(self.sync("garbage")["full"])
+
+        token = self.sync()["token"]
+        with self.at(60 * 24 * 31):
+            self.assertTrue(self.sync(token)["full"])
+
+
+# ======================================================
+# ADMIN DASHBOARD — PAGINATE FIRST
+# ======================================================
+class AdminDashboardTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+        self.students = Student.objects.bulk_create([
+            Student(user=User.objects.create_user(username=f"s{i}"), course=course, batch=self.batch)
+            for i in range(3)
+        ])
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def make_sessions(self, day, count, end=time(11, 30)):
+        sessions = TopicSession.objects.bulk_create([
+            TopicSession(
+                batch=self.batch,
+                title=f"{day:%b %Y} #{n}",
+                description="",
+                date=day,
+                start_time=time(10, 0),
+                end_time=end,
+            )
+            for n in range(count)
+        ])
+        Topic.objects.bulk_create([
+            Topic(session=session, student=student, status="completed" if i == 0 else "pending")
+            for session in sessions
+            for i, student in enumerate(self.students)
+        ])
+        return sessions
+
+    def test_page_rows_get_counts_and_durations(self):
+        self.make_sessions(date(2025, 3, 10), 1)
+
+        response = self.client.get("/admindashboard/", {"month": 3})
+        row = response.context["page_obj"][0]
+
+        self.assertEqual(row.student_count, 3)
+        self.assertEqual(row.completed_count, 1)
+        self.assertEqual(row.duration_display, "1h 30m (1.5 hrs)")
+
+    def test_month_filter_matches_every_year(self):
+        self.make_sessions(date(2024, 3, 31), 1)
+        self.make_sessions(date(2025, 3, 1), 1)
+        self.make_sessions(date(2025, 4, 1), 1)
+
+        response = self.client.get("/admindashboard/", {"month": 3})
+
+        self.assertEqual(
+            [t.title for t in response.context["page_obj"]],
+            ["Mar 2025 #0", "Mar 2024 #0"],
+        )
+
+    def test_query_count_does_not_grow_with_the_month(self):
+        self.make_sessions(date(2025, 3, 1), 5)
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get("/admindashboard/", {"month": 3})
+
+        self.make_sessions(date(2025, 3, 2), 60)
+
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get("/admindashboard/", {"month": 3})
+
+        self.assertEqual(len(response.context["page_obj"]), 10)
+        self.assertEqual(len(small), len(large))
+
+    @skipUnless(connection.vendor == "sqlite", "reads SQLite's query plan")
+    def test_unsearched_list_is_sorted_by_the_index(self):
+        self.make_sessions(date(2025, 3, 1), 30)
+
+        response = self.client.get("/admindashboard/", {"month": 3})
+        plan = response.context["page_obj"].paginator.object_list[:10].explain()
+
+        self.assertIn("session_ctype_date_time_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+# ======================================================
+# SEARCH INDEX
+# ======================================================
+class SearchTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+
+        self.ravi = Student.objects.create(
+            user=User.objects.create_user(
+                username="ravi", first_name="Ravi", last_name="Kumar", email="ravi@example.com"
+            ),
+            course=course,
+            batch=self.batch,
+        )
+        self.anu = Student.objects.create(
+            user=User.objects.create_user(username="anu", first_name="Anu", email="anu@example.com"),
+            course=course,
+            batch=self.batch,
+        )
+
+        self.loops = self.make_session("Python Loops", self.ravi)
+        self.django = self.make_session("Django Models", self.anu)
+
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def make_session(self, title, student, content_type="topic"):
+        session = TopicSession.objects.create(
+            content_type=content_type,
+            batch=self.batch,
+            title=title,
+            date=timezone.localdate(),
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+        )
+        Topic.objects.create(session=session, student=student)
+        return session
+
+    def test_documents_follow_their_rows(self):
+        self.assertEqual(search_ids("student", "KUMAR"), [self.ravi.id])
+        self.assertEqual(search_ids("session", "loops"), [self.loops.id])
+
+        # Renaming the user re-indexes the student
+        self.ravi.user.last_name = "Sharma"
+        self.ravi.user.save()
+        self.assertEqual(search_ids("student", "kumar"), [])
+        self.assertEqual(search_ids("student", "sharma"), [self.ravi.id])
+
+        self.loops.delete()
+        self.assertEqual(search_ids("session", "loops"), [])
+
+    def test_short_queries_fall_back_to_a_scan(self):
+        self.assertEqual(search_ids("student", "an"), [self.anu.id])
+
+    def test_substring_and_special_characters(self):
+        self.assertEqual(search_ids("student", "vi ku"), [self.ravi.id])
+        self.assertEqual(search_ids("student", '"%_'), [])
+
+    def test_admin_dashboard_matches_title_or_student(self):
+        response = self.client.get("/admindashboard/", {"search": "anu@exa"})
+        self.assertEqual([t.id for t in response.context["page_obj"]], [self.django.id])
+
+        response = self.client.get("/admindashboard/", {"search": "python"})
+        self.assertEqual([t.id for t in response.context["page_obj"]], [self.loops.id])
+
+    def test_student_and_task_lists_search(self):
+        response = self.client.get("/student_list/", {"search": "example.com"})
+        self.assertEqual(
+            {s.id for s in response.context["students"]},
+            {self.ravi.id, self.anu.id},
+        )
+
+        task = self.make_session("Loops Homework", self.anu, content_type="task")
+        response = self.client.get("/tasks/", {"search": "homework"})
+        self.assertEqual([t.session_id for t in response.context["tasks"]], [task.id])
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_ranking_cap_does_not_drop_matches(self):
+        self.assertEqual(len(search_ids("student", "example.com")), 1)
+
+        response = self.client.get("/student_list/", {"search": "example.com"})
+        self.assertEqual(response.context["page_obj"].paginator.count, 2)
+
+        response = self.client.get("/admindashboard/", {"search": "example"})
+        self.assertEqual(
+            {t.id for t in response.context["page_obj"]},
+            {self.loops.id, self.django.id},
+        )
+
+        self.make_session("Loops Homework", self.anu, content_type="task")
+        self.make_session("Loops Revision", self.ravi, content_type="task")
+        response = self.client.get("/tasks/", {"search": "loops"})
+        self.assertEqual(len(response.context["tasks"]), 2)
+
+
+# ======================================================
+# ESTIMATED-COUNT PAGINATOR
+# ======================================================
+class EstimatedCountPaginatorTests(TestCase):
+
+    def setUp(self):
+        course = Course.objects.create(course_name="Python")
+        batch = Batch.objects.create(batch_name="B1", course=course)
+        TopicSession.objects.bulk_create([
+            TopicSession(
+                batch=batch,
+                title=f"Session {n}",
+                description="",
+                date=timezone.localdate(),
+                start_time=time(10, 0),
+                end_time=time(11, 0),
+            )
+            for n in range(25)
+        ])
+        self.sessions = TopicSession.objects.order_by("id")
+
+    def test_small_lists_count_exactly(self):
+        paginator = EstimatedCountPaginator(self.sessions, 10)
+
+        self.assertEqual(paginator.count, 25)
+        self.assertFalse(paginator.is_estimated)
+        self.assertEqual(paginator.get_page(99).number, 3)
+        self.assertIsNone(estimate_count(self.sessions))   # SQLite: no estimate
+
+    def test_large_lists_use_the_estimate_and_probe_for_next(self):
+        paginator = EstimatedCountPaginator(self.sessions, 10, exact_below=100)
+
+        with mock.patch("students.pagination.estimate_count", return_value=5000):
+            with CaptureQueriesContext(connection) as queries:
+                page = paginator.get_page(3)
+
+        self.assertTrue(paginator.is_estimated)
+        self.assertEqual(paginator.num_pages, 500)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries))
+
+        # The estimate is high, but has_next is exact
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+        self.assertEqual(list(page_window(page)), [1, 2, 3])
+
+    def test_low_estimate_still_reaches_every_page(self):
+        paginator = EstimatedCountPaginator(self.sessions, 10, exact_below=1)
+
+        with mock.patch("students.pagination.estimate_count", return_value=12):
+            page = paginator.get_page(3)
+
+        self.assertEqual(paginator.num_pages, 2)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+
+    def test_payment_list_is_paginated(self):
+        student = Student.objects.create(user=User.objects.create_user(username="s1"))
+        Payment.objects.bulk_create([
+            Payment(student=student, amount_paid=100, utr=f"UTR{n}", screenshot="x.png", status="approved")
+            for n in range(30)
+        ])
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+        response = self.client.get("/admin/payments/", {"page": 2})
+
+        self.assertEqual(len(response.context["payments"]), 5)
+        self.assertEqual(response.context["payments"][0].approved_paid, 3000.0)
+
+    def test_mentor_topics_are_paginated(self):
+        mentor = Mentor.objects.create(user=User.objects.create_user(username="m1"), phone="900")
+        student = Student.objects.create(user=User.objects.create_user(username="s1"))
+        TopicSession.objects.update(mentor=mentor)
+        Topic.objects.bulk_create([Topic(session=s, student=student) for s in self.sessions])
+        self.client.force_login(mentor.user)
+
+        response = self.client.get("/mentor/today-topics/", {"page": 3})
+
+        self.assertEqual(len(response.context["topics"]), 5)
+        self.assertEqual(response.context["topics"][0].student_count, 1)
+
+
+# ======================================================
+# STUDENT LIST — FILTERS, SORT, PAGES, JSON
+# ======================================================
+class StudentListTests(TestCase):
+
+    def setUp(self):
+        self.python = Course.objects.create(course_name="Python")
+        self.java = Course.objects.create(course_name="Java")
+        today = timezone.localdate()
+
+        users = User.objects.bulk_create([
+            User(username=f"s{n:02d}", first_name=f"Student {n:02d}") for n in range(30)
+        ])
+        Student.objects.bulk_create([
+            Student(
+                user=user,
+                course=self.python if n % 2 else self.java,
+                category="part_time" if n % 3 == 0 else "full_time",
+                valid_upto=today - timedelta(days=1) if n < 5 else today + timedelta(days=30),
+            )
+            for n, user in enumerate(users)
+        ])
+
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def get(self, **params):
+        return self.client.get("/student_list/", params)
+
+    def test_html_is_paginated(self):
+        response = self.get()
+        self.assertEqual(len(response.context["students"]), 25)
+        self.assertEqual(response.context["students"][0].user.username, "s29")
+
+        response = self.get(page=2)
+        self.assertEqual(len(response.context["students"]), 5)
+
+    def test_filters_combine(self):
+        response = self.get(course=self.python.id, category="part_time", format="json")
+        names = [row["username"] for row in response.json()["results"]]
+
+        # Odd (Python) and divisible by 3 (part time)
+        self.assertEqual(names, ["s27", "s21", "s15", "s09", "s03"])
+
+        response = self.get(validity="expired", sort="name", format="json")
+        self.assertEqual(
+            [row["username"] for row in response.json()["results"]],
+            ["s00", "s01", "s02", "s03", "s04"],
+        )
+
+    def test_json_loads_incrementally(self):
+        seen = []
+        page = 1
+
+        while page:
+            data = self.get(format="json", per_page=12, page=page, sort="name").json()
+            seen += [row["username"] for row in data["results"]]
+            page = data["next_page"]
+
+        self.assertEqual(seen, [f"s{n:02d}" for n in range(30)])
+        self.assertEqual(data["count"], 30)
+        self.assertFalse(data["count_is_estimate"])
+
+    @skipUnless(connection.vendor == "sqlite", "reads SQLite's query plan")
+    def test_course_filter_with_date_sorts_reads_one_index(self):
+        for sort in ("joining", "-joining", "valid", "-valid"):
+            with self.subTest(sort=sort):
+                plan = (
+                    Student.objects
+                    .filter(course=self.python)
+                    .order_by(*STUDENT_SORT_FIELDS[sort])[:25]
+                    .explain()
+                )
+
+                self.assertIn("student_course_", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_json_requires_admin(self):
+        self.client.force_login(User.objects.create_user(username="plain"))
+        self.assertEqual(self.get(format="json").status_code, 403)
+
+
+# ======================================================
+# STUDENT PICKER AUTOCOMPLETE
+# ======================================================
+class StudentLookupApiTests(TestCase):
+
+    url = "/api/students/lookup/"
+
+    def setUp(self):
+        cache.clear()
+
+        course = Course.objects.create(course_name="Python")
+        self.batch = Batch.objects.create(batch_name="B1", course=course)
+
+        self.ravi = Student.objects.create(
+            user=User.objects.create_user(
+                username="rk01", first_name="Ravi", last_name="Kumar", email="ravi@example.com"
+            ),
+            course=course,
+            batch=self.batch,
+            phone="+91 98765 43210",
+        )
+        self.anu = Student.objects.create(
+            user=User.objects.create_user(username="anu", first_name="Anu", email="kanu@example.com"),
+            course=course,
+            batch=self.batch,
+        )
+
+        self.client.force_login(User.objects.create_superuser(username="admin"))
+
+    def ids(self, q):
+        return [row["id"] for row in self.client.get(self.url, {"q": q}).json()["results"]]
+
+    def test_prefix_matches_each_field(self):
+        self.assertEqual(self.ids("RAV"), [self.ravi.id])        # first name / email
+        self.assertEqual(self.ids("kum"), [self.ravi.id])        # last name
+        self.assertEqual(self.ids("ravi k"), [self.ravi.id])     # full name
+        self.assertEqual(self.ids("rk0"), [self.ravi.id])        # username
+        self.assertEqual(self.ids("+91 98"), [self.ravi.id])     # phone
+        self.assertEqual(self.ids("919876"), [self.ravi.id])     # phone digits
+        self.assertEqual(self.ids("k"), [self.anu.id, self.ravi.id])
+
+        # Prefix, not substring
+        self.assertEqual(self.ids("avi"), [])
+        self.assertEqual(self.ids(""), [])
+
+    def test_results_are_limited(self):
+        Student.objects.bulk_create([
+            Student(user=User.objects.create_user(username=f"bulk{n:02d}"), batch=self.batch)
+            for n in range(30)
+        ])
+        rebuild_lookup_keys()
+
+        self.assertEqual(len(self.ids("bulk")), 20)
+
+    def test_cached_per_prefix_until_a_student_changes(self):
+        self.ids("rav")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.ids("rav"), [self.ravi.id])
+        self.assertFalse([q for q in queries if "lookupkey" in q["sql"]])
+
+        self.ravi.user.first_name = "Arjun"
+        self.ravi.user.save()
+        self.assertEqual(self.ids("rav"), [self.ravi.id])   # still the email
+        self.assertEqual(self.ids("arj"), [self.ravi.id])
+
+        self.anu.delete()
+        self.assertEqual(self.ids("anu"), [])
+
+    def test_unrelated_saves_leave_keys_and_cache_alone(self):
+        user = self.ravi.user
+
+        with CaptureQueriesContext(connection) as queries:
+            self.ravi.joining_date = date(2026, 1, 1)
+            self.ravi.save()
+            user.save()
+            user.last_login = timezone.now()
+            user.save(update_fields=["last_login"])
+
+        touched = [q for q in queries if "lookupkey" in q["sql"] or "cacheversion" in q["sql"]]
+        self.assertEqual(touched, [])
+
+    def test_displayed_changes_invalidate_without_new_keys(self):
+        self.ids("rav")
+
+        other = Batch.objects.create(batch_name="B2", course=self.batch.course)
+        self.ravi.batch = other
+        self.ravi.save()
+        self.ravi.user.first_name = "RAVI"
+        self.ravi.user.save()
+
+        [row] = self.client.get(self.url, {"q": "rav"}).json()["results"]
+        self.assertEqual((row["name"], row["batch"]), ("RAVI Kumar", "B2"))
+
+    def test_version_lives_in_the_database(self):
+        self.assertEqual(self.ids("anu"), [self.anu.id])
+
+        # Another worker drops the keys and bumps the shared version
+        StudentLookupKey.objects.filter(student=self.anu).delete()
+        self.assertEqual(self.ids("anu"), [self.anu.id])
+
+        bump_version(LOOKUP_VERSION_KEY)
+        self.assertEqual(self.ids("anu"), [])
+
+    def test_requires_admin_or_mentor(self):
+        self.client.force_login(User.objects.create_user(username="plain"))
+        self.assertEqual(self.client.get(self.url, {"q": "rav"}).status_code, 403)
+
+    def test_forms_no_longer_render_every_student(self):
+        for url in ("/add-task/", "/attendance/"):
+            response = self.client.get(url)
+            self.assertNotIn("students", response.context)
+            self.assertNotContains(response, "ravi@example.com")
+            self.assertContains(response, self.url)
+
+        # The picker posts ids the same way the selects did
+        self.client.post("/attendance/", {
+            "student": self.ravi.id, "date": "2026-01-05", "status": "Present",
+        })
+        self.assertTrue(Attendance.objects.filter(student=self.ravi).exists())
@@ -0,0 +1,362 @@
+# ======================================================
+# VIDEO STREAMING — HTTP RANGE REQUESTS (RFC 9110 §14)
+# ======================================================
+"""
+Range / If-Range handling and delivery backends for lecture videos.
+
+`ranged_file_response()` turns a local file plus the request headers into
+a 200 (whole file), 206 (one range, or multipart/byteranges for several)
+or 416 (unsatisfiable) response, streaming only the requested bytes.
+
+`deliver_video()` picks how the bytes leave the process, based on
+settings.VIDEO_DELIVERY_BACKEND (see settings.py).
+"""
+import asyncio
+import os
+import secrets
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+
+CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header, size):
+    """
+    Parse a `Range: bytes=...` header against a file of `size` bytes.
+
+    Returns a list of inclusive (start, end) pairs, or None when the
+    header is absent / malformed / not worth honouring (serve the whole
+    file). Raises RangeNotSatisfiable when no range overlaps the file.
+    """
+    if not header:
+        return None
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        first, dash, last = part.partition("-")
+        if not dash:
+            return None
+
+        try:
+            if first == "":
+                # Suffix range: last N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                if last and int(last) < start:
+                    return None
+                end = min(int(last), size - 1) if last else size - 1
+        except ValueError:
+            return None
+
+        if start < 0:
+            return None
+
+        if start < size:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges):
+    """Merge overlapping / touching ranges (keeps multipart small)."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def file_validators(path):
+    """(etag, last_modified) for a local file."""
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return etag, http_date(int(stat.st_mtime))
+
+
+def if_range_matches(request, etag, last_modified):
+    """True when Range may be honoured (no If-Range, or validator matches)."""
+    value = request.headers.get("If-Range")
+    if not value:
+        return True
+
+    value = value.strip()
+
+    # Entity tag (weak tags never match for ranges)
+    if value.startswith('"'):
+        return value == etag
+
+    validator_time = parse_http_date_safe(value)
+    return (
+        validator_time is not None
+        and validator_time == parse_http_date_safe(last_modified)
+    )
+
+
+def iter_file_range(path, start, end, chunk_size=CHUNK_SIZE):
+    """Yield bytes start..end (inclusive) of the file."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = end - start + 1
+
+        while remaining > 0:
+            data = fh.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+async def aiter_file_range(path, start, end, chunk_size=CHUNK_SIZE):
+    """Async twin of iter_file_range(); reads run in a worker thread."""
+    fh = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(fh.seek, start)
+        remaining = end - start + 1
+
+        while remaining > 0:
+            data = await asyncio.to_thread(fh.read, min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        await asyncio.to_thread(fh.close)
+
+
+def multipart_parts(ranges, size, content_type):
+    """(boundary, [(part_header_bytes, start, end)], closing_bytes)"""
+    boundary = secrets.token_hex(16)
+
+    parts = [
+        (
+            (
+                f"--{boundary}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+            ).encode(),
+            start,
+            end,
+        )
+        for start, end in ranges
+    ]
+
+    return boundary, parts, f"--{boundary}--\r\n".encode()
+
+
+def multipart_length(parts, closing):
+    return sum(
+        len(header) + (end - start + 1) + 2   # trailing CRLF per part
+        for header, start, end in parts
+    ) + len(closing)
+
+
+def iter_multipart(path, parts, closing):
+    for header, start, end in parts:
+        yield header
+        yield from iter_file_range(path, start, end)
+        yield b"\r\n"
+    yield closing
+
+
+async def aiter_multipart(path, parts, closing):
+    for header, start, end in parts:
+        yield header
+        async for data in aiter_file_range(path, start, end):
+            yield data
+        yield b"\r\n"
+    yield closing
+
+
+def resolve_ranges(request, size, etag, last_modified):
+    """
+    None → send the whole file; list → send these ranges.
+    Raises RangeNotSatisfiable for a 416.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+
+    if not if_range_matches(request, etag, last_modified):
+        return None
+
+    return parse_range_header(request.headers.get("Range"), size)
+
+
+def not_satisfiable_response(size):
+    response = HttpResponse(status=416)
+    response["Content-Range"] = f"bytes */{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def ranged_file_response(request, path, content_type, is_async=False):
+    """
+    With is_async=True the body is an async iterator, for async views
+    under ASGI (one event loop serves many viewers).
+    """
+    file_range = aiter_file_range if is_async else iter_file_range
+    multipart = aiter_multipart if is_async else iter_multipart
+
+    size = os.path.getsize(path)
+    etag, last_modified = file_validators(path)
+
+    try:
+        ranges = resolve_ranges(request, size, etag, last_modified)
+    except RangeNotSatisfiable:
+        return not_satisfiable_response(size)
+
+    if ranges is None:
+        response = StreamingHttpResponse(
+            file_range(path, 0, size - 1),
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(size)
+
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(
+            file_range(path, start, end),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    else:
+        boundary, parts, closing = multipart_parts(ranges, size, content_type)
+        response = StreamingHttpResponse(
+            multipart(path, parts, closing),
+            status=206,
+            content_type=f"multipart/byteranges; boundary={boundary}",
+        )
+        response["Content-Length"] = str(multipart_length(parts, closing))
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    return response
+
+
+# ======================================================
+# DELIVERY BACKENDS
+# ======================================================
+class RangeFile:
+    """
+    Bytes start..end of an open file, for a server's wsgi.file_wrapper.
+
+    Generic wrappers (wsgiref / runserver) read() until EOF, so reads stop
+    at `end`. fileno() — which lets a server sendfile() — is only offered
+    when the range runs to the end of the file, so a server that ignores
+    Content-Length cannot overrun it either.
+    """
+
+    def __init__(self, fh, start, end, size):
+        fh.seek(start)
+        self._fh = fh
+        self._remaining = end - start + 1
+        self.name = fh.name
+
+        if end == size - 1:
+            self.fileno = fh.fileno
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+
+        data = self._fh.read(size) if size else b""
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._fh.close()
+
+
+def sendfile_response(request, path, content_type):
+    """
+    Zero-copy variant: hand a RangeFile to the WSGI server's file_wrapper
+    (gunicorn sendfile()s whole files and open-ended ranges). Multi-range
+    requests fall back to Python streaming.
+    """
+    size = os.path.getsize(path)
+    etag, last_modified = file_validators(path)
+
+    try:
+        ranges = resolve_ranges(request, size, etag, last_modified)
+    except RangeNotSatisfiable:
+        return not_satisfiable_response(size)
+
+    if ranges is not None and len(ranges) > 1:
+        return ranged_file_response(request, path, content_type)
+
+    start, end = ranges[0] if ranges else (0, size - 1)
+
+    fh = RangeFile(open(path, "rb"), start, end, size)
+
+    response = FileResponse(fh, content_type=content_type)
+    response["Content-Length"] = str(end - start + 1)
+
+    if ranges:
+        response.status_code = 206
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    return response
+
+
+def internal_redirect_response(name, path, content_type, backend):
+    """
+    Empty response telling the front proxy to serve the file itself
+    (it also handles Range). Django has already done the access check.
+    """
+    response = HttpResponse(content_type=content_type)
+
+    if backend == "x-accel":
+        response["X-Accel-Redirect"] = settings.VIDEO_ACCEL_REDIRECT_PREFIX + quote(name)
+    else:
+        response["X-Sendfile"] = path
+
+    return response
+
+
+def deliver_video(request, name, path, content_type, is_async=False):
+    backend = getattr(settings, "VIDEO_DELIVERY_BACKEND", "python")
+
+    if backend in ("x-accel", "x-sendfile"):
+        return internal_redirect_response(name, path, content_type, backend)
+
+    # file_wrapper / sendfile only exists under WSGI
+    if backend == "sendfile" and not is_async and request.META.get("wsgi.file_wrapper"):
+        return sendfile_response(request, path, content_type)
+
+    return ranged_file_response(request, path, content_type, is_async)
@@ -6,11 +6,14 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.messages import get_messages
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
+from django.core.handlers.asgi import ASGIRequest
 from django.utils import timezone
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, Sum, F, Exists, OuterRef, Min, Max
+from django.db.models.functions import Coalesce
+from django.db import IntegrityError, transaction
 from django.core.mail import send_mail
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -30,6 +33,7 @@ from calendar import monthrange
 import random
 import string
 import json
+import tempfile
 
 # ======================================================
 # EXTERNAL LIBRARIES
@@ -37,6 +41,7 @@ import json
 import openpyxl
 from openpyxl import Workbook
 from dateutil.relativedelta import relativedelta
+from asgiref.sync import sync_to_async
 
 # ======================================================
 # PROJECT MODELS
@@ -45,11 +50,32 @@ from .models import (
     Student,
     Mentor,
     Topic,
+    TopicSession,
     Course,
     Batch,
     Attendance,
     Holiday
 )
+from .working_days import get_working_day_calendar
+from .expressions import AddMonths, time_between
+from .pagination import EstimatedCountPaginator, keyset_paginate, page_window
+from .heatmap import batch_heatmap
+from .video_streaming import deliver_video
+from .signed_media import is_local, signed_media_url, verify
+from .download_counter import flush_downloads, is_new_play, record_download
+from .sync import changed_since, deleted_since, make_token
+from .search import matching_ids, ranked, search_ids
+from .lookup import lookup_students
+from .attendance_bitmap import (
+    attendance_statuses,
+    month_start,
+    refresh_attendance_months,
+)
+from .attendance_summary import (
+    ATTENDANCE_WINDOW_MONTHS,
+    get_attendance_summary,
+    refresh_attendance_summaries,
+)
 # ======================================================
 # CHECK SUPERUSER
 # ======================================================
@@ -127,6 +153,76 @@ def logout_user(request):
 
 
 
+# ======================================================
+# SESSION LIST HELPERS
+# ======================================================
+def duration_display(duration):
+    """timedelta → "1h 30m (1.5 hrs)"."""
+    if duration is None:
+        return "—"
+
+    mins = int(duration.total_seconds()) // 60
+    return f"{mins // 60}h {mins % 60}m ({round(mins / 60, 2)} hrs)"
+
+
+def month_of_any_year(field, month, queryset):
+    """
+    Q for `field__month=month` as plain date ranges, one per year present
+    in `queryset` — index-friendly, unlike extracting the month per row.
+    """
+    bounds = queryset.aggregate(first=Min(field), last=Max(field))
+    if bounds["first"] is None:
+        return Q(pk__in=[])
+
+    query = Q()
+    for year in range(bounds["first"].year, bounds["last"].year + 1):
+        last_day = monthrange(year, month)[1]
+        query |= Q(**{f"{field}__range": (date(year, month, 1), date(year, month, last_day))})
+
+    return query
+
+
+def sessions_matching(sessions, search):
+    """
+    Narrow a TopicSession queryset to sessions whose title / trainer, or
+    one of whose students, matches `search` (students/search.py).
+    Returns (queryset, ranked ids of the best title matches, for ordering).
+    """
+    by_student = Topic.objects.filter(
+        session=OuterRef("pk"),
+        student_id__in=matching_ids("student", search),
+    )
+
+    sessions = sessions.filter(
+        Q(id__in=matching_ids("session", search)) | Q(Exists(by_student))
+    )
+    return sessions, search_ids("session", search)
+
+
+def attach_progress_counts(sessions):
+    """student_count / completed_count for a page of sessions, one grouped query."""
+    sessions = list(sessions)
+
+    counts = {
+        row["session_id"]: row
+        for row in Topic.objects
+        .filter(session__in=sessions)
+        .values("session_id")
+        .annotate(
+            student_count=Count("id"),
+            completed_count=Count("id", filter=Q(status="completed")),
+        )
+        .order_by()
+    }
+
+    for session in sessions:
+        row = counts.get(session.id, {})
+        session.student_count = row.get("student_count", 0)
+        session.completed_count = row.get("completed_count", 0)
+
+    return sessions
+
+
 # ======================================================
 # ADMIN DASHBOARD — TOPIC LIST
 # ======================================================
@@ -136,7 +232,6 @@ def admin_dashboard(request):
 
     from datetime import datetime, date
     from django.db.models import Q
-    from django.core.paginator import Paginator
 
     today = date.today()
 
@@ -165,14 +260,14 @@ def admin_dashboard(request):
         pass
 
     # --------------------------------------------------
-    # ✅ BASE QUERY — ONLY TOPICS (NOT TASKS)
+    # ✅ BASE QUERY — ONE ROW PER SESSION (NOT PER STUDENT)
     # --------------------------------------------------
-    topics = Topic.objects.select_related(
-        "student__user",
-        "student__course",
-        "batch"
+    topics = TopicSession.objects.select_related(
+        "batch__course"
     ).filter(
         content_type="topic"   # ⭐⭐⭐ FIX ⭐⭐⭐
+    ).annotate(
+        duration=time_between("start_time", "end_time"),
     )
 
     # --------------------------------------------------
@@ -196,19 +291,15 @@ def admin_dashboard(request):
     # --------------------------------------------------
     # SEARCH FILTER
     # --------------------------------------------------
+    session_ids = []
     if search:
-        topics = topics.filter(
-            Q(student__user__first_name__icontains=search) |
-            Q(student__user__last_name__icontains=search) |
-            Q(student__user__email__icontains=search) |
-            Q(title__icontains=search)
-        )
+        topics, session_ids = sessions_matching(topics, search)
 
     # --------------------------------------------------
     # COURSE FILTER
     # --------------------------------------------------
     if course_filter:
-        topics = topics.filter(student__course__course_name=course_filter)
+        topics = topics.filter(batch__course__course_name=course_filter)
 
     # --------------------------------------------------
     # BATCH FILTER
@@ -219,8 +310,11 @@ def admin_dashboard(request):
     # --------------------------------------------------
     # MONTH FILTER
     # --------------------------------------------------
-    if month.isdigit():
-        topics = topics.filter(date__month=int(month))
+    if month.isdigit() and 1 <= int(month) <= 12:
+        topics = topics.filter(month_of_any_year(
+            "date", int(month),
+            TopicSession.objects.filter(content_type="topic"),
+        ))
 
     # --------------------------------------------------
     # DATE RANGE FILTER
@@ -233,32 +327,26 @@ def admin_dashboard(request):
     # --------------------------------------------------
     # ORDERING
     # --------------------------------------------------
-    topics = topics.order_by("-date", "-start_time")
+    # ranked() only with a search: a constant ORDER BY term keeps
+    # session_ctype_date_time_idx from serving the sort
+    if search:
+        topics = topics.order_by(ranked(session_ids), "-date", "-start_time", "-id")
+    else:
+        topics = topics.order_by("-date", "-start_time", "-id")
 
     # --------------------------------------------------
-    # CALCULATE DURATION
+    # PAGINATION (BEFORE ANY PYTHON LOOP)
     # --------------------------------------------------
-    for t in topics:
-        try:
-            start = datetime.strptime(str(t.start_time), "%H:%M:%S")
-            end   = datetime.strptime(str(t.end_time), "%H:%M:%S")
-
-            diff = end - start
-            mins = diff.seconds // 60
-
-            hrs = mins // 60
-            rem = mins % 60
-            dec = round(mins / 60, 2)
-
-            t.duration_display = f"{hrs}h {rem}m ({dec} hrs)"
-        except:
-            t.duration_display = "—"
+    paginator = EstimatedCountPaginator(topics, 10)
+    page_obj  = paginator.get_page(request.GET.get("page"))
 
     # --------------------------------------------------
-    # PAGINATION
+    # PROGRESS COUNTS + DURATION — CURRENT PAGE ONLY
     # --------------------------------------------------
-    paginator = Paginator(topics, 10)
-    page_obj  = paginator.get_page(request.GET.get("page"))
+    page_obj.object_list = attach_progress_counts(page_obj.object_list)
+
+    for t in page_obj:
+        t.duration_display = duration_display(t.duration)
 
     params = request.GET.copy()
     params.pop("page", None)
@@ -269,8 +357,10 @@ def admin_dashboard(request):
     context = {
         "topics": page_obj,
         "page_obj": page_obj,
+        "page_numbers": page_window(page_obj),
         "courses": Course.objects.all().order_by("course_name"),
         "batches": Batch.objects.all().order_by("batch_name"),
+        "search": search,
         "query_string": params.urlencode(),
     }
 
@@ -288,20 +378,151 @@ def admin_dashboard(request):
 # ======================================================
 # STUDENT LIST
 # ======================================================
+# Index-backed alone or within a course / batch filter, except "name":
+# first_name lives on auth_user, so that sort orders the filtered rows
+STUDENT_SORT_FIELDS = {
+    "newest": ("-id",),
+    "oldest": ("id",),
+    "name": ("user__first_name", "id"),
+    "-name": ("-user__first_name", "-id"),
+    "joining": ("joining_date", "id"),
+    "-joining": ("-joining_date", "-id"),
+    "valid": ("valid_upto", "id"),
+    "-valid": ("-valid_upto", "-id"),
+}
+
+STUDENT_PAGE_SIZE = 25
+STUDENT_MAX_PAGE_SIZE = 100
+
+
+def student_row_json(s):
+    return {
+        "id": s.id,
+        "username": s.user.username,
+        "name": s.user.first_name,
+        "email": s.user.email,
+        "phone": s.phone,
+        "profile_photo": s.profile_photo.url if s.profile_photo else None,
+        "category": s.category,
+        "access_type": s.access_type,
+        "is_zoom_enabled": s.is_zoom_enabled,
+        "course": s.course.course_name if s.course else "",
+        "batch": s.batch.batch_name if s.batch else "",
+        "joining_date": s.joining_date,
+        "course_duration": s.course_duration,
+        "valid_upto": s.valid_upto,
+        "amount": float(s.amount or 0),
+    }
+
+
 @login_required(login_url="/")
 def student_list(request):
+    """
+    Student table, one page at a time.
+
+    GET filters: search, course, batch (ids), category, access_type,
+    validity (expired / active), sort (STUDENT_SORT_FIELDS), page.
+    ?format=json returns the same page as JSON (plus per_page, up to
+    STUDENT_MAX_PAGE_SIZE) for an incrementally loading client table.
+    """
 
     # Only admin allowed
     if not request.user.is_superuser:
+        if request.GET.get("format") == "json":
+            return JsonResponse({"error": "Only Admin can view student list."}, status=403)
         messages.error(request, "Only Admin can view student list.")
         return redirect("dashboard")
 
-    students = Student.objects.select_related(
-        "user", "course", "batch"
-    ).order_by("-id")
+    search      = request.GET.get("search", "").strip()
+    course      = request.GET.get("course", "").strip()
+    batch       = request.GET.get("batch", "").strip()
+    category    = request.GET.get("category", "").strip()
+    access_type = request.GET.get("access_type", "").strip()
+    validity    = request.GET.get("validity", "").strip()
+    sort        = request.GET.get("sort", "").strip()
+
+    students = Student.objects.select_related("user", "course", "batch")
+
+    # --------------------------------------------------
+    # FILTERS (each backed by a Student index; course / batch ones
+    # together with the id, joining and validity sorts)
+    # --------------------------------------------------
+    if course.isdigit():
+        students = students.filter(course_id=course)
+
+    if batch.isdigit():
+        students = students.filter(batch_id=batch)
+
+    if category:
+        students = students.filter(category=category)
+
+    if access_type:
+        students = students.filter(access_type=access_type)
+
+    today = timezone.localdate()
+    if validity == "expired":
+        students = students.filter(valid_upto__lt=today)
+    elif validity == "active":
+        students = students.filter(Q(valid_upto__gte=today) | Q(valid_upto__isnull=True))
+
+    # --------------------------------------------------
+    # SEARCH + SORT (search ranks unless a sort is chosen)
+    # --------------------------------------------------
+    if search:
+        students = students.filter(id__in=matching_ids("student", search))
+
+    if sort not in STUDENT_SORT_FIELDS:
+        sort = ""
+
+    if search and not sort:
+        students = students.order_by(ranked(search_ids("student", search)), "-id")
+    else:
+        students = students.order_by(*STUDENT_SORT_FIELDS[sort or "newest"])
+
+    # --------------------------------------------------
+    # PAGINATION
+    # --------------------------------------------------
+    per_page = STUDENT_PAGE_SIZE
+    if request.GET.get("format") == "json":
+        try:
+            per_page = int(request.GET.get("per_page") or STUDENT_PAGE_SIZE)
+        except ValueError:
+            pass
+        per_page = max(1, min(per_page, STUDENT_MAX_PAGE_SIZE))
+
+    page_obj = EstimatedCountPaginator(students, per_page).get_page(request.GET.get("page"))
+
+    if request.GET.get("format") == "json":
+        return JsonResponse({
+            "results": [student_row_json(s) for s in page_obj],
+            "page": page_obj.number,
+            "has_next": page_obj.has_next(),
+            "next_page": page_obj.number + 1 if page_obj.has_next() else None,
+            "count": page_obj.paginator.count,
+            "count_is_estimate": page_obj.paginator.is_estimated,
+        })
+
+    params = request.GET.copy()
+    params.pop("page", None)
 
     return render(request, "student_list.html", {
-        "students": students
+        "students": page_obj,
+        "page_obj": page_obj,
+        "page_numbers": page_window(page_obj),
+        "query_string": params.urlencode(),
+
+        "courses": Course.objects.order_by("course_name"),
+        "batches": Batch.objects.select_related("course").order_by("batch_name"),
+        "categories": Student.CATEGORY_CHOICES,
+        "access_types": Student.ACCESS_CHOICES,
+
+        "search": search,
+        "selected_course": course,
+        "selected_batch": batch,
+        "selected_category": category,
+        "selected_access_type": access_type,
+        "validity": validity,
+        "sort": sort,
     })
 
 
@@ -539,15 +760,16 @@ def export_excel(request):
     ])
 
     topics = Topic.objects.select_related(
-        "student__user", "student__course", "batch"
+        "student__user", "student__course", "session__batch"
     ).all()
 
     for t in topics:
+        session = t.session
 
         # Calculate total hours
         try:
-            start_dt = datetime.combine(t.date, t.start_time)
-            end_dt   = datetime.combine(t.date, t.end_time)
+            start_dt = datetime.combine(session.date, session.start_time)
+            end_dt   = datetime.combine(session.date, session.end_time)
             diff     = end_dt - start_dt
             total_hr = round(diff.total_seconds() / 3600, 2)
         except:
@@ -556,14 +778,14 @@ def export_excel(request):
         ws.append([
             f"{t.student.user.first_name} {t.student.user.last_name}",
             t.student.course.course_name,
-            t.batch.batch_name,
-            str(t.date),
-            str(t.start_time),
-            str(t.end_time),
+            session.batch.batch_name,
+            str(session.date),
+            str(session.start_time),
+            str(session.end_time),
             total_hr,
-            t.title,
-            t.description,
-            t.trainer,
+            session.title,
+            session.description,
+            session.trainer,
             t.status,
         ])
 
@@ -584,8 +806,9 @@ def export_excel(request):
 @user_passes_test(is_admin)
 def edit_topic(request, topic_id):
 
+    # topic_id is the TopicSession id: one edit updates every student
     topic = get_object_or_404(
-        Topic,
+        TopicSession,
         id=topic_id,
         estimated_time__isnull=True   # ✅ PROTECT
     )
@@ -597,13 +820,16 @@ def edit_topic(request, topic_id):
         topic.start_time = request.POST.get("start_time")
         topic.end_time = request.POST.get("end_time")
         topic.trainer = request.POST.get("trainer")
-
-        # ✅ SAFE DEFAULT
-        topic.status = request.POST.get("status") or "pending"
-
         topic.zoom_link = request.POST.get("zoom_link")
         topic.save()
 
+        # Blank → keep each student's own status
+        if request.POST.get("status"):
+            topic.progress.update(
+                status=request.POST.get("status"),
+                updated_at=timezone.now(),
+            )
+
         messages.success(request, "Topic updated successfully")
         return redirect("admin_dashboard")
 
@@ -618,7 +844,7 @@ def update_topic(request):
     if request.method == "POST":
 
         topic_id = request.POST.get("topic_id")
-        topic = get_object_or_404(Topic, id=topic_id)
+        topic = get_object_or_404(TopicSession, id=topic_id)
 
         topic.title       = request.POST.get("title")
         topic.description = request.POST.get("description")
@@ -640,7 +866,7 @@ def update_topic(request):
 @user_passes_test(is_admin)
 def delete_topic(request, topic_id):
 
-    topic = get_object_or_404(Topic, id=topic_id)
+    topic = get_object_or_404(TopicSession, id=topic_id)
     topic.delete()
 
     messages.success(request, "Topic deleted successfully!")
@@ -659,7 +885,7 @@ def mentor_delete_topic(request, topic_id):
         messages.error(request, "You are not a mentor.")
         return redirect("login")
 
-    topic = get_object_or_404(Topic, id=topic_id, mentor=mentor)
+    topic = get_object_or_404(TopicSession, id=topic_id, mentor=mentor)
     topic.delete()
 
     messages.success(request, "Topic deleted successfully!")
@@ -675,7 +901,12 @@ def Reports(request):
     to_date       = request.GET.get("to_date")
     course_filter = request.GET.get("course")
 
-    students = Student.objects.all()
+    # Write this process's buffered play counts before reading them
+    flush_downloads(quiet=True)
+
+    students = Student.objects.select_related("course").annotate(
+        download_total=Coalesce(Sum("topic__downloads"), 0)
+    )
 
     # Course Filter
     if course_filter:
@@ -691,17 +922,12 @@ def Reports(request):
     report_data = []
 
     for s in students:
-
-        downloads = Topic.objects.filter(student=s).aggregate(
-            total=Sum("downloads")
-        )["total"] or 0
-
         report_data.append({
             "student": s,
             "course": s.course.course_name if s.course else "-",
             "joining_date": s.joining_date,
             "end_date": s.end_date,
-            "downloads": downloads
+            "downloads": s.download_total
         })
 
     context = {
@@ -911,15 +1137,14 @@ def mentor_today_topics(request):
     from_date = request.GET.get("from_date", "").strip()
     to_date   = request.GET.get("to_date", "").strip()
     course    = request.GET.get("course", "").strip()
+    search    = request.GET.get("search", "").strip()
 
-    topics = Topic.objects.select_related(
-        "student__user",
-        "student__course",
-        "batch"
+    topics = TopicSession.objects.select_related(
+        "batch__course"
     ).filter(mentor=mentor)
 
     # ✅ Detect filter usage
-    filter_applied = any([from_date, to_date, course])
+    filter_applied = any([from_date, to_date, course, search])
 
     # ✅ Default → TODAY only
     if not filter_applied:
@@ -934,18 +1159,37 @@ def mentor_today_topics(request):
 
     if course:
         topics = topics.filter(
-            student__course__course_name__iexact=course
+            batch__course__course_name__iexact=course
         )
 
-    topics = topics.order_by("-date", "-start_time")
+    session_ids = []
+    if search:
+        topics, session_ids = sessions_matching(topics, search)
+
+    # ranked() only with a search: a constant ORDER BY term keeps
+    # session_ctype_date_time_idx from serving the sort
+    if search:
+        topics = topics.order_by(ranked(session_ids), "-date", "-start_time", "-id")
+    else:
+        topics = topics.order_by("-date", "-start_time", "-id")
+
+    page_obj = EstimatedCountPaginator(topics, 10).get_page(request.GET.get("page"))
+    page_obj.object_list = attach_progress_counts(page_obj.object_list)
+
+    params = request.GET.copy()
+    params.pop("page", None)
 
     return render(request, "mentor_today_topics.html", {
-        "topics": topics,
+        "topics": page_obj,
+        "page_obj": page_obj,
+        "page_numbers": page_window(page_obj),
+        "query_string": params.urlencode(),
         "today": today,
         "courses": Course.objects.all(),
         "from_date": from_date,
         "to_date": to_date,
         "selected_course": course,
+        "search": search,
     })
 
 
@@ -958,7 +1202,7 @@ def mentor_delete_topic(request, topic_id):
     mentor = get_object_or_404(Mentor, user=request.user)
 
     topic = get_object_or_404(
-        Topic,
+        TopicSession,
         id=topic_id,
         mentor=mentor   # 🔐 SECURITY
     )
@@ -976,7 +1220,7 @@ def update_topic(request):
         topic_id = request.POST.get("topic_id")
 
         topic = get_object_or_404(
-            Topic,
+            TopicSession,
             id=topic_id,
             mentor=mentor
         )
@@ -1000,8 +1244,6 @@ def update_topic(request):
 @login_required
 def attendance_page(request):
 
-    students = Student.objects.select_related("course", "batch").all()
-
     today = timezone.localdate()
     three_days_before = today - timedelta(days=2)
 
@@ -1041,66 +1283,342 @@ def attendance_page(request):
         messages.success(request, "Attendance added successfully!")
         return redirect("attendance_page")
 
+    # -----------------------------------------
+    # MARK WHOLE BATCH (posts to bulk_attendance)
+    # -----------------------------------------
+    bulk_batch = request.GET.get("batch", "").strip()
+    bulk_students = []
+
+    try:
+        bulk_date = datetime.strptime(request.GET.get("date", ""), "%Y-%m-%d").date()
+    except ValueError:
+        bulk_date = today
+
+    if bulk_batch.isdigit():
+        marked = dict(
+            Attendance.objects.filter(
+                batch_id=bulk_batch, date=bulk_date
+            ).values_list("student_id", "status")
+        )
+        bulk_students = [
+            (s, marked.get(s.id, "Present"))
+            for s in Student.objects.filter(batch_id=bulk_batch)
+                                    .select_related("user")
+                                    .order_by("user__first_name", "id")
+        ]
+
+    # Single students are picked through student_lookup_api, not rendered here
     return render(request, "attendance.html", {
-        "students": students,
-        "records": records
+        "records": records,
+        "batches": Batch.objects.all(),
+        "bulk_batch": bulk_batch,
+        "bulk_date": bulk_date,
+        "bulk_students": bulk_students,
+        "status_choices": Attendance.STATUS_CHOICES,
     })
 
 
 # ======================================================================
-# CALCULATE 6-MONTH ATTENDANCE
+# BULK ATTENDANCE — WHOLE BATCH IN ONE TRANSACTION
 # ======================================================================
-def calculate_6month_attendance():
+@login_required
+def bulk_attendance(request):
+    """
+    Mark a whole batch for one date.
 
-    student_stats = []
-    holidays = list(Holiday.objects.values_list("date", flat=True))
-    students = Student.objects.select_related("user", "course", "batch").all()
+    POST (JSON or form):
+        batch    → batch id
+        date     → YYYY-MM-DD
+        statuses → {"<student_id>": "Present" | "Absent" | "Late" | "Leave"}
+                   (form posts send status_<student_id> fields instead)
+        remark   → optional, applied to every written row
 
-    for s in students:
+    New rows are inserted, changed rows updated, and unchanged / unknown
+    entries skipped — all in one transaction.
+    """
+
+    if not is_admin_or_mentor(request.user):
+        return JsonResponse(
+            {"status": "error", "message": "Admin or mentor access required"},
+            status=403
+        )
+
+    if request.method != "POST":
+        return JsonResponse(
+            {"status": "error", "message": "POST request required"},
+            status=405
+        )
 
-        if not s.joining_date:
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+        except Exception:
+            return JsonResponse(
+                {"status": "error", "message": "Invalid JSON"},
+                status=400
+            )
+        if not isinstance(data, dict):
+            return JsonResponse(
+                {"status": "error", "message": "JSON body must be an object"},
+                status=400
+            )
+        statuses = data.get("statuses") or {}
+    else:
+        data = request.POST
+        statuses = {
+            key[len("status_"):]: value
+            for key, value in request.POST.items()
+            if key.startswith("status_")
+        }
+
+    batch_id = data.get("batch")
+    remark   = data.get("remark")
+
+    try:
+        day = datetime.strptime(str(data.get("date")), "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse(
+            {"status": "error", "message": "date must be YYYY-MM-DD"},
+            status=400
+        )
+
+    if not batch_id or not isinstance(statuses, dict):
+        return JsonResponse(
+            {"status": "error", "message": "batch and statuses are required"},
+            status=400
+        )
+
+    try:
+        if isinstance(batch_id, bool):
+            raise TypeError
+        batch_id = int(batch_id)
+    except (TypeError, ValueError):
+        return JsonResponse(
+            {"status": "error", "message": "batch must be an id"},
+            status=400
+        )
+
+    if not all(isinstance(s, str) for s in statuses.values()):
+        return JsonResponse(
+            {"status": "error", "message": "statuses must map student ids to a status"},
+            status=400
+        )
+
+    if remark is not None and not isinstance(remark, str):
+        return JsonResponse(
+            {"status": "error", "message": "remark must be text"},
+            status=400
+        )
+
+    batch = Batch.objects.filter(id=batch_id).first()
+    if batch is None:
+        return JsonResponse(
+            {"status": "error", "message": "Batch not found"},
+            status=404
+        )
+
+    # student_id → course_id for everyone in the batch
+    batch_students = dict(
+        Student.objects.filter(batch=batch).values_list("id", "course_id")
+    )
+
+    existing = {
+        a.student_id: a
+        for a in Attendance.objects.filter(
+            student_id__in=batch_students, date=day
+        )
+    }
+
+    valid_statuses = dict(Attendance.STATUS_CHOICES)
+
+    to_create = []
+    to_update = []
+    skipped   = 0
+
+    for raw_id, status in statuses.items():
+        try:
+            student_id = int(raw_id)
+        except (TypeError, ValueError):
+            skipped += 1
             continue
 
-        start = s.joining_date
-        end   = start + relativedelta(months=6)
+        if student_id not in batch_students or status not in valid_statuses:
+            skipped += 1
+            continue
+
+        record = existing.get(student_id)
+
+        if record is None:
+            to_create.append(Attendance(
+                student_id=student_id,
+                course_id=batch_students[student_id],
+                batch=batch,
+                date=day,
+                status=status,
+                remark=remark or "",
+            ))
+        elif record.status == status and (remark is None or record.remark == remark):
+            skipped += 1
+        else:
+            record.status = status
+            if remark is not None:
+                record.remark = remark
+            to_update.append(record)
+
+    with transaction.atomic():
+        # Upsert guards against a row created since we read `existing`
+        Attendance.objects.bulk_create(
+            to_create,
+            update_conflicts=True,
+            unique_fields=["student", "date"],
+            update_fields=["status", "remark", "updated_at"],
+        )
 
-        working_days = 0
-        current = start
+        # bulk_update() skips auto_now
+        now = timezone.now()
+        for record in to_update:
+            record.updated_at = now
+        Attendance.objects.bulk_update(to_update, ["status", "remark", "updated_at"])
 
-        # Count working days
-        while current <= end:
+        # bulk writes skip signals → refresh derived tables explicitly
+        touched = [a.student_id for a in to_create + to_update]
 
-            weekday = current.weekday()  # Mon=0, Sun=6
+        refresh_attendance_summaries(touched)
+        refresh_attendance_months({(sid, month_start(day)) for sid in touched})
 
-            if weekday < 5 and current not in holidays:
-                working_days += 1
+    return JsonResponse({
+        "status": "success",
+        "batch": batch.id,
+        "date": day.isoformat(),
+        "inserted": len(to_create),
+        "updated": len(to_update),
+        "skipped": skipped,
+    })
 
-            current += timedelta(days=1)
 
-        # Count Present Days
-        present_days = Attendance.objects.filter(
-            student=s,
-            status="Present",
-            date__gte=start,
-            date__lte=end
-        ).count()
+# ======================================================================
+# BATCH ATTENDANCE HEATMAP API (MENTOR / ADMIN)
+# ======================================================================
+HEATMAP_MAX_DAYS = 366
+
+
+@login_required
+def batch_attendance_heatmap_api(request, batch_id):
+    """
+    Students × days attendance grid for one batch.
+
+    GET ?from_date=YYYY-MM-DD&to_date=YYYY-MM-DD&encoding=base64|rle
+    Defaults to the last 30 days. Cells hold Attendance.STATUS_CODES.
+    """
+
+    if not is_admin_or_mentor(request.user):
+        return JsonResponse(
+            {"status": "error", "message": "Admin or mentor access required"},
+            status=403
+        )
+
+    batch = get_object_or_404(Batch, id=batch_id)
+
+    today = timezone.localdate()
+
+    try:
+        to_date = (
+            datetime.strptime(request.GET["to_date"], "%Y-%m-%d").date()
+            if request.GET.get("to_date") else today
+        )
+        from_date = (
+            datetime.strptime(request.GET["from_date"], "%Y-%m-%d").date()
+            if request.GET.get("from_date") else to_date - timedelta(days=29)
+        )
+    except ValueError:
+        return JsonResponse(
+            {"status": "error", "message": "Dates must be YYYY-MM-DD"},
+            status=400
+        )
+
+    if to_date < from_date or (to_date - from_date).days >= HEATMAP_MAX_DAYS:
+        return JsonResponse(
+            {"status": "error", "message": f"Date range must be 1–{HEATMAP_MAX_DAYS} days"},
+            status=400
+        )
+
+    encoding = "rle" if request.GET.get("encoding") == "rle" else "base64"
+
+    return JsonResponse({
+        "status": "success",
+        **batch_heatmap(batch, from_date, to_date, encoding),
+    })
+
+
+# ======================================================================
+# CALCULATE 6-MONTH ATTENDANCE
+# ======================================================================
+STATS_SORT_FIELDS = {
+    "name": ("user__first_name", "id"),
+    "-name": ("-user__first_name", "-id"),
+    "present": ("present", "id"),
+    "-present": ("-present", "id"),
+    "joining": ("joining_date", "id"),
+    "-joining": ("-joining_date", "id"),
+}
+
+
+def calculate_6month_attendance(page=1, sort="name", per_page=25):
+
+    calendar = get_working_day_calendar()
+
+    # Present days inside each student's own joining_date..+6 months
+    # window, counted for every student in ONE grouped query
+    students = (
+        Student.objects
+        .filter(joining_date__isnull=False)
+        .select_related("user", "course", "batch")
+        .annotate(
+            present=Count(
+                "attendance",
+                filter=Q(
+                    attendance__status="Present",
+                    attendance__date__gte=F("joining_date"),
+                    attendance__date__lte=AddMonths(F("joining_date"), 6),
+                ),
+            )
+        )
+        .order_by(*STATS_SORT_FIELDS.get(sort, STATS_SORT_FIELDS["name"]))
+    )
+
+    paginator = Paginator(students, per_page)
+    page_obj  = paginator.get_page(page)
+
+    student_stats = []
+
+    for s in page_obj.object_list:
+
+        start = s.joining_date
+        end   = start + relativedelta(months=6)
 
-        percentage = round((present_days / working_days) * 100, 2) if working_days else 0
+        # Count working days (Mon–Fri minus holidays)
+        working_days = calendar.working_days(start, end)
+
+        percentage = round((s.present / working_days) * 100, 2) if working_days else 0
 
         student_stats.append({
             "name": s.user.first_name,
             "course": s.course.course_name if s.course else "",
             "batch": s.batch.batch_name if s.batch else "",
             "working_days": working_days,
-            "present": present_days,
+            "present": s.present,
             "percentage": percentage,
         })
 
-    return student_stats
+    page_obj.object_list = student_stats
+    return page_obj
 
 # ======================================================
 # ADMIN ATTENDANCE PAGE — FILTERS + VIEW + EXPORT
 # ======================================================
+ATTENDANCE_ORDERING = ("-date", "-id")
+ATTENDANCE_PAGE_SIZE = 50
+
 
 @login_required
 def admin_attendance_page(request):
@@ -1120,6 +1638,9 @@ def admin_attendance_page(request):
     # -------------------- ANY FILTER APPLIED? --------------------
     filters = request.GET.copy()
     filters.pop("page", None)
+    filters.pop("cursor", None)
+    filters.pop("stats_page", None)
+    filters.pop("stats_sort", None)
     filter_applied = any(v.strip() for v in filters.values())
 
     # Default: show today's attendance
@@ -1186,7 +1707,7 @@ def admin_attendance_page(request):
     # ======================================================
     # ORDER LIST
     # ======================================================
-    records = records.order_by("-date", "-id")
+    records = records.order_by(*ATTENDANCE_ORDERING)
 
     # ======================================================
     # EXPORT EXCEL
@@ -1194,18 +1715,41 @@ def admin_attendance_page(request):
     if request.method == "POST" and request.POST.get("export") == "1":
         return export_attendance_excel(records)
 
+    # ======================================================
+    # KEYSET PAGINATION (NO OFFSET, NO COUNT)
+    # ======================================================
+    page = keyset_paginate(
+        records.select_related("student__user"),
+        ATTENDANCE_ORDERING,
+        cursor=request.GET.get("cursor"),
+        per_page=ATTENDANCE_PAGE_SIZE,
+    )
+
+    page_params = request.GET.copy()
+    page_params.pop("cursor", None)
+
     # ======================================================
     # LOAD FILTER OPTIONS
     # ======================================================
     courses = Course.objects.all()
     batches = Batch.objects.all()
-    student_stats = calculate_6month_attendance()
+    stats_sort = request.GET.get("stats_sort", "name")
+    student_stats = calculate_6month_attendance(
+        page=request.GET.get("stats_page"),
+        sort=stats_sort,
+    )
+
+    stats_params = request.GET.copy()
+    stats_params.pop("stats_page", None)
 
     return render(request, "attendance_admin.html", {
-        "records": records,
+        "records": page,
+        "page_query_string": page_params.urlencode(),
         "courses": courses,
         "batches": batches,
         "student_stats": student_stats,
+        "stats_sort": stats_sort,
+        "stats_query_string": stats_params.urlencode(),
         "start_month": start_month,
         "end_month": end_month,
         "month": month,
@@ -1215,40 +1759,54 @@ def admin_attendance_page(request):
 
 
 # ======================================================
-# EXPORT ATTENDANCE TO EXCEL
+# EXPORT ATTENDANCE TO EXCEL (STREAMING, FLAT MEMORY)
 # ======================================================
-def export_attendance_excel(records):
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_SPOOL_MAX_SIZE = 8 * 1024 * 1024   # spill to disk above 8 MB
 
-    from openpyxl import Workbook
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Attendance Report"
+def export_attendance_excel(records):
+
+    # Write-only workbook keeps rows on disk instead of in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Attendance Report")
 
     # Header Row
     ws.append([
         "Date", "Student", "Course", "Batch", "Status", "Remark"
     ])
 
-    # Add Data Rows
-    for r in records:
+    # Plain tuples, fetched in chunks (no model instances, no per-row joins)
+    rows = records.values_list(
+        "date",
+        "student__user__first_name",
+        "course__course_name",
+        "batch__batch_name",
+        "status",
+        "remark",
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for day, name, course, batch, status, remark in rows:
         ws.append([
-            r.date.strftime("%Y-%m-%d") if r.date else "",
-            r.student.user.first_name if r.student else "",
-            r.course.course_name if r.course else "",
-            r.batch.batch_name if r.batch else "",
-            r.status,
-            r.remark or "",
+            day.strftime("%Y-%m-%d") if day else "",
+            name or "",
+            course or "",
+            batch or "",
+            status,
+            remark or "",
         ])
 
-    # Create response (download)
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    response["Content-Disposition"] = "attachment; filename=Attendance_Report.xlsx"
+    # Serialize to a spooled temp file, then stream it out
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
 
-    wb.save(response)
-    return response
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename="Attendance_Report.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
 
 # ======================================================
@@ -1263,7 +1821,13 @@ def edit_attendance(request, id):
         attendance.date   = request.POST.get("date")
         attendance.status = request.POST.get("status")
         attendance.remark = request.POST.get("remark")
-        attendance.save()
+
+        try:
+            with transaction.atomic():
+                attendance.save()
+        except IntegrityError:
+            messages.error(request, f"⚠️ Attendance already marked for this student on {attendance.date}.")
+            return redirect("attendance_page")
 
         messages.success(request, "✏️ Attendance updated successfully!")
         return redirect("attendance_page")
@@ -1299,7 +1863,6 @@ import json
 import mimetypes
 from io import BytesIO
 from datetime import datetime, date, timedelta
-from wsgiref.util import FileWrapper
 
 # ======================================================
 # DJANGO IMPORTS
@@ -1309,6 +1872,7 @@ from django.http import (
     StreamingHttpResponse,
     Http404,
     HttpResponse,
+    HttpResponseRedirect,
 )
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
@@ -1512,78 +2076,243 @@ def student_topics_api(request):
     if not user_id:
         return JsonResponse({"error": "user_id is required"}, status=400)
 
-    student = Student.objects.filter(user__id=user_id).first()
+    student = (
+        Student.objects
+        .select_related("user", "course", "batch")
+        .filter(user__id=user_id)
+        .first()
+    )
 
     if not student:
         return JsonResponse({"error": "Student not found"}, status=404)
 
-    topics = Topic.objects.filter(student=student).order_by("-date", "-start_time")
+    topics = student_topic_rows(student).order_by("-session__date", "-session__start_time")
 
-    topic_list = []
-    total_hours = 0
-    completed_tasks = 0
-    pending_tasks = 0
-    graph_points = []
+    # FINAL RESPONSE
+    return JsonResponse({
+        **student_topics_header(student),
+        **student_topic_totals(student),
 
-    for t in topics:
+        "topics": [topic_row_json(t, student) for t in topics]
+    })
 
-        # calculate total hours
-        if t.start_time and t.end_time:
-            dt1 = datetime.combine(date.today(), t.start_time)
-            dt2 = datetime.combine(date.today(), t.end_time)
-            hours = (dt2 - dt1).seconds / 3600
-        else:
-            hours = float(t.total_hours or 0)
 
-        total_hours += hours
+# ======================================================
+# STUDENT TOPICS — V2 (CURSOR PAGINATED)
+# ======================================================
+STUDENT_TOPICS_ORDERING = ("-session__date", "-session__start_time", "id")
+STUDENT_TOPICS_PAGE_SIZE = 20
+STUDENT_TOPICS_MAX_PAGE_SIZE = 100
 
-        # task status
-        if getattr(t, "status", "").lower() == "completed":
-            completed_tasks += 1
-        else:
-            pending_tasks += 1
 
-        topic_list.append({
-            "id": t.id,
-            "date": t.date,
-            "start_time": str(t.start_time),
-            "end_time": str(t.end_time),
-            "total_hours": hours,
-            "title": t.title,
-            "description": t.description,
-            "trainer": t.trainer,
-            "video": f"/api/student/video/stream/{t.id}/" if t.video else None,
-            "zoom_link": t.zoom_link if student.access_type == "all_access" else None
-        })
+def student_topic_rows(student):
+    return (
+        Topic.objects
+        .filter(student=student)
+        .select_related("session")
+        .annotate(duration=time_between("session__start_time", "session__end_time"))
+    )
 
-    # graph points last 7
-    last_7 = topics.order_by("date")[:7]
-    for t in last_7:
-        graph_points.append({
-            "x": str(t.date),
-            "y": float(getattr(t, "total_hours", 0) or 0)
-        })
 
-    # task completion %
-    total_tasks = completed_tasks + pending_tasks
-    task_percentage = round((completed_tasks / total_tasks) * 100, 2) if total_tasks else 0
+def _hours(duration):
+    return duration.total_seconds() / 3600 if duration else 0
 
-    # FINAL RESPONSE
-    return JsonResponse({
+
+def student_topics_header(student):
+    return {
         "student_name": student.user.first_name,
         "course_name": student.course.course_name if student.course else "",
         "batch_name": student.batch.batch_name if student.batch else "",
         "access_type": student.access_type,
 
         "profile_photo": student.profile_photo.url if student.profile_photo else None,  # ⭐ NEW ⭐
+    }
+
+
+def student_topic_totals(student):
+    """Hours, task counts and graph points — two queries, whatever the history size."""
+    duration = time_between("session__start_time", "session__end_time")
+    topics = Topic.objects.filter(student=student)
+
+    totals = topics.aggregate(
+        hours=Sum(duration),
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+    )
+
+    # graph points last 7 (days), hours per day
+    per_day = list(
+        topics
+        .values("session__date")
+        .annotate(hours=Sum(duration))
+        .order_by("-session__date")[:7]
+    )
 
-        "total_hours": round(total_hours, 1),
+    completed_tasks = totals["completed"]
+    pending_tasks = totals["total"] - completed_tasks
+
+    return {
+        "total_hours": round(_hours(totals["hours"]), 1),
         "completed_tasks": completed_tasks,
         "pending_tasks": pending_tasks,
-        "task_percentage": task_percentage,
-        "graph_points": graph_points,
+        "task_percentage": round((completed_tasks / totals["total"]) * 100, 2) if totals["total"] else 0,
+        "graph_points": [
+            {"x": str(p["session__date"]), "y": round(_hours(p["hours"]), 2)}
+            for p in reversed(per_day)
+        ],
+    }
+
+
+def topic_row_json(t, student):
+    session = t.session
+    return {
+        "id": t.id,
+        "date": session.date,
+        "start_time": str(session.start_time),
+        "end_time": str(session.end_time),
+        "total_hours": _hours(t.duration),
+        "title": session.title,
+        "description": session.description,
+        "trainer": session.trainer,
+        "content_type": session.content_type,
+        "status": t.status,
+        "video": f"/api/student/video/stream/{t.id}/" if session.video else None,
+        "zoom_link": session.zoom_link if student.access_type == "all_access" else None
+    }
+
+
+@csrf_exempt
+def student_topics_api_v2(request):
+    """
+    GET ?user_id=&cursor=&limit=
+
+    Same data as student_topics_api, but `topics` is one page at a time
+    (pass `next_cursor` back as `cursor`) and every total is computed in
+    the database.
+    """
+    user_id = request.GET.get("user_id")
+
+    if not user_id:
+        return JsonResponse({"error": "user_id is required"}, status=400)
+
+    student = (
+        Student.objects
+        .select_related("user", "course", "batch")
+        .filter(user__id=user_id)
+        .first()
+    )
+
+    if not student:
+        return JsonResponse({"error": "Student not found"}, status=404)
+
+    try:
+        limit = int(request.GET.get("limit") or STUDENT_TOPICS_PAGE_SIZE)
+    except ValueError:
+        limit = STUDENT_TOPICS_PAGE_SIZE
+    limit = max(1, min(limit, STUDENT_TOPICS_MAX_PAGE_SIZE))
+
+    page = keyset_paginate(
+        student_topic_rows(student),
+        STUDENT_TOPICS_ORDERING,
+        cursor=request.GET.get("cursor"),
+        per_page=limit,
+    )
+
+    response = {
+        **student_topics_header(student),
+        "topics": [topic_row_json(t, student) for t in page],
+        "next_cursor": page.next_cursor,
+        "has_next": page.has_next,
+    }
+
+    # Totals describe the whole history; only needed with the first page
+    if page.is_first:
+        response.update(student_topic_totals(student))
 
-        "topics": topic_list
+    return JsonResponse(response)
+
+
+
+
+# ======================================================
+# STUDENT APP SYNC (ONLY WHAT CHANGED)
+# ======================================================
+@csrf_exempt
+def student_sync_api(request):
+    """
+    GET ?user_id=&since=<token>
+
+    Topics / tasks, attendance, submissions and payments changed since
+    the token, ids deleted since then, and the token for the next call.
+    No (or an expired) token → "full": true with everything; the client
+    should replace its cache.
+    """
+    user_id = request.GET.get("user_id")
+
+    if not user_id:
+        return JsonResponse({"error": "user_id is required"}, status=400)
+
+    student = Student.objects.filter(user__id=user_id).first()
+
+    if not student:
+        return JsonResponse({"error": "Student not found"}, status=404)
+
+    # Taken before reading, so nothing written meanwhile is skipped next time
+    now = timezone.now()
+    cutoff, full = changed_since(request.GET.get("since"), now)
+
+    topics = student_topic_rows(student)
+    attendance = Attendance.objects.filter(student=student)
+    submissions = TaskSubmission.objects.filter(student=student)
+    payments = Payment.objects.filter(student=student)
+
+    if not full:
+        # Session edits (title, time, video…) change every student's row
+        topics = topics.filter(Q(updated_at__gt=cutoff) | Q(session__updated_at__gt=cutoff))
+        attendance = attendance.filter(updated_at__gt=cutoff)
+        submissions = submissions.filter(updated_at__gt=cutoff)
+        payments = payments.filter(updated_at__gt=cutoff)
+
+    return JsonResponse({
+        "status": "success",
+        "token": make_token(now),
+        "full": full,
+
+        "topics": [topic_row_json(t, student) for t in topics],
+
+        "attendance": [
+            {
+                "id": a.id,
+                "date": a.date,
+                "status": a.status,
+                "remark": a.remark or "",
+            }
+            for a in attendance
+        ],
+
+        "submissions": [
+            {
+                "id": sub.id,
+                "topic_id": sub.topic_id,
+                "file": sub.file.url if sub.file else None,
+                "submitted_at": sub.submitted_at,
+            }
+            for sub in submissions
+        ],
+
+        "payments": [
+            {
+                "id": p.id,
+                "amount_paid": float(p.amount_paid),
+                "utr": p.utr,
+                "status": p.status,
+                "admin_remark": p.admin_remark or "",
+                "created_at": p.created_at,
+            }
+            for p in payments
+        ],
+
+        "deleted": {} if full else deleted_since(student, cutoff),
     })
 
 
@@ -1592,33 +2321,137 @@ def student_topics_api(request):
 # ======================================================================
 # 1️⃣ VIDEO STREAM — NO DOWNLOAD ALLOWED
 # ======================================================================
+def no_download_headers(response):
+
+    # ❌ Prevent download
+    response["Content-Disposition"] = "inline"
+    response["X-Content-Type-Options"] = "nosniff"
+    response["Cache-Control"] = "no-store"
+
+    # ❌ Removes Save-As option in most browsers
+    response["Content-Security-Policy"] = "sandbox allow-scripts allow-same-origin"
+
+    return response
+
+
+def serve_local_video(request, name, video_path, is_async=False):
+    if not os.path.exists(video_path):
+        raise Http404("Video file missing")
+
+    # ⏩ Range aware; bytes go out via the configured delivery backend
+    # (Python streaming, sendfile, or X-Accel-Redirect / X-Sendfile)
+    response = deliver_video(
+        request,
+        name,
+        video_path,
+        mimetypes.guess_type(video_path)[0] or "video/mp4",
+        is_async,
+    )
+
+    return no_download_headers(response)
+
+
 def stream_video(request, topic_id):
     try:
-        topic = Topic.objects.get(id=topic_id)
+        topic = Topic.objects.select_related("session").get(id=topic_id)
     except Topic.DoesNotExist:
         raise Http404("Video not found")
 
-    video_path = topic.video.path
-    if not os.path.exists(video_path):
-        raise Http404("Video file missing")
+    video = topic.session.video
+    if not video:
+        raise Http404("Video not found")
+
+    # 📈 Buffered play counter (seeks are not counted)
+    if is_new_play(request):
+        record_download(topic.id)
+
+    # ☁️ Remote storage → 302 to a short-lived signed URL (no proxying)
+    if not is_local(video.storage, video.name):
+        url, _ = signed_media_url(video)
+        return no_download_headers(HttpResponseRedirect(url))
+
+    return serve_local_video(request, video.name, video.path)
 
-    file = open(video_path, "rb")
 
-    response = StreamingHttpResponse(
-        FileWrapper(file, blksize=1024 * 64),
-        content_type=mimetypes.guess_type(video_path)[0] or "video/mp4"
+async def stream_video_async(request, topic_id):
+    """
+    Same as stream_video, but under ASGI (uvicorn) the body is an async
+    iterator so one process can serve hundreds of viewers. See README.
+    """
+    topic = await (
+        Topic.objects
+        .filter(id=topic_id)
+        .select_related("session")
+        .only("id", "session__video")
+        .afirst()
     )
 
-    # ❌ Prevent download
-    response["Content-Disposition"] = "inline"
-    response["Accept-Ranges"] = "bytes"
-    response["X-Content-Type-Options"] = "nosniff"
-    response["Cache-Control"] = "no-store"
+    if not topic or not topic.session.video:
+        raise Http404("Video not found")
 
-    # ❌ Removes Save-As option in most browsers
-    response["Content-Security-Policy"] = "sandbox allow-scripts allow-same-origin"
+    if is_new_play(request):
+        await sync_to_async(record_download)(topic.id)
 
-    return response
+    video = topic.session.video
+    if not is_local(video.storage, video.name):
+        url, _ = signed_media_url(video)
+        return no_download_headers(HttpResponseRedirect(url))
+
+    # Under WSGI Django would drain an async body into memory first:
+    # hand it the plain iterator there
+    return serve_local_video(
+        request, video.name, video.path, is_async=isinstance(request, ASGIRequest)
+    )
+
+
+# ======================================================================
+# 🔏 SIGNED VIDEO URLS
+# ======================================================================
+def video_url_api(request, topic_id):
+    """
+    Issue a time-limited signed URL for one of the student's videos.
+
+    GET ?user_id=<id>  →  {"url": ..., "expires_at": <unix seconds>}
+    """
+
+    user_id = request.GET.get("user_id")
+    if not user_id:
+        return JsonResponse({"error": "user_id is required"}, status=400)
+
+    topic = (
+        Topic.objects
+        .filter(id=topic_id, student__user__id=user_id)
+        .select_related("session")
+        .only("id", "session__video")
+        .first()
+    )
+
+    if not topic or not topic.session.video:
+        return JsonResponse({"error": "Video not found"}, status=404)
+
+    url, expires = signed_media_url(topic.session.video)
+    record_download(topic.id)
+
+    return JsonResponse({
+        "url": request.build_absolute_uri(url),
+        "expires_at": expires,
+    })
+
+
+def signed_media(request, name):
+    """
+    Local stand-in for a storage CDN: serves a file if the link is valid.
+    Bytes only bypass Django with an offload VIDEO_DELIVERY_BACKEND.
+    """
+
+    if not verify(name, request.GET.get("expires"), request.GET.get("signature")):
+        return HttpResponse("Link expired or invalid", status=403)
+
+    storage = TopicSession._meta.get_field("video").storage
+    if not is_local(storage, name):
+        raise Http404("Video not found")
+
+    return serve_local_video(request, name, storage.path(name))
 
 # ============================================================================
 
@@ -1635,13 +2468,34 @@ from students.models import Topic
 @login_required
 def delete_topic(request, topic_id):
 
-    topic = get_object_or_404(Topic, id=topic_id)
+    # topic_id is the TopicSession id: removes the topic for the whole batch
+    topic = get_object_or_404(TopicSession, id=topic_id)
     topic.delete()
 
     messages.success(request, "Task deleted successfully!")
     return redirect("task_list")
 
 
+# ---------------------------------------------------
+# 🟥 DELETE ONE STUDENT'S TASK
+# ---------------------------------------------------
+@login_required
+def delete_task(request, task_id):
+
+    # task_id is the student's Topic row; the shared session goes only
+    # once nobody else is assigned to it
+    task = get_object_or_404(Topic, id=task_id, session__content_type="task")
+    session = task.session
+
+    with transaction.atomic():
+        task.delete()
+        if not session.progress.exists():
+            session.delete()
+
+    messages.success(request, "Task deleted successfully!")
+    return redirect("task_list")
+
+
 # =======================================================
 # 🔹 HELPER: SAFE HOURS CALCULATION
 # =======================================================
@@ -1739,7 +2593,7 @@ def student_dashboard_api(request):
         )
 
     student = Student.objects.select_related(
-        "user", "course", "batch"
+        "user", "course", "batch", "attendance_summary"
     ).filter(user__id=user_id).first()
 
     if not student or not student.joining_date:
@@ -1749,19 +2603,14 @@ def student_dashboard_api(request):
         )
 
     # ==================================================
-    # FIXED 90 DAYS WINDOW
+    # FIXED 90 DAYS WINDOW (PRE-COUNTED IN SUMMARY)
     # ==================================================
-    start_date = student.joining_date
-    end_date = start_date + relativedelta(months=3)
     TOTAL_DAYS = 90
 
-    attendance_qs = Attendance.objects.filter(
-        student=student,
-        date__range=(start_date, end_date)
-    )
+    summary = get_attendance_summary(student)
 
-    present_days = attendance_qs.filter(status="Present").count()
-    late_days = attendance_qs.filter(status="Late").count()
+    present_days = summary.present_days
+    late_days = summary.late_days
 
     attended_days = present_days + late_days
 
@@ -1808,13 +2657,13 @@ def student_dashboard_api(request):
 
         completed = Topic.objects.filter(
             student=student,
-            date=day,
+            session__date=day,
             status="completed"
         ).count()
 
         pending = Topic.objects.filter(
             student=student,
-            date=day
+            session__date=day
         ).exclude(status="completed").count()
 
         weekly_graph.append({
@@ -1860,7 +2709,9 @@ def student_course_progress_api(request):
             status=400
         )
 
-    student = Student.objects.filter(user__id=user_id).first()
+    student = Student.objects.select_related(
+        "attendance_summary"
+    ).filter(user__id=user_id).first()
     if not student:
         return JsonResponse(
             {"status": "error", "message": "Student not found"},
@@ -1877,16 +2728,11 @@ def student_course_progress_api(request):
     # 1️⃣ COURSE PROGRESS
     # ==================================================
     course_start = student.joining_date
-    course_end   = student.joining_date + relativedelta(months=3)
+    course_end   = student.joining_date + relativedelta(months=ATTENDANCE_WINDOW_MONTHS)
 
     total_days = (course_end - course_start).days + 1
 
-    attendance_all = Attendance.objects.filter(
-        student=student,
-        date__range=(course_start, course_end)
-    )
-
-    present_days = attendance_all.filter(status="Present").count()
+    present_days = get_attendance_summary(student).present_days
 
     progress_percent = round((present_days / total_days) * 100, 2)
     highest_score    = min(present_days * 5, 100)
@@ -1909,8 +2755,10 @@ def student_course_progress_api(request):
 
     topics_qs = Topic.objects.filter(
         student=student,
-        date__range=(table_start, table_end)
-    ).order_by("date", "start_time")
+        session__date__range=(table_start, table_end)
+    ).select_related(
+        "session__mentor__user"
+    ).order_by("session__date", "session__start_time")
 
     # ==================================================
     # 3️⃣ TABLE DATA
@@ -1918,11 +2766,12 @@ def student_course_progress_api(request):
     table_data = []
 
     for t in topics_qs:
+        session = t.session
 
         # Trainer name
         trainer = (
-            t.trainer
-            or (t.mentor.user.first_name if t.mentor else "N/A")
+            session.trainer
+            or (session.mentor.user.first_name if session.mentor else "N/A")
         )
 
         # Video URL
@@ -1930,14 +2779,14 @@ def student_course_progress_api(request):
             request.build_absolute_uri(
                 f"/api/student/video/stream/{t.id}/"
             )
-            if t.video else None
+            if session.video else None
         )
 
         # ⏱ CALCULATE TOTAL HOURS (SAFE)
         total_hours = "—"
-        if t.start_time and t.end_time:
-            start = datetime.combine(date.today(), t.start_time)
-            end   = datetime.combine(date.today(), t.end_time)
+        if session.start_time and session.end_time:
+            start = datetime.combine(date.today(), session.start_time)
+            end   = datetime.combine(date.today(), session.end_time)
             diff  = end - start
 
             minutes = diff.seconds // 60
@@ -1947,17 +2796,17 @@ def student_course_progress_api(request):
             total_hours = f"{hrs}h {mins}m"
 
         table_data.append({
-            "date": t.date.strftime("%d/%m/%Y"),
-            "topic": t.title,
+            "date": session.date.strftime("%d/%m/%Y"),
+            "topic": session.title,
             "trainer": trainer,
 
             # ✅ NEW FIELDS (VERY IMPORTANT)
-            "start_time": t.start_time.strftime("%H:%M") if t.start_time else "—",
-            "end_time":   t.end_time.strftime("%H:%M") if t.end_time else "—",
+            "start_time": session.start_time.strftime("%H:%M") if session.start_time else "—",
+            "end_time":   session.end_time.strftime("%H:%M") if session.end_time else "—",
             "hours":      total_hours,
 
             "status": t.status.capitalize(),
-            "zoom_link": t.zoom_link or "N/A",
+            "zoom_link": session.zoom_link or "N/A",
             "video": video_url,
         })
 
@@ -1987,6 +2836,9 @@ def student_course_progress_api(request):
 
 
 
+WEEKLY_GRAPH_VALUES = {"Present": 1, "Late": 0.5}
+
+
 @csrf_exempt
 def student_attendance_dashboard_api(request):
     """
@@ -1998,6 +2850,9 @@ def student_attendance_dashboard_api(request):
     - Successful Attendance % (Present + Late)
     - On-Time % / Late %
     - Weekly Attendance (Mon–Sun) [UI graph]
+
+    Two queries: the student joined with its AttendanceSummary (counts),
+    and one range read of the packed AttendanceMonth rows (week strip).
     """
 
     user_id = request.GET.get("user_id")
@@ -2007,7 +2862,9 @@ def student_attendance_dashboard_api(request):
             status=400
         )
 
-    student = Student.objects.select_related("user").filter(
+    student = Student.objects.select_related(
+        "user", "attendance_summary"
+    ).filter(
         user__id=user_id
     ).first()
 
@@ -2021,22 +2878,19 @@ def student_attendance_dashboard_api(request):
     # 📅 3 MONTH DATE RANGE
     # ==================================================
     start_date = student.joining_date
-    end_date = start_date + relativedelta(months=3)
+    end_date = start_date + relativedelta(months=ATTENDANCE_WINDOW_MONTHS)
 
     total_days = (end_date - start_date).days + 1
 
-    attendance_qs = Attendance.objects.filter(
-        student=student,
-        date__range=(start_date, end_date)
-    )
-
     # ==================================================
-    # 📊 COUNTS
+    # 📊 COUNTS (ONE SUMMARY ROW)
     # ==================================================
-    present_days = attendance_qs.filter(status="Present").count()
-    late_days = attendance_qs.filter(status="Late").count()
-    absent_days = attendance_qs.filter(status="Absent").count()
-    leave_days = attendance_qs.filter(status="Leave").count()
+    summary = get_attendance_summary(student)
+
+    present_days = summary.present_days
+    late_days = summary.late_days
+    absent_days = summary.absent_days
+    leave_days = summary.leave_days
 
     total_attendance = present_days + late_days + absent_days + leave_days
 
@@ -2066,21 +2920,20 @@ def student_attendance_dashboard_api(request):
     week_labels = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
     weekly_attendance = []
 
+    # Whole week decoded from packed monthly rows (max 2 rows),
+    # limited to the same 3-month window as the counts
+    week_statuses = attendance_statuses(
+        student.id,
+        max(start_of_week, start_date),
+        min(start_of_week + timedelta(days=6), end_date),
+    )
+
     for i in range(7):
         current_date = start_of_week + timedelta(days=i)
-        record = attendance_qs.filter(date=current_date).first()
-
-        if record:
-            if record.status == "Present":
-                value = 1
-            elif record.status == "Late":
-                value = 0.5
-            else:
-                value = 0
-            status = record.status
-        else:
-            value = 0
-            status = "Absent"
+
+        # Unmarked days count as Absent on the graph
+        status = week_statuses.get(current_date, "Absent")
+        value = WEEKLY_GRAPH_VALUES.get(status, 0)
 
         weekly_attendance.append({
             "day": week_labels[i],
@@ -2174,7 +3027,7 @@ def student_task_log_api(request):
             Topic,
             id=topic_id,
             student=student,
-            content_type="task"   # 🔥 ENSURE TASK ONLY
+            session__content_type="task"   # 🔥 ENSURE TASK ONLY
         )
 
         submission, created = TaskSubmission.objects.get_or_create(
@@ -2203,36 +3056,37 @@ def student_task_log_api(request):
         Topic.objects
         .filter(
             student=student,
-            content_type="task"   # 🔥 THIS WAS THE BUG
+            session__content_type="task"   # 🔥 THIS WAS THE BUG
         )
-        .select_related("mentor", "mentor__user")
+        .select_related("session__mentor__user")
         .prefetch_related("submissions")
-        .order_by("-date", "-id")
+        .order_by("-session__date", "-id")
     )
 
     task_list = []
 
     for t in tasks:
+        session = t.session
         submission = t.submissions.first()
 
         # Mentor name logic
         mentor_name = "N/A"
-        if t.mentor and t.mentor.user:
+        if session.mentor and session.mentor.user:
             mentor_name = (
-                t.mentor.user.get_full_name()
-                or t.mentor.user.username
+                session.mentor.user.get_full_name()
+                or session.mentor.user.username
             )
-        elif t.trainer:
-            mentor_name = t.trainer
+        elif session.trainer:
+            mentor_name = session.trainer
 
         task_list.append({
             "id": t.id,
-            "date": t.date.strftime("%d/%m/%Y"),
-            "topic": t.title,
+            "date": session.date.strftime("%d/%m/%Y"),
+            "topic": session.title,
             "mentor": mentor_name,
             "deadline": (
-                t.deadline.strftime("%d/%m/%Y")
-                if t.deadline else "-"
+                session.deadline.strftime("%d/%m/%Y")
+                if session.deadline else "-"
             ),
             "status": t.status,
             "submitted": bool(submission),
@@ -2349,20 +3203,25 @@ def admin_payment_list(request):
             "student__user",
             "student__course"
         )
-        .order_by("-created_at")
+        .order_by("-created_at", "-id")
     )
 
-    # ✅ PRE-CALCULATE APPROVED PAYMENTS (FAST)
+    page_obj = EstimatedCountPaginator(payments, 25).get_page(request.GET.get("page"))
+
+    # ✅ PRE-CALCULATE APPROVED PAYMENTS (STUDENTS ON THIS PAGE ONLY)
     approved_map = (
         Payment.objects
-        .filter(status="approved")
+        .filter(
+            status="approved",
+            student_id__in={p.student_id for p in page_obj},
+        )
         .values("student_id")
         .annotate(total=Sum("amount_paid"))
     )
     approved_dict = {x["student_id"]: float(x["total"]) for x in approved_map}
 
     # ✅ ATTACH VALUES PER PAYMENT ROW
-    for p in payments:
+    for p in page_obj:
         course_amount = float(
             getattr(p.student, "amount", 0) or
             getattr(p.student.course, "total_fee", 0) or
@@ -2376,10 +3235,18 @@ def admin_payment_list(request):
         p.approved_paid = approved_paid
         p.balance_amount = balance_amount
 
+    params = request.GET.copy()
+    params.pop("page", None)
+
     return render(
         request,
         "payment_list.html",
-        {"payments": payments}
+        {
+            "payments": page_obj,
+            "page_obj": page_obj,
+            "page_numbers": page_window(page_obj),
+            "query_string": params.urlencode(),
+        }
     )
 
 
@@ -2587,15 +3454,124 @@ def edit_payment(request, payment_id):
 
 from datetime import datetime
 
+
+# ======================================================
+# FAN-OUT: ONE SESSION PER BATCH + ONE ROW PER STUDENT
+# ======================================================
+def create_sessions_for_students(students, status="pending", batch_ids=(), **content):
+    """
+    Create the TopicSession(s) and every student's Topic row atomically.
+    Students are grouped by batch; progress rows go in one bulk_create,
+    so the query count does not grow with the number of students.
+    `batch_ids` get a session even if none of `students` is in them.
+    Students without a batch cannot get a session and are returned in
+    `skipped` for the caller to report.
+    Returns (sessions, rows, skipped).
+    """
+    by_batch = {batch_id: [] for batch_id in batch_ids}
+    skipped = []
+    for s in students:
+        if s.batch_id:
+            by_batch.setdefault(s.batch_id, []).append(s)
+        else:
+            skipped.append(s)
+
+    with transaction.atomic():
+        # .create() (not bulk) so the media store hooks see the upload
+        sessions = [
+            TopicSession.objects.create(batch_id=batch_id, **content)
+            for batch_id in by_batch
+        ]
+
+        rows = Topic.objects.bulk_create([
+            Topic(session=session, student=student, status=status)
+            for session in sessions
+            for student in by_batch[session.batch_id]
+        ])
+
+    return sessions, rows, skipped
+
+
+def detach_session(topic):
+    """
+    Give `topic` a TopicSession of its own before a per-student edit.
+    Sessions are shared by the whole batch; editing one student's copy
+    must not change everyone else's.
+    """
+    if not topic.session.progress.exclude(id=topic.id).exists():
+        return topic.session
+
+    session = TopicSession.objects.get(id=topic.session_id)
+    session.pk = None
+    session._state.adding = True
+    session.save()
+
+    topic.session = session
+    topic.save(update_fields=["session"])
+    return session
+
+
+# ======================================================
+# STUDENT PICKER AUTOCOMPLETE (ADD TASK / ATTENDANCE)
+# ======================================================
+@login_required
+def student_lookup_api(request):
+    """
+    GET ?q=<prefix>
+
+    Students whose name, username, email or phone starts with q, at most
+    STUDENT_LOOKUP_LIMIT, cached per prefix (students/lookup.py).
+    """
+
+    if not is_admin_or_mentor(request.user):
+        return JsonResponse(
+            {"status": "error", "message": "Admin or mentor access required"},
+            status=403
+        )
+
+    return JsonResponse({
+        "results": lookup_students(request.GET.get("q", "")),
+    })
+
+
+def selected_students(request):
+    """Students from POST: `students` (list), `student` (one) and/or `batch`."""
+    # Non-numeric values (tampered posts) are ignored, not a 500
+    ids = [
+        i for i in request.POST.getlist("students") + request.POST.getlist("student")
+        if i.isdigit()
+    ]
+    batch_id = request.POST.get("batch", "").strip()
+    if not batch_id.isdigit():
+        batch_id = ""
+
+    if not ids and not batch_id:
+        return Student.objects.none()
+
+    query = Q()
+    if ids:
+        query |= Q(id__in=ids)
+    if batch_id:
+        query |= Q(batch_id=batch_id)
+
+    return Student.objects.filter(query).only("id", "batch_id")
+
+
 @login_required
 @user_passes_test(is_admin_or_mentor)
 def add_task(request):
 
+    # Students are picked through student_lookup_api, not rendered here
     if request.method == "GET":
-        students = Student.objects.select_related("user", "course").all()
-        return render(request, "add_task.html", {"students": students})
+        batches = Batch.objects.select_related("course").all()
+        return render(request, "add_task.html", {
+            "batches": batches,
+        })
 
-    student = get_object_or_404(Student, id=request.POST.get("student"))
+    students = list(selected_students(request))
+    if not students:
+        messages.error(request, "Select a student or a batch")
+        return redirect("add_task")
 
     deadline_raw = request.POST.get("deadline")
     deadline = (
@@ -2603,10 +3579,11 @@ def add_task(request):
         if deadline_raw else None
     )
 
-    Topic.objects.create(
+    _, rows, skipped = create_sessions_for_students(
+        students,
+        status=request.POST.get("status") or "pending",
+
         content_type="task",
-        student=student,
-        batch=student.batch,
         mentor=getattr(request.user, "mentor", None),
 
         title=request.POST.get("title"),
@@ -2623,10 +3600,11 @@ def add_task(request):
 
         deadline=deadline,   # ✅ FIXED
         task_notes=request.POST.get("task_notes") or "",
-        status=request.POST.get("status") or "pending",
     )
 
-    messages.success(request, "Task added successfully")
+    messages.success(request, f"Task assigned to {len(rows)} students")
+    if skipped:
+        messages.warning(request, f"{len(skipped)} students skipped: not in a batch")
     return redirect("task_list")
 
 
@@ -2636,19 +3614,29 @@ def task_list(request):
 
     tasks = (
         Topic.objects
-        .filter(content_type="task")
+        .filter(session__content_type="task")
         .select_related(
+            "session",
             "student",
             "student__user",
             "student__course",
             "student__batch"
         )
         .prefetch_related("submissions")
-        .order_by("-date", "-id")
+        .order_by("-session__date", "-id")
     )
 
+    # 🔍 Task title / trainer or student, title matches first
+    search = request.GET.get("search", "").strip()
+    if search:
+        tasks = tasks.filter(
+            Q(session_id__in=matching_ids("session", search))
+            | Q(student_id__in=matching_ids("student", search))
+        ).order_by(ranked(search_ids("session", search), "session_id"), "-session__date", "-id")
+
     return render(request, "task_details.html", {
-        "tasks": tasks
+        "tasks": tasks,
+        "search": search,
     })
 
 from datetime import datetime
@@ -2657,24 +3645,26 @@ from datetime import datetime
 def edit_task(request, task_id):
 
     task = get_object_or_404(
-        Topic,
+        Topic.objects.select_related("session"),
         id=task_id,
-        content_type="task"
+        session__content_type="task"
     )
 
     if request.method == "POST":
         deadline_raw = request.POST.get("deadline")
+        session = detach_session(task)
 
-        task.deadline = (
+        session.deadline = (
             datetime.strptime(deadline_raw, "%Y-%m-%d").date()
             if deadline_raw else None
         )
 
-        task.estimated_time = request.POST.get("estimated_time") or None
-        task.task_notes = request.POST.get("task_notes") or ""
-        task.status = request.POST.get("status") or "pending"
+        session.estimated_time = request.POST.get("estimated_time") or None
+        session.task_notes = request.POST.get("task_notes") or ""
+        session.save()
 
-        task.save()
+        task.status = request.POST.get("status") or "pending"
+        task.save(update_fields=["status"])
 
         messages.success(request, "Task updated successfully")
 
@@ -2697,24 +3687,29 @@ def add_topic(request):
         })
 
     batch = get_object_or_404(Batch, id=request.POST.get("batch"))
-    students = Student.objects.filter(batch=batch)
+    students = Student.objects.filter(batch=batch).only("id", "batch_id")
 
-    for s in students:
-        Topic.objects.create(
-            content_type="topic",
-            student=s,
-            batch=batch,
-            mentor=mentor,
+    # Optional subset of the batch
+    chosen = [i for i in request.POST.getlist("students") if i.isdigit()]
+    if chosen:
+        students = students.filter(id__in=chosen)
 
-            title=request.POST.get("title"),
-            description=request.POST.get("description"),
-            date=request.POST.get("date"),
-            start_time=request.POST.get("start_time"),
-            end_time=request.POST.get("end_time"),
-            trainer=request.POST.get("trainer"),
-            zoom_link=request.POST.get("zoom_link"),
-            video=request.FILES.get("video"),
-        )
+    # Content (and the video) stored once, all rows in one transaction
+    _, rows, _ = create_sessions_for_students(
+        students,
+        batch_ids=[batch.id],
+        content_type="topic",
+        mentor=mentor,
+
+        title=request.POST.get("title"),
+        description=request.POST.get("description"),
+        date=request.POST.get("date"),
+        start_time=request.POST.get("start_time"),
+        end_time=request.POST.get("end_time"),
+        trainer=request.POST.get("trainer"),
+        zoom_link=request.POST.get("zoom_link"),
+        video=request.FILES.get("video"),
+    )
 
-    messages.success(request, "Topic added successfully")
+    messages.success(request, f"Topic added for {len(rows)} students")
     return redirect("admin_dashboard")
@@ -0,0 +1,119 @@
+# ======================================================
+# WORKING-DAY CALENDAR (MON–FRI MINUS HOLIDAYS)
+# ======================================================
+"""
+Answers "how many working days between A and B" in constant time.
+
+Working days are Monday–Friday minus the dates stored in the Holiday
+table. The calendar keeps a prefix-sum array keyed by ordinal date that
+covers the span of all holidays; outside that span there are no holidays,
+so the count is pure weekday arithmetic.
+
+The calendar is built lazily once per process and rebuilt only after a
+Holiday row changes (see students/signals.py). Changes reach every worker
+through a CacheVersion row (students/cache_versions.py).
+"""
+
+
+CALENDAR_VERSION_KEY = "working_day_calendar"
+
+
+def _weekdays_before(ordinal):
+    """Number of Mon–Fri days with an ordinal strictly below `ordinal`.
+
+    date.fromordinal(1) (0001-01-01) is a Monday, so every run of 7
+    ordinals starting at 1 holds exactly 5 weekdays.
+    """
+    days = ordinal - 1
+    return (days // 7) * 5 + min(days % 7, 5)
+
+
+class WorkingDayCalendar:
+
+    def __init__(self, holidays=()):
+        # Only holidays that fall on a weekday remove a working day
+        holiday_ordinals = sorted({
+            d.toordinal() for d in holidays if d.weekday() < 5
+        })
+
+        if holiday_ordinals:
+            self.lo = holiday_ordinals[0]
+            self.hi = holiday_ordinals[-1] + 1
+        else:
+            self.lo = self.hi = 1
+
+        # prefix[i] = working days in [lo, lo + i)
+        holiday_set = set(holiday_ordinals)
+        prefix = [0]
+        running = 0
+
+        for ordinal in range(self.lo, self.hi):
+            if (ordinal - 1) % 7 < 5 and ordinal not in holiday_set:
+                running += 1
+            prefix.append(running)
+
+        self.prefix = prefix
+        self.base = _weekdays_before(self.lo)
+        self.holiday_count = len(holiday_ordinals)
+
+    def _working_days_before(self, ordinal):
+        if ordinal <= self.lo:
+            return _weekdays_before(ordinal)
+
+        if ordinal >= self.hi:
+            return _weekdays_before(ordinal) - self.holiday_count
+
+        return self.base + self.prefix[ordinal - self.lo]
+
+    def working_days(self, start, end):
+        """Working days in the inclusive range start..end."""
+        if not start or not end or end < start:
+            return 0
+
+        return (
+            self._working_days_before(end.toordinal() + 1)
+            - self._working_days_before(start.toordinal())
+        )
+
+    def is_working_day(self, day):
+        return self.working_days(day, day) == 1
+
+
+# ======================================================
+# PROCESS-WIDE CACHE
+# ======================================================
+_calendar = None
+_calendar_version = None
+
+
+def get_working_day_calendar():
+    """Return the shared calendar, rebuilding it if a Holiday changed."""
+    global _calendar, _calendar_version
+
+    from .cache_versions import current_version
+    from .models import Holiday
+
+    version = current_version(CALENDAR_VERSION_KEY)
+
+    if _calendar is None or version != _calendar_version:
+        _calendar = WorkingDayCalendar(
+            Holiday.objects.values_list("date", flat=True)
+        )
+        _calendar_version = version
+
+    return _calendar
+
+
+def invalidate_working_day_calendar():
+    """Drop the calendar here and bump the stored version so every other
+    worker rebuilds on its next use."""
+    global _calendar
+
+    from .cache_versions import bump_version
+
+    _calendar = None
+    bump_version(CALENDAR_VERSION_KEY)
+
+
+def working_days_between(start, end):
+    return get_working_day_calendar().working_days(start, end)